@@ -4,96 +4,23 @@ Advanced ML Models for MFL Position Rating Prediction
 """
 
 import numpy as np
-from sklearn.ensemble import RandomForestRegressor, GradientBoostingRegressor
-from sklearn.svm import SVR
-from sklearn.neural_network import MLPRegressor
-from sklearn.model_selection import cross_val_score, GridSearchCV
+from sklearn.model_selection import GridSearchCV
 from sklearn.metrics import mean_absolute_error, r2_score
-import xgboost as xgb
-import lightgbm as lgb
 
-def train_advanced_models(X_train, y_train, X_test, y_test):
+def train_advanced_models(X_train, y_train, X_test, y_test, n_jobs=None):
     """
-    Train and compare advanced ML models
+    Train and compare advanced ML models.
+    Every (model, CV fold) fit runs in parallel across n_jobs processes (None for all cores).
     """
+    from model_comparison import compare_models
     
-    models = {
-        'Random Forest': RandomForestRegressor(
-            n_estimators=100,
-            max_depth=10,
-            random_state=42
-        ),
-        
-        'Gradient Boosting': GradientBoostingRegressor(
-            n_estimators=100,
-            learning_rate=0.1,
-            max_depth=6,
-            random_state=42
-        ),
-        
-        'XGBoost': xgb.XGBRegressor(
-            n_estimators=100,
-            learning_rate=0.1,
-            max_depth=6,
-            random_state=42
-        ),
-        
-        'LightGBM': lgb.LGBMRegressor(
-            n_estimators=100,
-            learning_rate=0.1,
-            max_depth=6,
-            random_state=42
-        ),
-        
-        'SVR (RBF)': SVR(
-            kernel='rbf',
-            C=1.0,
-            gamma='scale'
-        ),
-        
-        'Neural Network': MLPRegressor(
-            hidden_layer_sizes=(100, 50),
-            activation='relu',
-            solver='adam',
-            max_iter=500,
-            random_state=42
-        )
-    }
-    
-    results = {}
-    
-    for name, model in models.items():
-        print(f"Training {name}...")
-        
-        # Train model
-        model.fit(X_train, y_train)
-        
-        # Predictions
-        y_pred = model.predict(X_test)
-        
-        # Metrics
-        mae = mean_absolute_error(y_test, y_pred)
-        r2 = r2_score(y_test, y_pred)
-        
-        # Cross-validation
-        cv_scores = cross_val_score(model, X_train, y_train, cv=5, scoring='r2')
-        
-        results[name] = {
-            'MAE': mae,
-            'R²': r2,
-            'CV_R²_mean': cv_scores.mean(),
-            'CV_R²_std': cv_scores.std(),
-            'model': model
-        }
-        
-        print(f"{name}: MAE={mae:.2f}, R²={r2:.3f}, CV_R²={cv_scores.mean():.3f}±{cv_scores.std():.3f}")
-    
-    return results
+    return compare_models(X_train, y_train, X_test, y_test, cv=5, n_jobs=n_jobs)
 
 def hyperparameter_tuning(X_train, y_train):
     """
     Hyperparameter tuning for the best model
     """
+    import xgboost as xgb
     
     # Example: XGBoost hyperparameter tuning
     param_grid = {
@@ -122,28 +49,42 @@ def hyperparameter_tuning(X_train, y_train):
     
     return grid_search.best_estimator_
 
-def ensemble_methods(models_dict, X_test, y_test):
+def ensemble_methods(models_dict, X_test, y_test, X_train=None, y_train=None, n_jobs=None):
     """
-    Create ensemble predictions from multiple models
+    Create ensemble predictions from the fitted models in models_dict
+    (as returned by train_advanced_models). Weights never come from the test
+    set: with training data they are a non-negative blend of each model's
+    out-of-fold predictions, otherwise each model's clipped CV R².
     """
+    from stacking_ensemble import BlendedEnsemble, fit_blend_weights
     
-    predictions = {}
+    names = list(models_dict)
+    members = [models_dict[name]['model'] for name in names]
     
-    # Get predictions from each model
-    for name, result in models_dict.items():
-        predictions[name] = result['model'].predict(X_test)
+    if X_train is not None:
+        from sklearn.base import clone
+        from sklearn.model_selection import KFold, cross_val_predict
+        
+        # Out-of-fold predictions of unfitted copies of the given models, on the compare_models splits
+        folds = KFold(n_splits=5)
+        oof = np.empty((len(names), len(X_train)))
+        for m, model in enumerate(members):
+            oof[m] = cross_val_predict(clone(model), X_train, y_train, cv=folds, n_jobs=n_jobs)
+        weights = fit_blend_weights(oof, y_train)
+    else:
+        weights = np.array([max(0.0, models_dict[name]['CV_R²_mean']) for name in names])
+        weights = weights / weights.sum() if weights.any() else np.full(len(names), 1.0 / len(names))
     
     # Simple averaging ensemble
-    ensemble_pred = np.mean(list(predictions.values()), axis=0)
+    simple = BlendedEnsemble(names, members, np.full(len(names), 1.0 / len(names)))
     
-    # Weighted averaging (based on individual model performance)
-    weights = []
-    for name in predictions.keys():
-        r2 = models_dict[name]['R²']
-        weights.append(max(0, r2))  # Only positive weights
+    # Non-negative weighted blend
+    weighted = BlendedEnsemble(names, members, weights)
     
-    weights = np.array(weights) / np.sum(weights)
-    weighted_ensemble_pred = np.average(list(predictions.values()), axis=0, weights=weights)
+    # Every member predicts the test set once; both ensembles reuse that block
+    predictions = simple.member_predictions(X_test)
+    ensemble_pred = simple.weights @ predictions
+    weighted_ensemble_pred = weighted.weights @ predictions[[names.index(name) for name in weighted.names]]
     
     # Evaluate ensembles
     mae_simple = mean_absolute_error(y_test, ensemble_pred)
@@ -153,7 +94,7 @@ def ensemble_methods(models_dict, X_test, y_test):
     r2_weighted = r2_score(y_test, weighted_ensemble_pred)
     
     print(f"Simple Ensemble: MAE={mae_simple:.2f}, R²={r2_simple:.3f}")
-    print(f"Weighted Ensemble: MAE={mae_weighted:.2f}, R²={r2_weighted:.3f}")
+    print(f"Weighted Ensemble: MAE={mae_weighted:.2f}, R²={r2_weighted:.3f} (weights: {weighted.describe()})")
     
     return {
         'simple_ensemble': ensemble_pred,
@@ -161,7 +102,8 @@ def ensemble_methods(models_dict, X_test, y_test):
         'simple_mae': mae_simple,
         'weighted_mae': mae_weighted,
         'simple_r2': r2_simple,
-        'weighted_r2': r2_weighted
+        'weighted_r2': r2_weighted,
+        'weighted_model': weighted
     }
 
 # Example usage
@@ -0,0 +1,302 @@
+#!/usr/bin/env python3
+"""
+Bulk Position Scorer
+Scores CSV, Parquet or JSONL player files chunk by chunk across a process pool into resumable columnar parts
+"""
+
+import os
+import sys
+import json
+import time
+import numpy as np
+from pathlib import Path
+from concurrent.futures import ProcessPoolExecutor, FIRST_COMPLETED, wait
+
+from player_dataset import ATTRIBUTE_COLS, ATTRIBUTE_MAX, POSITIONS, atomic_write, encode_position, position_names
+from rating_engine import (rate_players, familiarity_levels, encode_position_masks, position_masks_from_codes,
+                           UNKNOWN_POSITION)
+
+DEFAULT_CHUNK_SIZE = 65536
+TOP_K = 3
+
+# Columns of every part file, all fixed-width
+OUTPUT_COLUMNS = {
+    'id': (np.int64, ()),
+    'primary_code': (np.uint8, ()),
+    'position_mask': (np.uint16, ()),
+    'ratings': (np.uint8, (len(POSITIONS),)),
+    'familiarity': (np.uint8, (len(POSITIONS),)),
+    'best_position': (np.uint8, ()),
+    'best_rating': (np.uint8, ()),
+    'top3': (np.uint8, (TOP_K,)),
+}
+
+# Accepted names for the primary position column of tabular inputs; a
+# 'positions' column holds "ST, CF" style lists whose first entry is primary
+PRIMARY_COLUMNS = ('primary', 'primary_position', 'primaryPosition', 'positions')
+SECONDARY_COLUMN = 'secondary'
+
+def _position_lists(frame):
+    """Every player's positions, primary first"""
+    for column in PRIMARY_COLUMNS:
+        if column in frame.columns:
+            lists = [[name.strip() for name in value.split(',') if name.strip()]
+                     for value in frame[column].fillna('').astype(str)]
+            if column != 'positions' and SECONDARY_COLUMN in frame.columns:
+                for names, value in zip(lists, frame[SECONDARY_COLUMN].fillna('').astype(str)):
+                    names.extend(name.strip() for name in value.split(',') if name.strip())
+            return lists
+    raise ValueError(f"No primary position column (expected one of {', '.join(PRIMARY_COLUMNS)})")
+
+def frame_to_chunk(frame, offset=0):
+    """
+    Tabular rows (one attribute column each) -> (chunk, n_skipped).
+    Rows with a missing or out-of-range attribute, or without a known primary
+    position, are skipped; rows without an id column are numbered by their
+    position in the file.
+    """
+    import pandas as pd
+
+    missing = [column for column in ATTRIBUTE_COLS if column not in frame.columns]
+    if missing:
+        raise ValueError(f"Missing attribute columns: {', '.join(missing)}")
+
+    attributes = frame[ATTRIBUTE_COLS].apply(pd.to_numeric, errors='coerce').to_numpy(np.float64)
+    keep = np.isfinite(attributes).all(axis=1) & (attributes >= 0).all(axis=1) & (attributes <= ATTRIBUTE_MAX).all(axis=1)
+
+    if 'id' in frame.columns:
+        ids = pd.to_numeric(frame['id'], errors='coerce').to_numpy(np.float64)
+        keep &= np.isfinite(ids)
+    else:
+        ids = np.arange(offset, offset + len(frame), dtype=np.float64)
+
+    positions = _position_lists(frame)
+    primary = np.array([encode_position(names[0] if names else '') for names in positions], dtype=np.uint8)
+    keep &= primary < UNKNOWN_POSITION
+    chunk = {
+        'id': ids[keep].astype(np.int64),
+        'attributes': attributes[keep].astype(np.uint8),
+        'primary_code': primary[keep],
+        'position_mask': encode_position_masks(positions)[keep],
+    }
+    return chunk, int((~keep).sum())
+
+def _jsonl_is_tabular(path):
+    """True when JSONL lines are flat attribute records rather than workbook rows or API documents"""
+    with open(path, 'r') as f:
+        for line in f:
+            if line.strip():
+                record = json.loads(line)
+                return 'inputData' not in record and 'player' not in record
+    return True
+
+def iter_input_chunks(path, chunk_size=DEFAULT_CHUNK_SIZE):
+    """
+    Yield (chunk, n_skipped) with at most chunk_size rows each, reading the
+    file lazily. chunk has id (int64), attributes (n, 6 uint8), primary_code
+    (uint8) and position_mask (uint16, every position the player owns) columns.
+    """
+    suffix = Path(path).suffix.lower()
+    offset = 0
+
+    if suffix in ('.csv', '.tsv', '.txt'):
+        import pandas as pd
+        frames = pd.read_csv(path, chunksize=chunk_size, sep='\t' if suffix == '.tsv' else ',')
+    elif suffix in ('.parquet', '.pq'):
+        try:
+            import pyarrow.parquet as pq
+        except ImportError:
+            raise ImportError("Reading Parquet needs pyarrow: pip install pyarrow")
+        frames = (batch.to_pandas() for batch in pq.ParquetFile(path).iter_batches(batch_size=chunk_size))
+    elif suffix in ('.jsonl', '.ndjson'):
+        if _jsonl_is_tabular(path):
+            import pandas as pd
+            frames = pd.read_json(path, lines=True, chunksize=chunk_size)
+        else:
+            # Workbook-shaped rows or raw API documents go through inputData extraction
+            from streaming_ingest import iter_player_chunks
+            for chunk, n_rejected in iter_player_chunks(path, chunk_size, with_rejects=True):
+                # Same rule as frame_to_chunk: a player without a known primary position is invalid
+                keep = chunk['primary_code'] < UNKNOWN_POSITION
+                codes = np.column_stack([chunk['primary_code'], chunk['secondary_codes']])[keep]
+                yield {
+                    'id': chunk['id'][keep],
+                    'attributes': chunk['attributes'][keep],
+                    'primary_code': chunk['primary_code'][keep],
+                    'position_mask': position_masks_from_codes(codes),
+                }, n_rejected + int((~keep).sum())
+            return
+    else:
+        raise ValueError(f"Unsupported input type: {path} (expected .csv, .parquet or .jsonl)")
+
+    for frame in frames:
+        yield frame_to_chunk(frame, offset)
+        offset += len(frame)
+
+def score_chunk(chunk):
+    """Ratings, familiarity codes, best position and top-3 positions for one chunk"""
+    primary = np.minimum(chunk['primary_code'], UNKNOWN_POSITION)
+    masks = chunk['position_mask']
+    ratings = rate_players(chunk['attributes'], primary, position_masks=masks)
+
+    # Stable sort: ties go to the earlier position in POSITIONS order
+    order = np.argsort(-ratings.astype(np.int16), axis=1, kind='stable')
+    top = order[:, :TOP_K].astype(np.uint8)
+    return {
+        'id': chunk['id'].astype(np.int64),
+        'primary_code': chunk['primary_code'].astype(np.uint8),
+        'position_mask': masks.astype(np.uint16),
+        'ratings': ratings,
+        'familiarity': familiarity_levels(primary, masks).astype(np.uint8),
+        'best_position': top[:, 0],
+        'best_rating': ratings[np.arange(len(ratings)), top[:, 0]],
+        'top3': top,
+    }
+
+def part_path(output_dir, index):
+    return Path(output_dir) / f"part-{index:06d}.npz"
+
+def _score_part(index, chunk, output_dir):
+    """Worker: score one chunk and write its part file atomically"""
+    scores = score_chunk(chunk)
+    with atomic_write(part_path(output_dir, index)) as f:
+        np.savez(f, **scores)
+    return index, len(scores['id'])
+
+def _input_signature(input_path, chunk_size):
+    stat = os.stat(input_path)
+    return {
+        'input': str(Path(input_path).resolve()),
+        'input_size': stat.st_size,
+        'input_mtime': int(stat.st_mtime),
+        'chunk_size': chunk_size,
+    }
+
+def _write_manifest(output_dir, manifest):
+    with atomic_write(Path(output_dir) / "manifest.json", 'w') as f:
+        json.dump(manifest, f, indent=2)
+
+def load_manifest(output_dir):
+    path = Path(output_dir) / "manifest.json"
+    if not path.exists():
+        return None
+    with open(path, 'r') as f:
+        return json.load(f)
+
+def bulk_score(input_path, output_dir, chunk_size=DEFAULT_CHUNK_SIZE, workers=None, resume=True):
+    """
+    Score every player in input_path into output_dir/part-NNNNNN.npz.
+
+    Chunks are sharded across a process pool (workers=1 scores in-process);
+    manifest.json records each finished chunk, so an interrupted run picks
+    up where it stopped. Resuming against a changed input or chunk size is
+    refused rather than mixing parts from different inputs.
+    """
+    output_dir = Path(output_dir)
+    output_dir.mkdir(parents=True, exist_ok=True)
+    workers = workers or os.cpu_count() or 1
+
+    signature = _input_signature(input_path, chunk_size)
+    manifest = load_manifest(output_dir) if resume else None
+    if manifest is not None and {key: manifest.get(key) for key in signature} != signature:
+        raise ValueError(f"{output_dir} holds parts for a different input or chunk size; "
+                         f"use another output directory or resume=False")
+    if manifest is None:
+        manifest = {**signature, 'columns': list(OUTPUT_COLUMNS), 'positions': POSITIONS,
+                    'chunks': {}, 'skipped': {}, 'complete': False}
+        _write_manifest(output_dir, manifest)
+
+    finished = {int(index) for index in manifest['chunks']}
+    already = sum(manifest['chunks'].values())
+    if finished:
+        print(f"Resuming: {len(finished)} chunks ({already:,} players) already scored")
+
+    start = time.perf_counter()
+    scored = 0
+
+    def record(index, n_rows, n_skipped):
+        nonlocal scored
+        scored += n_rows
+        manifest['chunks'][str(index)] = n_rows
+        if n_skipped:
+            manifest['skipped'][str(index)] = n_skipped
+        _write_manifest(output_dir, manifest)
+        elapsed = time.perf_counter() - start
+        print(f"  chunk {index}: {n_rows:,} players  "
+              f"({already + scored:,} total, {scored / max(elapsed, 1e-9):,.0f} players/s)")
+
+    chunks = ((index, chunk, n_skipped) for index, (chunk, n_skipped)
+              in enumerate(iter_input_chunks(input_path, chunk_size)) if index not in finished)
+
+    if workers == 1:
+        for index, chunk, n_skipped in chunks:
+            record(*_score_part(index, chunk, output_dir), n_skipped)
+    else:
+        # Keep at most two chunks per worker in flight so memory stays bounded
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            in_flight = {}
+            for index, chunk, n_skipped in chunks:
+                in_flight[pool.submit(_score_part, index, chunk, output_dir)] = n_skipped
+                if len(in_flight) >= 2 * workers:
+                    done, _ = wait(in_flight, return_when=FIRST_COMPLETED)
+                    for future in done:
+                        record(*future.result(), in_flight.pop(future))
+            for future in list(in_flight):
+                record(*future.result(), in_flight.pop(future))
+
+    manifest['complete'] = True
+    _write_manifest(output_dir, manifest)
+
+    elapsed = time.perf_counter() - start
+    total = already + scored
+    print(f"Scored {scored:,} players in {elapsed:.2f}s ({scored / max(elapsed, 1e-9):,.0f} players/s); "
+          f"{total:,} in {output_dir}")
+    skipped = sum(manifest['skipped'].values())
+    if skipped:
+        print(f"Skipped {skipped:,} invalid rows (bad attributes or no known primary position)")
+    return manifest
+
+def load_bulk_scores(output_dir):
+    """Concatenate every finished part, in input order, into one dict of arrays"""
+    manifest = load_manifest(output_dir)
+    if manifest is None:
+        raise FileNotFoundError(f"No manifest.json in {output_dir}")
+
+    parts = {key: [] for key in OUTPUT_COLUMNS}
+    for index in sorted(int(index) for index in manifest['chunks']):
+        with np.load(part_path(output_dir, index)) as part:
+            for key in OUTPUT_COLUMNS:
+                parts[key].append(part[key])
+
+    return {
+        key: np.concatenate(values) if values else np.zeros((0,) + shape, dtype=dtype)
+        for (key, values), (dtype, shape) in zip(parts.items(), OUTPUT_COLUMNS.values())
+    }
+
+def main():
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Score every position for a file of players")
+    parser.add_argument('input', help='CSV, Parquet or JSONL file')
+    parser.add_argument('output_dir', help='Directory for part files and manifest.json')
+    parser.add_argument('--chunk-size', type=int, default=DEFAULT_CHUNK_SIZE)
+    parser.add_argument('--workers', type=int, default=None, help='Worker processes (default: all cores)')
+    parser.add_argument('--restart', action='store_true', help='Ignore finished chunks and score from scratch')
+    args = parser.parse_args()
+
+    if not os.path.exists(args.input):
+        print(f"Error: {args.input} not found!")
+        return 1
+
+    bulk_score(args.input, args.output_dir, args.chunk_size, args.workers, resume=not args.restart)
+
+    scores = load_bulk_scores(args.output_dir)
+    if len(scores['id']):
+        best = position_names(scores['best_position'])
+        names, counts = np.unique(best, return_counts=True)
+        print("Best positions: " + ", ".join(f"{name} {count:,}" for name, count in
+                                             sorted(zip(names, counts), key=lambda item: -item[1])))
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,161 @@
+#!/usr/bin/env python3
+"""
+Merged Player Dataset Builder
+Combines every scraped workbook in Data/ into one deduplicated, versioned snapshot
+"""
+
+import os
+import json
+import fnmatch
+import numpy as np
+from datetime import datetime
+from pathlib import Path
+
+from player_dataset import PROJECT_ROOT, CACHE_DIR, DATASET_COLUMNS, DATASET_FORMAT, atomic_write, load_player_dataset
+
+DATA_DIR = PROJECT_ROOT / "Data"
+SNAPSHOT_DIR = CACHE_DIR / "snapshots"
+SOURCE_CACHE_DIR = CACHE_DIR / "sources"
+LATEST_POINTER = SNAPSHOT_DIR / "latest.json"
+
+# When the same player id appears in several files, the first matching pattern wins
+# (corrected > full > progress). Ties go to the most recently modified file.
+SOURCE_PRECEDENCE = [
+    'corrected-player-data.xlsx',
+    'full-player-data.xlsx',
+    '600-player-data-scraped.xlsx',
+    'comprehensive-player-data.xlsx',
+    'player-data-progress-corrected.xlsx',
+    'player-data-progress.xlsx',
+    'scraping-progress.xlsx',
+    '*.jsonl',
+    '*.xlsx',
+]
+
+# Backups of the buggy original calculation and tiny test files are never merged
+SOURCE_EXCLUDE = ['backup-*', 'test-*', '~$*']
+
+def discover_sources(data_dir=DATA_DIR):
+    """Data files to merge, with their precedence rank"""
+    sources = []
+    for path in sorted(Path(data_dir).iterdir()):
+        if not path.is_file() or any(fnmatch.fnmatch(path.name, pattern) for pattern in SOURCE_EXCLUDE):
+            continue
+        rank = next(
+            (i for i, pattern in enumerate(SOURCE_PRECEDENCE) if fnmatch.fnmatch(path.name, pattern)),
+            None
+        )
+        if rank is not None:
+            sources.append((path, rank))
+
+    # Highest precedence first, newest first within a rank
+    sources.sort(key=lambda item: (item[1], -item[0].stat().st_mtime))
+    return [path for path, _ in sources]
+
+def source_fingerprint(path):
+    """What has to change for a file to be re-read"""
+    stat = os.stat(path)
+    return {'file': Path(path).name, 'size': stat.st_size, 'mtime': int(stat.st_mtime)}
+
+def read_latest_manifest():
+    if not LATEST_POINTER.exists():
+        return None
+    with open(LATEST_POINTER, 'r') as f:
+        return json.load(f)
+
+def merge_datasets(datasets):
+    """
+    Merge per-source datasets listed in precedence order, keeping the first
+    occurrence of every player id. Adds 'source' and 'source_row' provenance columns.
+    """
+    merged = {key: np.concatenate([dataset[key] for dataset in datasets]) for key in DATASET_COLUMNS}
+    source = np.concatenate([np.full(len(dataset['id']), i, dtype=np.uint8) for i, dataset in enumerate(datasets)])
+    source_row = np.concatenate([np.arange(len(dataset['id']), dtype=np.int32) for dataset in datasets])
+
+    # Stable sort by id keeps precedence order among duplicates; keep the first of each id
+    order = np.argsort(merged['id'], kind='stable')
+    _, first = np.unique(merged['id'][order], return_index=True)
+    keep = order[first]
+
+    snapshot = {key: values[keep] for key, values in merged.items()}
+    snapshot['source'] = source[keep]
+    snapshot['source_row'] = source_row[keep]
+
+    return snapshot
+
+def build_snapshot(data_dir=DATA_DIR, force=False):
+    """
+    Build (or reuse) the merged snapshot.
+
+    Each source is parsed through the per-file dataset cache, so only files
+    that changed since their last parse are read again. When no source has
+    changed the latest snapshot is returned as-is.
+    """
+    sources = discover_sources(data_dir)
+    if not sources:
+        raise FileNotFoundError(f"No player data files found in {data_dir}")
+    fingerprints = [source_fingerprint(path) for path in sources]
+
+    latest = read_latest_manifest()
+    up_to_date = latest is not None and latest['sources'] == fingerprints and latest.get('format') == DATASET_FORMAT
+    if up_to_date and not force:
+        print(f"Snapshot v{latest['version']} is up to date")
+        return latest
+
+    print(f"Building snapshot from {len(sources)} sources...")
+    datasets = [load_player_dataset(path, cache_dir=SOURCE_CACHE_DIR) for path in sources]
+    snapshot = merge_datasets(datasets)
+
+    version = 1 if latest is None else latest['version'] + 1
+    os.makedirs(SNAPSHOT_DIR, exist_ok=True)
+    snapshot_path = SNAPSHOT_DIR / f"players-v{version:04d}.npz"
+    np.savez_compressed(snapshot_path, **snapshot)
+
+    manifest = {
+        'version': version,
+        'format': DATASET_FORMAT,
+        'created': datetime.now().isoformat(),
+        'file': snapshot_path.name,
+        'players': int(len(snapshot['id'])),
+        'sources': fingerprints,
+        'rows_per_source': [int(len(dataset['id'])) for dataset in datasets],
+        'kept_per_source': np.bincount(snapshot['source'], minlength=len(sources)).tolist(),
+    }
+    with open(SNAPSHOT_DIR / f"players-v{version:04d}.json", 'w') as f:
+        json.dump(manifest, f, indent=2)
+
+    # Swap the pointer last so readers never see a half-written snapshot
+    with atomic_write(LATEST_POINTER, 'w') as f:
+        json.dump(manifest, f, indent=2)
+
+    print(f"Wrote snapshot v{version}: {manifest['players']} players -> {snapshot_path}")
+    return manifest
+
+def load_snapshot(version=None, build_if_missing=True):
+    """
+    Load a snapshot as a dataset dict (latest by default).
+    'source' indexes into the 'source_files' array for provenance.
+    """
+    if version is None:
+        manifest = read_latest_manifest()
+        if manifest is None:
+            if not build_if_missing:
+                raise FileNotFoundError("No dataset snapshot has been built yet")
+            manifest = build_snapshot()
+    else:
+        with open(SNAPSHOT_DIR / f"players-v{version:04d}.json", 'r') as f:
+            manifest = json.load(f)
+
+    with np.load(SNAPSHOT_DIR / manifest['file']) as snapshot:
+        dataset = {key: snapshot[key] for key in snapshot.files}
+    dataset['source_files'] = np.array([source['file'] for source in manifest['sources']])
+
+    return dataset
+
+if __name__ == "__main__":
+    import sys
+
+    manifest = build_snapshot(force='--force' in sys.argv)
+    print(f"\nSnapshot v{manifest['version']} ({manifest['players']} players)")
+    for source, rows, kept in zip(manifest['sources'], manifest['rows_per_source'], manifest['kept_per_source']):
+        print(f"  {source['file']}: {rows} rows, {kept} kept")
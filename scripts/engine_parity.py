@@ -0,0 +1,73 @@
+#!/usr/bin/env python3
+"""
+Rating Engine Parity Check
+Compares the vectorized engine with the scalar rules in mfl_rules for every primary position and fails on any difference
+"""
+
+import sys
+import numpy as np
+
+from rating_engine import (POSITIONS, UNKNOWN_POSITION, FAMILIARITY_LEVELS, rate_players, familiarity_levels,
+                           position_masks_from_codes, scalar_ratings)
+
+def edge_attributes():
+    """
+    Attribute rows on the rules' boundaries: extremes, a flat sweep of every
+    value, and goalkeeping scores landing on and around 50 and whole numbers
+    """
+    rows = [[0] * 6, [1] * 6, [99] * 6, [255] * 6]
+    rows += [[value] * 6 for value in range(0, 100)]
+    # DEF/PHY/PAS combinations whose GK score sits on an integer or on 50
+    for DEF in range(40, 100, 3):
+        for PHY in range(0, 100, 7):
+            for PAS in (0, 5, 10, 50, 99):
+                rows.append([50, 50, PAS, 50, DEF, PHY])
+    return np.array(rows, dtype=np.uint8)
+
+def player_grid(n_random=2000, seed=0):
+    """(attributes, primary codes, position masks): every attribute row at every primary position"""
+    rng = np.random.default_rng(seed)
+    attributes = np.vstack([edge_attributes(), rng.integers(0, 100, size=(n_random, 6), dtype=np.uint8)])
+    primaries = np.arange(UNKNOWN_POSITION + 1, dtype=np.uint8)
+
+    attributes = np.repeat(attributes, len(primaries), axis=0)
+    primary = np.tile(primaries, len(attributes) // len(primaries))
+    # Up to two secondary positions each (UNKNOWN_POSITION = none)
+    secondary = rng.integers(0, UNKNOWN_POSITION + 1, size=(len(primary), 2))
+    masks = position_masks_from_codes(np.column_stack([primary, secondary]))
+    return attributes, primary, masks
+
+def compare(attributes, primary, masks=None):
+    """Mismatches as (row, position, engine (rating, level), scalar (rating, level)) and rows checked"""
+    ratings = rate_players(attributes, primary, position_masks=masks)
+    levels = familiarity_levels(primary, masks)
+    expected_ratings, expected_levels = scalar_ratings(attributes, primary, masks)
+    differ = (ratings != expected_ratings) | (levels != expected_levels)
+    return [
+        (int(row), POSITIONS[t],
+         (int(ratings[row, t]), FAMILIARITY_LEVELS[levels[row, t]]),
+         (int(expected_ratings[row, t]), FAMILIARITY_LEVELS[expected_levels[row, t]]))
+        for row, t in zip(*np.nonzero(differ))
+    ]
+
+def run_parity(n_random=2000, seed=0):
+    """Check primary-only and multi-position scoring; returns a list of failure messages"""
+    attributes, primary, masks = player_grid(n_random, seed)
+    failures = []
+    for label, player_masks in [('primary only', None), ('with secondary positions', masks)]:
+        mismatches = compare(attributes, primary, player_masks)
+        print(f"  {label:<26} {len(attributes):,} players x {len(POSITIONS)} positions: "
+              f"{len(mismatches)} mismatches")
+        for row, target, engine, scalar in mismatches[:10]:
+            failures.append(f"{label}: row {row} (primary code {primary[row]}, attributes "
+                            f"{attributes[row].tolist()}) at {target}: engine {engine}, rules {scalar}")
+        if len(mismatches) > 10:
+            failures.append(f"{label}: ... and {len(mismatches) - 10} more")
+    return failures
+
+if __name__ == "__main__":
+    print(f"Engine vs mfl_rules at every primary position ({', '.join(POSITIONS)}, unknown):")
+    failures = run_parity()
+    for failure in failures:
+        print(f"FAIL: {failure}")
+    sys.exit(1 if failures else 0)
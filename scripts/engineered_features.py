@@ -0,0 +1,76 @@
+#!/usr/bin/env python3
+"""
+API Feature Engineering
+The engineered feature row the API's position models take, importable without the web stack
+"""
+
+import numpy as np
+
+def create_engineered_features(attributes) -> np.ndarray:
+    """
+    Create enhanced engineered features from player attributes for MFL.
+    attributes: any object with PAC, SHO, PAS, DRI, DEF and PHY attributes
+    """
+    PAC, SHO, PAS, DRI, DEF, PHY = (
+        attributes.PAC, attributes.SHO, attributes.PAS,
+        attributes.DRI, attributes.DEF, attributes.PHY
+    )
+    
+    # Base features
+    base_features = [PAC, SHO, PAS, DRI, DEF, PHY]
+    
+    # Enhanced attacking combinations
+    attacking_score = (SHO + DRI + PAC) / 3
+    finishing_score = (SHO + DRI) / 2
+    goal_scoring_potential = (SHO * 0.6 + PAC * 0.3 + DRI * 0.1)
+    
+    # Enhanced defensive combinations
+    defensive_score = (DEF + PHY) / 2
+    marking_score = (DEF + PAC) / 2
+    center_back_potential = (DEF * 0.7 + PHY * 0.2 + PAS * 0.1)
+    full_back_potential = (PAC * 0.3 + DEF * 0.3 + PAS * 0.25 + DRI * 0.15)
+    
+    # Enhanced midfield combinations
+    playmaking_score = (PAS + DRI) / 2
+    box_to_box_score = (PAS + DEF + PHY) / 3
+    central_midfield_potential = (PAS * 0.4 + DRI * 0.25 + DEF * 0.2 + PAC * 0.15)
+    
+    # Enhanced wing play combinations
+    wing_score = (PAC + DRI) / 2
+    crossing_score = (PAS + PAC) / 2
+    wing_back_potential = (PAC * 0.35 + PAS * 0.25 + DRI * 0.25 + DEF * 0.15)
+    winger_potential = (PAC * 0.3 + DRI * 0.3 + SHO * 0.2 + PAS * 0.2)
+    
+    # Enhanced physical and aerial combinations
+    aerial_score = (PHY + DEF) / 2
+    physical_dominance = (PHY * 0.6 + DEF * 0.4)
+    speed_potential = (PAC * 0.8 + DRI * 0.2)
+    
+    # Position-specific combinations for MFL
+    # LWB/RWB specific features
+    wing_back_offensive = (PAC * 0.3 + PAS * 0.3 + DRI * 0.25 + SHO * 0.15)
+    wing_back_defensive = (DEF * 0.4 + PAC * 0.3 + PAS * 0.2 + PHY * 0.1)
+    
+    # CB specific features
+    center_back_defensive = (DEF * 0.6 + PHY * 0.25 + PAS * 0.15)
+    center_back_aerial = (PHY * 0.5 + DEF * 0.4 + PAC * 0.1)
+    
+    # CDM specific features
+    defensive_midfield = (DEF * 0.4 + PAS * 0.3 + PHY * 0.2 + DRI * 0.1)
+    
+    # Add all enhanced engineered features
+    engineered = [
+        attacking_score, finishing_score, goal_scoring_potential,
+        defensive_score, marking_score, center_back_potential, full_back_potential,
+        playmaking_score, box_to_box_score, central_midfield_potential,
+        wing_score, crossing_score, wing_back_potential, winger_potential,
+        aerial_score, physical_dominance, speed_potential,
+        # MFL-specific features
+        wing_back_offensive, wing_back_defensive,
+        center_back_defensive, center_back_aerial,
+        defensive_midfield
+    ]
+    
+    features = base_features + engineered
+    
+    return np.array(features).reshape(1, -1)
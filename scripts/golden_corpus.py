@@ -0,0 +1,249 @@
+#!/usr/bin/env python3
+"""
+Golden Rating Corpus
+Records the scalar rules' output for millions of sampled players in one binary file and diffs any engine against it in parallel chunks
+"""
+
+import os
+import sys
+import time
+import struct
+import hashlib
+import importlib
+import numpy as np
+from pathlib import Path
+from concurrent.futures import ProcessPoolExecutor
+
+from player_dataset import CACHE_DIR, atomic_write
+from rating_engine import (POSITIONS, UNKNOWN_POSITION, FAMILIARITY_LEVELS, rate_players, familiarity_levels,
+                           position_masks_from_codes, position_names_from_mask, scalar_ratings)
+
+DEFAULT_CORPUS_PATH = CACHE_DIR / "golden" / "golden-corpus.bin"
+DEFAULT_ROWS = 1_000_000
+DEFAULT_CHUNK_SIZE = 65536
+
+# File layout: a fixed header, then one packed record per player
+MAGIC = b'MFLGOLD\0'
+FORMAT_VERSION = 1
+HEADER = struct.Struct('<8sIIQQ32s')  # magic, format, header size, rows, seed, rules digest
+HEADER_SIZE = 64
+RECORD_DTYPE = np.dtype([
+    ('attributes', np.uint8, (6,)),
+    ('primary_code', np.uint8),
+    ('position_mask', '<u2'),
+    ('ratings', np.uint8, (len(POSITIONS),)),
+    ('familiarity', np.uint8, (len(POSITIONS),)),
+])
+
+RULES_PATH = Path(__file__).parent / "mfl_rules.py"
+
+def rules_digest():
+    """sha256 of the scalar rules source, so a corpus records which rules produced it"""
+    return hashlib.sha256(RULES_PATH.read_bytes()).hexdigest()[:32]
+
+def sample_inputs(n_rows, seed=0):
+    """
+    (attributes, primary codes, position masks) for n_rows players: a sweep of
+    edge attributes at every primary position first, then uniform samples of
+    attributes 0-99 and primaries (unknown included), half of them with one
+    to three secondary positions
+    """
+    from engine_parity import edge_attributes
+
+    edges = edge_attributes()
+    primaries = np.arange(UNKNOWN_POSITION + 1, dtype=np.uint8)
+    edge_attrs = np.repeat(edges, len(primaries), axis=0)[:n_rows]
+    edge_primary = np.tile(primaries, len(edges))[:n_rows]
+
+    rng = np.random.default_rng(seed)
+    n_random = n_rows - len(edge_attrs)
+    attributes = np.vstack([edge_attrs, rng.integers(0, 100, size=(n_random, 6), dtype=np.uint8)])
+    primary = np.concatenate([edge_primary, rng.integers(0, UNKNOWN_POSITION + 1, size=n_random).astype(np.uint8)])
+
+    # Secondary slots hold UNKNOWN_POSITION for "none"; a mask of 0 means primary only
+    secondary = rng.integers(0, UNKNOWN_POSITION + 1, size=(n_random, 3))
+    secondary[:, 1:] = np.where(rng.random((n_random, 2)) < 0.5, UNKNOWN_POSITION, secondary[:, 1:])
+    masks = position_masks_from_codes(np.column_stack([primary[len(edge_attrs):], secondary]))
+    masks[rng.random(n_random) < 0.5] = 0
+    masks = np.concatenate([np.zeros(len(edge_attrs), dtype=np.uint16), masks])
+    return attributes, primary, masks
+
+def numpy_engine(attributes, primary_codes, position_masks):
+    """rating_engine.rate_players"""
+    return (rate_players(attributes, primary_codes, position_masks=position_masks),
+            familiarity_levels(primary_codes, position_masks))
+
+ENGINES = {
+    'scalar': scalar_ratings,  # the reference: mfl_rules (what ml_api serves), one call per cell
+    'numpy': numpy_engine,
+}
+
+def resolve_engine(spec):
+    """
+    An engine name from ENGINES or 'module:function'. Engines take (attributes,
+    primary codes, position masks) and return (N, 15) ratings, or a (ratings,
+    familiarity levels) pair to check familiarity as well.
+    """
+    if spec in ENGINES:
+        return ENGINES[spec]
+    if ':' not in spec:
+        raise ValueError(f"Unknown engine {spec!r}: use one of {', '.join(ENGINES)} or module:function")
+    module, function = spec.split(':', 1)
+    return getattr(importlib.import_module(module), function)
+
+def _write_header(f, n_rows, seed, digest):
+    f.write(HEADER.pack(MAGIC, FORMAT_VERSION, HEADER_SIZE, n_rows, seed, digest.encode('ascii')).ljust(HEADER_SIZE, b'\0'))
+
+def read_header(path):
+    with open(path, 'rb') as f:
+        magic, version, header_size, n_rows, seed, digest = HEADER.unpack(f.read(HEADER.size))
+    if magic != MAGIC:
+        raise ValueError(f"{path} is not a golden corpus")
+    if version != FORMAT_VERSION:
+        raise ValueError(f"{path} has corpus format {version}, expected {FORMAT_VERSION}")
+    return {'rows': n_rows, 'seed': seed, 'rules_digest': digest.decode('ascii'), 'header_size': header_size}
+
+def open_corpus(path=DEFAULT_CORPUS_PATH):
+    """(header, read-only memory-mapped records)"""
+    header = read_header(path)
+    records = np.memmap(path, dtype=RECORD_DTYPE, mode='r', offset=header['header_size'], shape=(header['rows'],))
+    return header, records
+
+def _scalar_chunk(attributes, primary, masks):
+    return scalar_ratings(attributes, primary, masks)
+
+def generate_corpus(path=DEFAULT_CORPUS_PATH, n_rows=DEFAULT_ROWS, seed=0, workers=None,
+                    chunk_size=DEFAULT_CHUNK_SIZE):
+    """
+    Sample n_rows players and record the scalar rules' ratings and familiarity
+    for each into path. Chunks are rated across a process pool; the file is
+    written under a temporary name and renamed when complete.
+    """
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    workers = workers or os.cpu_count() or 1
+    attributes, primary, masks = sample_inputs(n_rows, seed)
+
+    with atomic_write(path, 'w+b') as f:
+        _write_header(f, n_rows, seed, rules_digest())
+        f.truncate(HEADER_SIZE + n_rows * RECORD_DTYPE.itemsize)
+        f.flush()
+        records = np.memmap(f, dtype=RECORD_DTYPE, mode='r+', offset=HEADER_SIZE, shape=(n_rows,))
+        records['attributes'] = attributes
+        records['primary_code'] = primary
+        records['position_mask'] = masks
+
+        start = time.perf_counter()
+        done = 0
+        bounds = [(lo, min(lo + chunk_size, n_rows)) for lo in range(0, n_rows, chunk_size)]
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            futures = [pool.submit(_scalar_chunk, attributes[lo:hi], primary[lo:hi], masks[lo:hi])
+                       for lo, hi in bounds]
+            for (lo, hi), future in zip(bounds, futures):
+                ratings, levels = future.result()
+                records['ratings'][lo:hi] = ratings
+                records['familiarity'][lo:hi] = levels
+                done += hi - lo
+                elapsed = time.perf_counter() - start
+                print(f"  {done:,}/{n_rows:,} players ({done / max(elapsed, 1e-9):,.0f} players/s)")
+
+        records.flush()
+        del records
+    print(f"Wrote {n_rows:,} golden players to {path} ({os.path.getsize(path) / 1e6:.1f} MB)")
+    return path
+
+def _check_chunk(path, lo, hi, engine_spec, max_report):
+    """Worker: run the engine on records[lo:hi]; returns (mismatch count, first mismatches)"""
+    _, records = open_corpus(path)
+    chunk = records[lo:hi]
+    expected_levels = chunk['familiarity']
+
+    result = resolve_engine(engine_spec)(np.array(chunk['attributes']), np.array(chunk['primary_code']),
+                                         np.array(chunk['position_mask']))
+    ratings, levels = result if isinstance(result, tuple) else (result, None)
+    ratings = np.asarray(ratings)
+
+    wrong = ratings != chunk['ratings']
+    if levels is not None:
+        wrong |= np.asarray(levels) != expected_levels
+    rows, targets = np.nonzero(wrong)
+
+    first = []
+    for row, t in zip(rows[:max_report], targets[:max_report]):
+        first.append({
+            'row': int(lo + row),
+            'position': POSITIONS[t],
+            'attributes': chunk['attributes'][row].tolist(),
+            'primary': POSITIONS[chunk['primary_code'][row]] if chunk['primary_code'][row] < len(POSITIONS) else '?',
+            'owned': position_names_from_mask(int(chunk['position_mask'][row])),
+            'expected': (int(chunk['ratings'][row, t]), FAMILIARITY_LEVELS[expected_levels[row, t]]),
+            'got': (int(ratings[row, t]), None if levels is None else FAMILIARITY_LEVELS[int(levels[row, t])]),
+        })
+    return len(rows), first
+
+def run_differential(engine_spec='numpy', path=DEFAULT_CORPUS_PATH, workers=None,
+                     chunk_size=DEFAULT_CHUNK_SIZE, max_report=20):
+    """
+    Compare an engine with the golden corpus in parallel chunks.
+    Returns (total mismatched cells, first max_report mismatches in row order).
+    """
+    header = read_header(path)
+    if header['rules_digest'] != rules_digest():
+        print(f"Warning: mfl_rules.py changed since {path} was generated; regenerate it if the change was intended")
+
+    n_rows = header['rows']
+    workers = workers or os.cpu_count() or 1
+    bounds = [(lo, min(lo + chunk_size, n_rows)) for lo in range(0, n_rows, chunk_size)]
+
+    start = time.perf_counter()
+    total, first = 0, []
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        futures = [pool.submit(_check_chunk, str(path), lo, hi, engine_spec, max_report) for lo, hi in bounds]
+        for future in futures:
+            count, mismatches = future.result()
+            total += count
+            first.extend(mismatches[:max_report - len(first)])
+
+    elapsed = time.perf_counter() - start
+    print(f"{engine_spec}: {n_rows:,} players x {len(POSITIONS)} positions in {elapsed:.2f}s "
+          f"({n_rows / max(elapsed, 1e-9):,.0f} players/s), {total} mismatched cells")
+    return total, first
+
+def main():
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Golden corpus of scalar rule outputs and differential engine checks")
+    parser.add_argument('--corpus', default=str(DEFAULT_CORPUS_PATH))
+    parser.add_argument('--workers', type=int, default=None)
+    parser.add_argument('--chunk-size', type=int, default=DEFAULT_CHUNK_SIZE)
+    commands = parser.add_subparsers(dest='command', required=True)
+
+    generate = commands.add_parser('generate', help='Sample players and record the scalar rules')
+    generate.add_argument('--rows', type=int, default=DEFAULT_ROWS)
+    generate.add_argument('--seed', type=int, default=0)
+
+    check = commands.add_parser('check', help='Diff engines against the corpus')
+    check.add_argument('engines', nargs='*', default=['numpy'],
+                       help=f"{', '.join(ENGINES)} or module:function (default: numpy)")
+    check.add_argument('--max-report', type=int, default=20)
+    args = parser.parse_args()
+
+    if args.command == 'generate':
+        generate_corpus(args.corpus, args.rows, args.seed, args.workers, args.chunk_size)
+        return 0
+
+    if not os.path.exists(args.corpus):
+        print(f"Error: {args.corpus} not found! Run 'golden_corpus.py generate' first.")
+        return 1
+
+    failed = False
+    for engine in args.engines:
+        total, first = run_differential(engine, args.corpus, args.workers, args.chunk_size, args.max_report)
+        for mismatch in first:
+            print(f"  row {mismatch['row']} {mismatch['primary']}{'+' + ','.join(mismatch['owned']) if mismatch['owned'] else ''} "
+                  f"{mismatch['attributes']} at {mismatch['position']}: expected {mismatch['expected']}, got {mismatch['got']}")
+        failed |= total > 0
+    return 1 if failed else 0
+
+if __name__ == "__main__":
+    sys.exit(main())
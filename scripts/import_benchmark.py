@@ -0,0 +1,77 @@
+#!/usr/bin/env python3
+"""
+Import Time Benchmark
+Measures cold import time of the Python entry points with -X importtime and fails on budget regressions
+"""
+
+import os
+import re
+import sys
+import subprocess
+import statistics
+
+SCRIPTS_DIR = os.path.dirname(os.path.abspath(__file__))
+
+# module: (cumulative import budget in ms, packages it must not pull in at import)
+BUDGETS = {
+    'mfl_rules': (20, ['numpy', 'pandas', 'sklearn', 'joblib', 'fastapi']),
+    'rating_engine': (250, ['pandas', 'scipy', 'sklearn', 'joblib']),
+    'rule_discovery': (20, ['numpy', 'pandas', 'sklearn', 'matplotlib', 'seaborn']),
+    'maximum_accuracy_strategy': (250, ['pandas', 'sklearn', 'xgboost', 'lightgbm', 'catboost', 'optuna']),
+    'ml_api': (1500, ['pandas', 'scipy', 'sklearn', 'joblib', 'uvicorn']),
+}
+
+IMPORTTIME_LINE = re.compile(r'import time:\s+(\d+) \|\s+(\d+) \|( *)(\S+)')
+
+def measure_import(module, repeats=3):
+    """
+    Median cumulative import time (ms) of module in fresh interpreters,
+    and the set of top-level packages the import pulled in
+    """
+    times, packages = [], set()
+    for _ in range(repeats):
+        result = subprocess.run(
+            [sys.executable, '-X', 'importtime', '-c', f'import {module}'],
+            cwd=SCRIPTS_DIR, capture_output=True, text=True
+        )
+        if result.returncode != 0:
+            raise RuntimeError(f"import {module} failed:\n{result.stderr[-2000:]}")
+
+        cumulative = None
+        for line in result.stderr.splitlines():
+            match = IMPORTTIME_LINE.match(line)
+            if not match:
+                continue
+            name = match.group(4)
+            packages.add(name.split('.')[0])
+            # Top-level imports are indented by exactly one space
+            if name == module and len(match.group(3)) == 1:
+                cumulative = int(match.group(2))
+        if cumulative is None:
+            raise RuntimeError(f"import {module} left no top-level line in the -X importtime output")
+        times.append(cumulative / 1000)
+
+    return statistics.median(times), packages
+
+def run_benchmark(budgets=BUDGETS, repeats=3):
+    """Measure every module; returns a list of failure messages"""
+    failures = []
+    for module, (budget_ms, forbidden) in budgets.items():
+        elapsed_ms, packages = measure_import(module, repeats)
+        pulled_in = sorted(set(forbidden) & packages)
+        status = 'ok' if elapsed_ms <= budget_ms and not pulled_in else 'FAIL'
+        print(f"  {module:<28} {elapsed_ms:8.1f} ms  (budget {budget_ms} ms)  {status}"
+              + (f"  imports {', '.join(pulled_in)}" if pulled_in else ""))
+
+        if elapsed_ms > budget_ms:
+            failures.append(f"{module} imported in {elapsed_ms:.1f} ms, over its {budget_ms} ms budget")
+        if pulled_in:
+            failures.append(f"{module} imports {', '.join(pulled_in)} at module level")
+    return failures
+
+if __name__ == "__main__":
+    print("Cold import times (median of 3 fresh interpreters):")
+    failures = run_benchmark()
+    for failure in failures:
+        print(f"FAIL: {failure}")
+    sys.exit(1 if failures else 0)
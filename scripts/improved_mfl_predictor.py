@@ -6,7 +6,6 @@ Based on actual data testing and MFL whitepaper rules
 
 import pandas as pd
 import numpy as np
-import json
 from sklearn.metrics import mean_absolute_error, r2_score
 
 def calculate_mfl_position_rating(attributes, primary_pos, target_pos):
@@ -194,42 +193,10 @@ def test_improved_predictor():
     """
     print("=== TESTING IMPROVED MFL PREDICTOR ===")
     
-    # Load data
-    df = pd.read_excel('Data/600-player-data-scraped.xlsx')
+    # Load data (inputData attributes are extracted for the whole column at once)
+    from mfl_rule_implementation import load_and_parse_data
     
-    # Extract attributes from JSON
-    players = []
-    for idx, row in df.iterrows():
-        try:
-            input_data = json.loads(row['inputData'])
-            player_data = input_data['player']['metadata']
-            
-            player = {
-                'name': row['name'],
-                'id': row['id'],
-                'primary': row['primary'],
-                'secondary': row['secondary'] if pd.notna(row['secondary']) else None,
-                'PAC': player_data['pace'],
-                'SHO': player_data['shooting'],
-                'PAS': player_data['passing'],
-                'DRI': player_data['dribbling'],
-                'DEF': player_data['defense'],
-                'PHY': player_data['physical'],
-                'overall': player_data['overall']
-            }
-            
-            # Add position ratings
-            positions = ['ST', 'CF', 'CAM', 'RW', 'LW', 'RM', 'LM', 'CM', 'CDM', 'RWB', 'LWB', 'RB', 'LB', 'CB', 'GK']
-            for pos in positions:
-                if pd.notna(row[pos]):
-                    player[f'{pos}_actual'] = row[pos]
-            
-            players.append(player)
-            
-        except Exception as e:
-            continue
-    
-    df_parsed = pd.DataFrame(players)
+    df_parsed = load_and_parse_data()
     print(f"Loaded {len(df_parsed)} players")
     
     # Test positions
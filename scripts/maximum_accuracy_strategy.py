@@ -5,13 +5,53 @@ Target: 90-95% accuracy (realistic maximum)
 """
 
 import numpy as np
-import pandas as pd
-from sklearn.ensemble import VotingRegressor
-from sklearn.model_selection import StratifiedKFold
-import xgboost as xgb
-import lightgbm as lgb
-from catboost import CatBoostRegressor
-import optuna
+
+# The boosting libraries, optuna and pandas are imported inside the phases that
+# use them, so printing the plan does not pay for (or require) the ML stack
+
+def create_super_ensemble():
+    """Create ensemble of multiple model types"""
+    import xgboost as xgb
+    import lightgbm as lgb
+    from catboost import CatBoostRegressor
+    from sklearn.ensemble import VotingRegressor
+
+    models = {
+        'xgb1': xgb.XGBRegressor(n_estimators=1000, max_depth=8, learning_rate=0.05),
+        'xgb2': xgb.XGBRegressor(n_estimators=500, max_depth=12, learning_rate=0.1),
+        'lgb1': lgb.LGBMRegressor(n_estimators=1000, max_depth=8, learning_rate=0.05),
+        'lgb2': lgb.LGBMRegressor(n_estimators=500, max_depth=12, learning_rate=0.1),
+        'cat1': CatBoostRegressor(iterations=1000, depth=8, learning_rate=0.05, verbose=False),
+        'cat2': CatBoostRegressor(iterations=500, depth=12, learning_rate=0.1, verbose=False),
+    }
+
+    # Create voting ensemble
+    ensemble = VotingRegressor(
+        estimators=[(name, model) for name, model in models.items()],
+        weights=[1, 1, 1, 1, 1, 1]  # Equal weights initially
+    )
+
+    return ensemble
+
+def distill_super_ensemble(attributes, ratings, positions, featurize=None, student_dir=None):
+    """
+    Train the super ensemble per position on 80% of the players, then distill
+    it into compact students (model_distillation --teacher super runs this)
+    """
+    from sklearn.model_selection import train_test_split
+    from model_distillation import distill_teachers, default_featurize, STUDENT_DIR
+
+    featurize = featurize or default_featurize
+    train_rows, eval_rows = train_test_split(np.arange(len(attributes)), test_size=0.2, random_state=42)
+    train_features = featurize(attributes[train_rows])
+
+    teachers = {}
+    for i, pos in enumerate(positions):
+        teachers[pos] = create_super_ensemble().fit(train_features, ratings[train_rows, i])
+
+    eval_targets = {pos: ratings[eval_rows, i] for i, pos in enumerate(positions)}
+    return distill_teachers(teachers, attributes[train_rows], attributes[eval_rows], eval_targets,
+                            featurize=featurize, student_dir=student_dir or STUDENT_DIR)
 
 def maximum_accuracy_pipeline():
     """
@@ -33,91 +73,11 @@ def maximum_accuracy_pipeline():
     print("Target: 100+ engineered features")
     
     def create_maximum_features(PAC, SHO, PAS, DRI, DEF, PHY):
-        """Create maximum possible features"""
-        
-        # Base features
-        base = [PAC, SHO, PAS, DRI, DEF, PHY]
+        """Create maximum possible features for one player (see feature_generator for batches)"""
+        from feature_generator import maximum_features
         
-        # Statistical features
-        stats = [
-            np.mean([PAC, SHO, PAS, DRI, DEF, PHY]),
-            np.std([PAC, SHO, PAS, DRI, DEF, PHY]),
-            np.var([PAC, SHO, PAS, DRI, DEF, PHY]),
-            np.max([PAC, SHO, PAS, DRI, DEF, PHY]),
-            np.min([PAC, SHO, PAS, DRI, DEF, PHY]),
-            np.ptp([PAC, SHO, PAS, DRI, DEF, PHY]),  # range
-            np.percentile([PAC, SHO, PAS, DRI, DEF, PHY], 25),
-            np.percentile([PAC, SHO, PAS, DRI, DEF, PHY], 75),
-            np.median([PAC, SHO, PAS, DRI, DEF, PHY])
-        ]
-        
-        # Polynomial features (up to 3rd degree)
-        poly_features = []
-        for attr in [PAC, SHO, PAS, DRI, DEF, PHY]:
-            poly_features.extend([attr**2, attr**3])
-        
-        # Interaction features (all pairwise combinations)
-        interactions = []
-        attrs = [PAC, SHO, PAS, DRI, DEF, PHY]
-        for i in range(len(attrs)):
-            for j in range(i+1, len(attrs)):
-                interactions.append(attrs[i] * attrs[j] / 100)
-                interactions.append(attrs[i] / (attrs[j] + 1))  # Avoid division by zero
-        
-        # Position-specific features (15 positions × 6 attributes)
-        position_features = []
-        positions = ['LB', 'CB', 'RB', 'LWB', 'RWB', 'CDM', 'CM', 'CAM', 'LM', 'RM', 'CF', 'ST', 'LW', 'RW', 'GK']
-        
-        for pos in positions:
-            if pos == 'GK':
-                pos_score = DEF * 0.4 + PHY * 0.3 + PAS * 0.2 + PAC * 0.05 + SHO * 0.03 + DRI * 0.02
-            elif pos == 'CB':
-                pos_score = DEF * 0.6 + PHY * 0.2 + PAS * 0.1 + PAC * 0.05 + SHO * 0.02 + DRI * 0.03
-            elif pos in ['LB', 'RB']:
-                pos_score = PAC * 0.2 + PAS * 0.25 + DEF * 0.25 + DRI * 0.15 + PHY * 0.1 + SHO * 0.05
-            elif pos in ['LWB', 'RWB']:
-                pos_score = PAC * 0.3 + PAS * 0.25 + DRI * 0.25 + DEF * 0.1 + PHY * 0.05 + SHO * 0.05
-            elif pos == 'CDM':
-                pos_score = PAS * 0.3 + DEF * 0.25 + DRI * 0.15 + PAC * 0.15 + PHY * 0.1 + SHO * 0.05
-            elif pos == 'CM':
-                pos_score = PAS * 0.35 + DRI * 0.25 + PAC * 0.2 + SHO * 0.1 + DEF * 0.05 + PHY * 0.05
-            elif pos == 'CAM':
-                pos_score = PAS * 0.3 + DRI * 0.25 + SHO * 0.25 + PAC * 0.15 + DEF * 0.0 + PHY * 0.05
-            elif pos in ['LM', 'RM']:
-                pos_score = PAC * 0.3 + PAS * 0.25 + DRI * 0.25 + SHO * 0.1 + DEF * 0.05 + PHY * 0.05
-            elif pos in ['LW', 'RW']:
-                pos_score = PAC * 0.25 + DRI * 0.3 + SHO * 0.2 + PAS * 0.2 + DEF * 0.0 + PHY * 0.05
-            elif pos == 'CF':
-                pos_score = SHO * 0.4 + DRI * 0.25 + PAS * 0.2 + PAC * 0.1 + DEF * 0.02 + PHY * 0.03
-            elif pos == 'ST':
-                pos_score = SHO * 0.5 + PAC * 0.25 + DRI * 0.15 + PAS * 0.1
-            else:
-                pos_score = (PAC + SHO + PAS + DRI + DEF + PHY) / 6
-            
-            position_features.append(pos_score)
-        
-        # Advanced combinations
-        advanced = [
-            # Skill ratios
-            (SHO + PAS + DRI) / (DEF + PHY + 1),
-            (PAC + DRI) / (SHO + PAS + 1),
-            (DEF + PHY) / (PAS + DRI + 1),
-            
-            # Specialized scores
-            (SHO * 0.6 + PAC * 0.3 + DRI * 0.1),  # Striker potential
-            (PAS * 0.5 + DRI * 0.3 + SHO * 0.2),  # Playmaker potential
-            (DEF * 0.6 + PHY * 0.3 + PAS * 0.1),  # Defender potential
-            (PAC * 0.4 + DRI * 0.3 + SHO * 0.2 + PAS * 0.1),  # Winger potential
-            
-            # Consistency measures
-            np.std([PAC, SHO, PAS, DRI, DEF, PHY]) / np.mean([PAC, SHO, PAS, DRI, DEF, PHY]),
-            
-            # Overall rating
-            (PAC + SHO + PAS + DRI + DEF + PHY) / 6
-        ]
-        
-        all_features = base + stats + poly_features + interactions + position_features + advanced
-        return np.array(all_features)
+        features, _ = maximum_features([[PAC, SHO, PAS, DRI, DEF, PHY]], dtype=np.float64)
+        return features[0]
     
     print(f"Total features: {len(create_maximum_features(80, 75, 82, 78, 45, 70))}")
     
@@ -125,25 +85,10 @@ def maximum_accuracy_pipeline():
     print("\n=== PHASE 3: ENSEMBLE OF ENSEMBLES ===")
     print("Target: 10+ different model types")
     
-    def create_super_ensemble():
-        """Create ensemble of multiple model types"""
-        
-        models = {
-            'xgb1': xgb.XGBRegressor(n_estimators=1000, max_depth=8, learning_rate=0.05),
-            'xgb2': xgb.XGBRegressor(n_estimators=500, max_depth=12, learning_rate=0.1),
-            'lgb1': lgb.LGBMRegressor(n_estimators=1000, max_depth=8, learning_rate=0.05),
-            'lgb2': lgb.LGBMRegressor(n_estimators=500, max_depth=12, learning_rate=0.1),
-            'cat1': CatBoostRegressor(iterations=1000, depth=8, learning_rate=0.05, verbose=False),
-            'cat2': CatBoostRegressor(iterations=500, depth=12, learning_rate=0.1, verbose=False),
-        }
-        
-        # Create voting ensemble
-        ensemble = VotingRegressor(
-            estimators=[(name, model) for name, model in models.items()],
-            weights=[1, 1, 1, 1, 1, 1]  # Equal weights initially
-        )
-        
-        return ensemble
+    # 3b. DISTILLATION
+    print("\n=== PHASE 3b: DISTILLATION ===")
+    print("Target: serve a compact student per position, not the super ensemble")
+    print("Run: python scripts/model_distillation.py --teacher super")
     
     # 4. ADVANCED VALIDATION
     print("\n=== PHASE 4: ADVANCED VALIDATION ===")
@@ -151,6 +96,8 @@ def maximum_accuracy_pipeline():
     
     def advanced_validation(X, y):
         """Advanced validation strategy"""
+        import pandas as pd
+        from sklearn.model_selection import StratifiedKFold
         
         # Stratified k-fold (stratify by overall rating bins)
         overall_ratings = (X[:, 0] + X[:, 1] + X[:, 2] + X[:, 3] + X[:, 4] + X[:, 5]) / 6
@@ -180,6 +127,9 @@ def maximum_accuracy_pipeline():
     
     def optimize_hyperparameters(X, y):
         """Optimize hyperparameters with Optuna"""
+        import optuna
+        import xgboost as xgb
+        from sklearn.model_selection import cross_val_score
         
         def objective(trial):
             # XGBoost parameters
@@ -224,6 +174,7 @@ def maximum_accuracy_pipeline():
         'data_target': '10,000+ players',
         'feature_target': '100+ features',
         'model_target': '10+ model types',
+        'serving_target': 'Distilled per-position students',
         'validation_target': '10-fold stratified CV',
         'optimization_target': '1000+ trials',
         'learning_target': 'Weekly retraining'
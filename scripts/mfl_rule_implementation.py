@@ -6,9 +6,10 @@ Tests deterministic MFL rules against actual player data
 
 import pandas as pd
 import numpy as np
-import json
 from sklearn.metrics import mean_absolute_error, r2_score
 
+from input_data_extractor import extract_player_fields, write_rejected_rows, rejected_rows_path
+
 def load_and_parse_data():
     """
     Load the MFL player data and extract attributes
@@ -16,44 +17,30 @@ def load_and_parse_data():
     print("Loading MFL player data...")
     
     # Load the Excel file
-    df = pd.read_excel('Data/600-player-data-scraped.xlsx')
-    
-    # Extract attributes from JSON
-    players = []
-    for idx, row in df.iterrows():
-        try:
-            # Parse JSON data
-            input_data = json.loads(row['inputData'])
-            player_data = input_data['player']['metadata']
-            
-            # Extract attributes
-            player = {
-                'name': row['name'],
-                'id': row['id'],
-                'primary': row['primary'],
-                'secondary': row['secondary'] if pd.notna(row['secondary']) else None,
-                'PAC': player_data['pace'],
-                'SHO': player_data['shooting'],
-                'PAS': player_data['passing'],
-                'DRI': player_data['dribbling'],
-                'DEF': player_data['defense'],
-                'PHY': player_data['physical'],
-                'overall': player_data['overall']
-            }
-            
-            # Add position ratings
-            positions = ['ST', 'CF', 'CAM', 'RW', 'LW', 'RM', 'LM', 'CM', 'CDM', 'RWB', 'LWB', 'RB', 'LB', 'CB', 'GK']
-            for pos in positions:
-                if pd.notna(row[pos]):
-                    player[f'{pos}_actual'] = row[pos]
-            
-            players.append(player)
-            
-        except Exception as e:
-            print(f"Error parsing player {row['name']}: {e}")
-            continue
+    excel_path = 'Data/600-player-data-scraped.xlsx'
+    df = pd.read_excel(excel_path)
+    
+    # Extract attributes from the inputData JSON for the whole column at once
+    fields, valid, rejects = extract_player_fields(df['inputData'], n_jobs=None)
+    write_rejected_rows(rejects, rejected_rows_path(excel_path), ids=df['id'].tolist(), source=excel_path)
+    df_valid = df[valid].reset_index(drop=True)
+    
+    players = pd.DataFrame({
+        'name': df_valid['name'],
+        'id': df_valid['id'],
+        'primary': df_valid['primary'],
+        'secondary': df_valid['secondary'].where(df_valid['secondary'].notna(), None),
+    })
+    for i, attr in enumerate(['PAC', 'SHO', 'PAS', 'DRI', 'DEF', 'PHY', 'overall']):
+        players[attr] = fields[valid, i].astype(int)
+    
+    # Add position ratings (NaN where the scrape has none)
+    positions = ['ST', 'CF', 'CAM', 'RW', 'LW', 'RM', 'LM', 'CM', 'CDM', 'RWB', 'LWB', 'RB', 'LB', 'CB', 'GK']
+    for pos in positions:
+        if pos in df_valid and df_valid[pos].notna().any():
+            players[f'{pos}_actual'] = df_valid[pos]
     
-    return pd.DataFrame(players)
+    return players
 
 def create_mfl_familiarity_matrix():
     """
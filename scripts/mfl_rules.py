@@ -0,0 +1,237 @@
+#!/usr/bin/env python3
+"""
+MFL Deterministic Position Rating Rules
+Pure-Python core of the rating rules, importable without numpy or the ML stack
+"""
+
+POSITIONS = ['LB', 'CB', 'RB', 'LWB', 'RWB', 'CDM', 'CM', 'CAM',
+             'LM', 'RM', 'CF', 'ST', 'LW', 'RW', 'GK']
+
+# Most familiar first
+FAMILIARITY_ORDER = ['Primary', 'Secondary', 'Fairly Familiar', 'Somewhat Familiar', 'Unfamiliar']
+
+def calculate_mfl_position_rating(attributes, primary_pos, target_pos, secondary_positions=()):
+    """
+    Calculate position rating using MFL deterministic rules.
+    secondary_positions: the player's other positions, which can lift familiarity
+    """
+    PAC, SHO, PAS, DRI, DEF, PHY = attributes
+    
+    # Special handling for goalkeepers
+    if target_pos == 'GK':
+        return calculate_gk_rating(attributes, primary_pos)
+    
+    # Get familiarity level
+    familiarity = get_player_familiarity_level(primary_pos, target_pos, secondary_positions)
+    
+    # Apply familiarity penalty
+    penalty = get_familiarity_penalty(familiarity)
+    
+    # Calculate base position rating using MFL rules
+    base_rating = calculate_base_position_rating(attributes, target_pos)
+    
+    # Apply penalty
+    final_rating = base_rating + penalty
+    
+    # Ensure rating is within bounds (1-99)
+    final_rating = max(1, min(99, int(final_rating)))
+    
+    return final_rating, familiarity, penalty
+
+def calculate_gk_rating(attributes, primary_pos):
+    """
+    Special calculation for goalkeeper ratings using exact MFL formula
+    """
+    PAC, SHO, PAS, DRI, DEF, PHY = attributes
+    
+    # Use exact MFL GK formula: 100% GK attribute
+    # GK attribute is calculated as: DEF * 0.6 + PHY * 0.3 + PAS * 0.1
+    gk_rating = (DEF * 0.6 + PHY * 0.3 + PAS * 0.1)
+    
+    # If primary position is GK, use full rating
+    if primary_pos == 'GK':
+        return int(gk_rating), 'Primary', 0
+    
+    # For non-GK players, apply heavy penalty
+    # Most outfield players are terrible goalkeepers
+    gk_rating = gk_rating - 50  # Heavy penalty
+    gk_rating = max(1, min(99, int(gk_rating)))
+    
+    return gk_rating, 'Unfamiliar', -50
+
+def get_familiarity_level(primary_pos, target_pos):
+    """Get familiarity level between positions"""
+    if primary_pos == target_pos:
+        return 'Primary'
+    elif target_pos in get_secondary_positions(primary_pos):
+        return 'Secondary'
+    elif target_pos in get_fairly_familiar_positions(primary_pos):
+        return 'Fairly Familiar'
+    elif target_pos in get_somewhat_familiar_positions(primary_pos):
+        return 'Somewhat Familiar'
+    else:
+        return 'Unfamiliar'
+
+def get_player_familiarity_level(primary_pos, target_pos, secondary_positions=(), familiarity_level=None):
+    """
+    Best familiarity with target_pos across the primary position and the
+    player's own secondary positions; a secondary position is at most Secondary.
+    familiarity_level: (position, target) -> level map to use, get_familiarity_level by default
+    """
+    familiarity_level = familiarity_level or get_familiarity_level
+    levels = [familiarity_level(primary_pos, target_pos)]
+    for position in secondary_positions:
+        if position == primary_pos:
+            continue
+        level = familiarity_level(position, target_pos)
+        levels.append('Secondary' if level == 'Primary' else level)
+    return min(levels, key=FAMILIARITY_ORDER.index)
+
+def get_secondary_positions(primary_pos):
+    """Get secondary positions for a given primary position"""
+    # Based on MFL whitepaper, secondary positions are more restrictive
+    # Most players only have 1-2 secondary positions, not many
+    secondary_map = {
+        'ST': ['CF'],  # Striker can play Center Forward
+        'CF': ['ST'],  # Center Forward can play Striker
+        'LW': ['LM'],  # Left Winger can play Left Midfielder
+        'RW': ['RM'],  # Right Winger can play Right Midfielder
+        'CAM': ['CM'],  # Central Attacking Midfielder can play Central Midfielder
+        'LM': ['LW'],  # Left Midfielder can play Left Winger
+        'RM': ['RW'],  # Right Midfielder can play Right Winger
+        'CM': ['CAM', 'CDM'],  # Central Midfielder can play CAM or CDM
+        'CDM': ['CM'],  # Central Defensive Midfielder can play Central Midfielder
+        'CB': ['CDM'],  # Center Back can play Central Defensive Midfielder
+        'LWB': ['LB'],  # Left Wing Back can play Left Back
+        'RWB': ['RB'],  # Right Wing Back can play Right Back
+        'LB': ['LWB'],  # Left Back can play Left Wing Back
+        'RB': ['RWB'],  # Right Back can play Right Wing Back
+        'GK': []  # Goalkeepers typically have no secondary positions
+    }
+    return secondary_map.get(primary_pos, [])
+
+def get_fairly_familiar_positions(primary_pos):
+    """Get fairly familiar positions"""
+    # More restrictive - only positions that are reasonably similar
+    fairly_familiar_map = {
+        'ST': ['LW', 'RW'],  # Strikers can play wing positions
+        'CF': ['CAM'],  # Center Forwards can play CAM
+        'LW': ['ST'],  # Left Wingers can play Striker
+        'RW': ['ST'],  # Right Wingers can play Striker
+        'CAM': ['CF'],  # CAM can play Center Forward
+        'LM': ['LW'],  # Left Midfielder can play Left Winger
+        'RM': ['RW'],  # Right Midfielder can play Right Winger
+        'CM': ['CAM'],  # Central Midfielder can play CAM
+        'CDM': ['CB'],  # CDM can play Center Back
+        'CB': ['CDM'],  # Center Back can play CDM
+        'LWB': ['LM'],  # Left Wing Back can play Left Midfielder
+        'RWB': ['RM'],  # Right Wing Back can play Right Midfielder
+        'LB': ['CB'],  # Left Back can play Center Back
+        'RB': ['CB'],  # Right Back can play Center Back
+        'GK': []  # Goalkeepers have no fairly familiar positions
+    }
+    return fairly_familiar_map.get(primary_pos, [])
+
+def get_somewhat_familiar_positions(primary_pos):
+    """Get somewhat familiar positions"""
+    # Very restrictive - only positions that are somewhat related
+    somewhat_familiar_map = {
+        'ST': ['CAM'],  # Strikers can somewhat play CAM
+        'CF': ['LW', 'RW'],  # Center Forwards can somewhat play wings
+        'LW': ['CAM'],  # Left Wingers can somewhat play CAM
+        'RW': ['CAM'],  # Right Wingers can somewhat play CAM
+        'CAM': ['LW', 'RW'],  # CAM can somewhat play wings
+        'LM': ['CAM'],  # Left Midfielder can somewhat play CAM
+        'RM': ['CAM'],  # Right Midfielder can somewhat play CAM
+        'CM': ['LW', 'RW'],  # Central Midfielder can somewhat play wings
+        'CDM': ['LB', 'RB'],  # CDM can somewhat play full backs
+        'CB': ['LWB', 'RWB'],  # Center Back can somewhat play wing backs
+        'LWB': ['CAM'],  # Left Wing Back can somewhat play CAM
+        'RWB': ['CAM'],  # Right Wing Back can somewhat play CAM
+        'LB': ['LWB'],  # Left Back can somewhat play Left Wing Back
+        'RB': ['RWB'],  # Right Back can somewhat play Right Wing Back
+        'GK': []  # Goalkeepers have no somewhat familiar positions
+    }
+    return somewhat_familiar_map.get(primary_pos, [])
+
+def get_familiarity_penalty(familiarity):
+    """Get penalty for familiarity level based on MFL whitepaper"""
+    penalties = {
+        'Primary': 0,
+        'Secondary': -1,
+        'Fairly Familiar': -5,
+        'Somewhat Familiar': -8,
+        'Unfamiliar': -20
+    }
+    return penalties.get(familiarity, -20)
+
+def calculate_base_position_rating(attributes, position):
+    """
+    Calculate base position rating using MFL rules
+    Based on actual data testing results
+    """
+    PAC, SHO, PAS, DRI, DEF, PHY = attributes
+    
+    # EXACT MFL attribute weightings from the official table
+    position_weights = {
+        # Forwards (Category F)
+        'ST': {'PAS': 0.10, 'SHO': 0.46, 'DEF': 0.00, 'DRI': 0.29, 'PAC': 0.10, 'PHY': 0.05, 'GK': 0.00},
+        'CF': {'PAS': 0.24, 'SHO': 0.23, 'DEF': 0.00, 'DRI': 0.40, 'PAC': 0.13, 'PHY': 0.00, 'GK': 0.00},
+        'LW': {'PAS': 0.24, 'SHO': 0.23, 'DEF': 0.00, 'DRI': 0.40, 'PAC': 0.13, 'PHY': 0.00, 'GK': 0.00},
+        'RW': {'PAS': 0.24, 'SHO': 0.23, 'DEF': 0.00, 'DRI': 0.40, 'PAC': 0.13, 'PHY': 0.00, 'GK': 0.00},
+        'CAM': {'PAS': 0.34, 'SHO': 0.21, 'DEF': 0.00, 'DRI': 0.38, 'PAC': 0.07, 'PHY': 0.00, 'GK': 0.00},
+        
+        # Midfielders (Category M)
+        'CM': {'PAS': 0.43, 'SHO': 0.12, 'DEF': 0.10, 'DRI': 0.29, 'PAC': 0.00, 'PHY': 0.06, 'GK': 0.00},
+        'LM': {'PAS': 0.43, 'SHO': 0.12, 'DEF': 0.10, 'DRI': 0.29, 'PAC': 0.00, 'PHY': 0.06, 'GK': 0.00},
+        'RM': {'PAS': 0.43, 'SHO': 0.12, 'DEF': 0.10, 'DRI': 0.29, 'PAC': 0.00, 'PHY': 0.06, 'GK': 0.00},
+        'CDM': {'PAS': 0.28, 'SHO': 0.00, 'DEF': 0.40, 'DRI': 0.17, 'PAC': 0.00, 'PHY': 0.15, 'GK': 0.00},
+        
+        # Defenders (Category D)
+        'LWB': {'PAS': 0.19, 'SHO': 0.00, 'DEF': 0.44, 'DRI': 0.17, 'PAC': 0.10, 'PHY': 0.10, 'GK': 0.00},
+        'RWB': {'PAS': 0.19, 'SHO': 0.00, 'DEF': 0.44, 'DRI': 0.17, 'PAC': 0.10, 'PHY': 0.10, 'GK': 0.00},
+        'LB': {'PAS': 0.19, 'SHO': 0.00, 'DEF': 0.44, 'DRI': 0.17, 'PAC': 0.10, 'PHY': 0.10, 'GK': 0.00},
+        'RB': {'PAS': 0.19, 'SHO': 0.00, 'DEF': 0.44, 'DRI': 0.17, 'PAC': 0.10, 'PHY': 0.10, 'GK': 0.00},
+        'CB': {'PAS': 0.05, 'SHO': 0.00, 'DEF': 0.64, 'DRI': 0.09, 'PAC': 0.02, 'PHY': 0.20, 'GK': 0.00},
+        
+        # Goalkeeper (Category GK)
+        'GK': {'PAS': 0.00, 'SHO': 0.00, 'DEF': 0.00, 'DRI': 0.00, 'PAC': 0.00, 'PHY': 0.00, 'GK': 1.00}
+    }
+    
+    weights = position_weights.get(position, {})
+    
+    # Calculate weighted rating
+    rating = 0
+    for attr, weight in weights.items():
+        if attr == 'PAC':
+            rating += PAC * weight
+        elif attr == 'SHO':
+            rating += SHO * weight
+        elif attr == 'PAS':
+            rating += PAS * weight
+        elif attr == 'DRI':
+            rating += DRI * weight
+        elif attr == 'DEF':
+            rating += DEF * weight
+        elif attr == 'PHY':
+            rating += PHY * weight
+        elif attr == 'GK':
+            # For GK attribute, we need to calculate a goalkeeper rating
+            # This would typically be based on goalkeeping-specific attributes
+            # For now, we'll use a combination of DEF, PHY, and PAS as goalkeeping attributes
+            gk_rating = (DEF * 0.6 + PHY * 0.3 + PAS * 0.1)
+            rating += gk_rating * weight
+    
+    return round(rating)
+
+def calculate_all_position_ratings(attributes, primary_pos, secondary_positions=()):
+    """{position: (rating, familiarity, penalty)} for every position"""
+    return {
+        position: calculate_mfl_position_rating(attributes, primary_pos, position, secondary_positions)
+        for position in POSITIONS
+    }
+
+if __name__ == "__main__":
+    for position, (rating, familiarity, penalty) in calculate_all_position_ratings([75, 68, 72, 80, 45, 66], 'LW',
+                                                                                   ['ST']).items():
+        print(f"{position:<4} {rating:>3}  {familiarity} ({penalty:+d})")
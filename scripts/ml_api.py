@@ -6,17 +6,24 @@ FastAPI backend for ML position rating predictions
 import os
 import sys
 import json
-import joblib
 import numpy as np
 from fastapi import FastAPI, HTTPException
 from fastapi.middleware.cors import CORSMiddleware
-from pydantic import BaseModel
-from typing import List, Dict, Any
-import uvicorn
+from pydantic import BaseModel, conint
+from typing import List, Dict, Any, Optional
 
 # Add the current directory to Python path
 sys.path.append(os.path.dirname(os.path.abspath(__file__)))
 
+# The deterministic rules live in the dependency-free core module
+from mfl_rules import (
+    calculate_mfl_position_rating, calculate_gk_rating, calculate_base_position_rating,
+    get_familiarity_level, get_familiarity_penalty, get_secondary_positions,
+    get_fairly_familiar_positions, get_somewhat_familiar_positions,
+)
+# Shared with scoring_worker, which must not import the API
+from engineered_features import create_engineered_features
+
 app = FastAPI(title="MFL Position Rating ML API", version="1.0.0")
 
 # Add CORS middleware
@@ -33,8 +40,26 @@ models = {}
 scalers = {}
 positions = []
 
+# Blended per-position ensembles (scripts/stacking_ensemble.py), when trained
+ensembles = {}
+
+# Concurrent /position-ratings calls are scored together: the batch closes after
+# COALESCE_WINDOW_MS or COALESCE_MAX_BATCH requests, whichever comes first
+COALESCE_WINDOW_MS = float(os.environ.get('COALESCE_WINDOW_MS', 2))
+COALESCE_MAX_BATCH = int(os.environ.get('COALESCE_MAX_BATCH', 256))
+position_rating_coalescer = None
+
+# Player similarity index and query engine, built from the cached dataset on first use
+similarity_index = None
+query_engine = None
+
+# Snapshot rating matrix published by scripts/rating_matrix.py, shared by every worker
+rating_matrix = None
+
 def load_models():
     """Load all trained models and scalers"""
+    import joblib
+
     global models, scalers, positions
     
     model_dir = os.path.join(os.path.dirname(__file__), "models")
@@ -55,15 +80,24 @@ def load_models():
             print(f"Loaded model for {position}")
         else:
             print(f"Warning: Missing model files for {position}")
+    
+    # Load blended ensembles, if any have been trained
+    from stacking_ensemble import load_position_ensembles
+    ensembles.update(load_position_ensembles(positions, os.path.join(model_dir, "ensembles")))
+    if ensembles:
+        print(f"Loaded ensembles for {', '.join(ensembles)}")
 
 # Pydantic models for request/response
+# Attributes are on the game's 0-99 scale; anything else is rejected before it reaches a batch
+Attribute = conint(ge=0, le=99)
+
 class PlayerAttributes(BaseModel):
-    PAC: int  # Pace
-    SHO: int  # Shooting
-    PAS: int  # Passing
-    DRI: int  # Dribbling
-    DEF: int  # Defense
-    PHY: int  # Physical
+    PAC: Attribute  # Pace
+    SHO: Attribute  # Shooting
+    PAS: Attribute  # Passing
+    DRI: Attribute  # Dribbling
+    DEF: Attribute  # Defense
+    PHY: Attribute  # Physical
 
 class PositionRating(BaseModel):
     position: str
@@ -81,71 +115,166 @@ class PredictionResponse(BaseModel):
     bestPosition: str
     top3Positions: List[str]
 
-def create_engineered_features(attributes: PlayerAttributes) -> np.ndarray:
-    """Create enhanced engineered features from player attributes for MFL"""
-    PAC, SHO, PAS, DRI, DEF, PHY = (
-        attributes.PAC, attributes.SHO, attributes.PAS,
-        attributes.DRI, attributes.DEF, attributes.PHY
-    )
-    
-    # Base features
-    base_features = [PAC, SHO, PAS, DRI, DEF, PHY]
-    
-    # Enhanced attacking combinations
-    attacking_score = (SHO + DRI + PAC) / 3
-    finishing_score = (SHO + DRI) / 2
-    goal_scoring_potential = (SHO * 0.6 + PAC * 0.3 + DRI * 0.1)
-    
-    # Enhanced defensive combinations
-    defensive_score = (DEF + PHY) / 2
-    marking_score = (DEF + PAC) / 2
-    center_back_potential = (DEF * 0.7 + PHY * 0.2 + PAS * 0.1)
-    full_back_potential = (PAC * 0.3 + DEF * 0.3 + PAS * 0.25 + DRI * 0.15)
-    
-    # Enhanced midfield combinations
-    playmaking_score = (PAS + DRI) / 2
-    box_to_box_score = (PAS + DEF + PHY) / 3
-    central_midfield_potential = (PAS * 0.4 + DRI * 0.25 + DEF * 0.2 + PAC * 0.15)
-    
-    # Enhanced wing play combinations
-    wing_score = (PAC + DRI) / 2
-    crossing_score = (PAS + PAC) / 2
-    wing_back_potential = (PAC * 0.35 + PAS * 0.25 + DRI * 0.25 + DEF * 0.15)
-    winger_potential = (PAC * 0.3 + DRI * 0.3 + SHO * 0.2 + PAS * 0.2)
-    
-    # Enhanced physical and aerial combinations
-    aerial_score = (PHY + DEF) / 2
-    physical_dominance = (PHY * 0.6 + DEF * 0.4)
-    speed_potential = (PAC * 0.8 + DRI * 0.2)
-    
-    # Position-specific combinations for MFL
-    # LWB/RWB specific features
-    wing_back_offensive = (PAC * 0.3 + PAS * 0.3 + DRI * 0.25 + SHO * 0.15)
-    wing_back_defensive = (DEF * 0.4 + PAC * 0.3 + PAS * 0.2 + PHY * 0.1)
-    
-    # CB specific features
-    center_back_defensive = (DEF * 0.6 + PHY * 0.25 + PAS * 0.15)
-    center_back_aerial = (PHY * 0.5 + DEF * 0.4 + PAC * 0.1)
-    
-    # CDM specific features
-    defensive_midfield = (DEF * 0.4 + PAS * 0.3 + PHY * 0.2 + DRI * 0.1)
-    
-    # Add all enhanced engineered features
-    engineered = [
-        attacking_score, finishing_score, goal_scoring_potential,
-        defensive_score, marking_score, center_back_potential, full_back_potential,
-        playmaking_score, box_to_box_score, central_midfield_potential,
-        wing_score, crossing_score, wing_back_potential, winger_potential,
-        aerial_score, physical_dominance, speed_potential,
-        # MFL-specific features
-        wing_back_offensive, wing_back_defensive,
-        center_back_defensive, center_back_aerial,
-        defensive_midfield
+class EnsembleRequest(BaseModel):
+    players: List[PlayerAttributes]
+
+class EnsembleResponse(BaseModel):
+    positions: List[str]
+    ratings: List[Dict[str, float]]  # one {position: predicted rating} per player
+
+class SimilarPlayer(BaseModel):
+    id: int
+    name: str
+    primaryPosition: str
+    distance: float
+
+class SimilarPlayersResponse(BaseModel):
+    playerId: int
+    position: Optional[str] = None
+    players: List[SimilarPlayer]
+
+class PlayerRatingsResponse(BaseModel):
+    playerId: int
+    generation: int
+    snapshotVersion: int
+    ratings: Dict[str, int]
+
+class RangeFilter(BaseModel):
+    min: Optional[int] = None
+    max: Optional[int] = None
+
+class PlayerQueryRequest(BaseModel):
+    filters: Dict[str, RangeFilter] = {}  # e.g. {"DEF": {"min": 80}, "CB": {"min": 70}}
+    positions: List[str] = []
+    primaryOnly: bool = False
+    sortBy: str = 'overall'
+    descending: bool = True
+    page: int = 1
+    pageSize: int = 25
+
+class PlayerQueryResponse(BaseModel):
+    total: int
+    page: int
+    pageSize: int
+    players: List[Dict[str, Any]]
+
+class DeltaRange(BaseModel):
+    min: int = 0
+    max: int = 0
+    step: int = 1
+
+class SimulationTarget(BaseModel):
+    position: str
+    rating: int
+    costs: Dict[str, float] = {}  # cost per attribute point, default 1
+
+class SimulationRequest(BaseModel):
+    attributes: PlayerAttributes
+    positions: List[str]
+    deltas: Dict[str, DeltaRange]  # e.g. {"PAS": {"min": 0, "max": 3}, "DEF": {"max": 2}}
+    target: Optional[SimulationTarget] = None
+
+class UpgradeStep(BaseModel):
+    attribute: str
+    change: int
+    rating: int  # target position rating after this and all earlier steps
+
+class CheapestPath(BaseModel):
+    position: str
+    targetRating: int
+    changes: Dict[str, int]
+    cost: float
+    rating: int
+    steps: List[UpgradeStep]
+
+class SimulationResponse(BaseModel):
+    primaryPosition: str
+    attributes: List[str]  # tensor axes, in order
+    axes: Dict[str, List[int]]
+    positions: List[str]  # last tensor axis
+    ratings: List[Any]  # nested lists: one level per attribute axis, then 15 position ratings
+    cheapestPath: Optional[CheapestPath] = None
+
+# Primary position assumed when a request lists no positions
+DEFAULT_PRIMARY_POSITION = 'CM'
+
+# Largest delta grid /simulate will rate in one request
+MAX_SIMULATION_CELLS = 100_000
+
+def score_position_batch(items):
+    """
+    Deterministic ratings for a batch of (attributes, player positions, overall)
+    in one engine pass. Returns per item (ratings, familiarity levels, overall),
+    the first two in rating_engine.POSITIONS order.
+    """
+    from rating_engine import encode_positions, encode_position_masks, familiarity_levels, rate_players
+
+    attributes = np.array([
+        [a.PAC, a.SHO, a.PAS, a.DRI, a.DEF, a.PHY] for a, _, _ in items
+    ], dtype=np.int64)
+    primary = encode_positions([player_positions[0] if player_positions else DEFAULT_PRIMARY_POSITION
+                                for _, player_positions, _ in items])
+    # Every listed position counts: secondaries lift familiarity at nearby targets
+    masks = encode_position_masks([player_positions for _, player_positions, _ in items])
+    ratings = rate_players(attributes, primary, position_masks=masks)
+    levels = familiarity_levels(primary, masks)
+    # Overall from attributes unless the caller supplied it (round half to even, like round())
+    calculated = np.rint(attributes.sum(axis=1) / 6).astype(np.int64)
+
+    return [
+        (ratings[i], levels[i], overall if overall is not None else int(calculated[i]))
+        for i, (_, _, overall) in enumerate(items)
     ]
-    
-    features = base_features + engineered
-    
-    return np.array(features).reshape(1, -1)
+
+def get_position_rating_coalescer():
+    """Create the /position-ratings coalescer on first use (it needs the running event loop)"""
+    global position_rating_coalescer
+
+    if position_rating_coalescer is None:
+        from request_coalescer import RequestCoalescer
+        position_rating_coalescer = RequestCoalescer(
+            score_position_batch,
+            max_wait=COALESCE_WINDOW_MS / 1000,
+            max_batch=COALESCE_MAX_BATCH
+        )
+
+    return position_rating_coalescer
+
+def get_similarity_index():
+    """Build the similarity index once and reuse it"""
+    global similarity_index
+
+    if similarity_index is None:
+        from similarity_index import build_similarity_index
+        similarity_index = build_similarity_index()
+
+    return similarity_index
+
+def get_query_engine():
+    """Build the player query engine once and reuse it"""
+    global query_engine
+
+    if query_engine is None:
+        from player_query import build_query_engine
+        query_engine = build_query_engine()
+
+    return query_engine
+
+def get_rating_matrix():
+    """
+    Attach to the published rating matrix once, then follow new generations.
+    Workers never publish it themselves (that rates the whole snapshot);
+    raises FileNotFoundError until scripts/rating_matrix.py has run.
+    """
+    global rating_matrix
+
+    if rating_matrix is None:
+        from rating_matrix import attach_rating_matrix
+        rating_matrix = attach_rating_matrix(publish_if_missing=False)
+    else:
+        rating_matrix.refresh()
+
+    return rating_matrix
 
 def predict_position_rating(
     features: np.ndarray,
@@ -164,10 +293,12 @@ def predict_position_rating(
     overall = actual_overall if actual_overall is not None else calculated_overall
     
     # Get primary position (first in the list)
-    primary_pos = player_positions[0] if player_positions else 'CM'
+    primary_pos = player_positions[0] if player_positions else DEFAULT_PRIMARY_POSITION
+    secondary_positions = player_positions[1:] if player_positions else []
     
-    # Use MFL deterministic rules
-    rating, familiarity, penalty = calculate_mfl_position_rating(attributes, primary_pos, position)
+    # Use MFL deterministic rules; the other listed positions are the player's secondaries
+    rating, familiarity, penalty = calculate_mfl_position_rating(attributes, primary_pos, position,
+                                                                 secondary_positions)
     
     # Calculate difference from overall
     difference = rating - overall
@@ -179,204 +310,6 @@ def predict_position_rating(
         difference=difference
     )
 
-def calculate_mfl_position_rating(attributes, primary_pos, target_pos):
-    """
-    Calculate position rating using MFL deterministic rules
-    """
-    PAC, SHO, PAS, DRI, DEF, PHY = attributes
-    
-    # Special handling for goalkeepers
-    if target_pos == 'GK':
-        return calculate_gk_rating(attributes, primary_pos)
-    
-    # Get familiarity level
-    familiarity = get_familiarity_level(primary_pos, target_pos)
-    
-    # Apply familiarity penalty
-    penalty = get_familiarity_penalty(familiarity)
-    
-    # Calculate base position rating using MFL rules
-    base_rating = calculate_base_position_rating(attributes, target_pos)
-    
-    # Apply penalty
-    final_rating = base_rating + penalty
-    
-    # Ensure rating is within bounds (1-99)
-    final_rating = max(1, min(99, int(final_rating)))
-    
-    return final_rating, familiarity, penalty
-
-def calculate_gk_rating(attributes, primary_pos):
-    """
-    Special calculation for goalkeeper ratings using exact MFL formula
-    """
-    PAC, SHO, PAS, DRI, DEF, PHY = attributes
-    
-    # Use exact MFL GK formula: 100% GK attribute
-    # GK attribute is calculated as: DEF * 0.6 + PHY * 0.3 + PAS * 0.1
-    gk_rating = (DEF * 0.6 + PHY * 0.3 + PAS * 0.1)
-    
-    # If primary position is GK, use full rating
-    if primary_pos == 'GK':
-        return int(gk_rating), 'Primary', 0
-    
-    # For non-GK players, apply heavy penalty
-    # Most outfield players are terrible goalkeepers
-    gk_rating = gk_rating - 50  # Heavy penalty
-    gk_rating = max(1, min(99, int(gk_rating)))
-    
-    return gk_rating, 'Unfamiliar', -50
-
-def get_familiarity_level(primary_pos, target_pos):
-    """Get familiarity level between positions"""
-    if primary_pos == target_pos:
-        return 'Primary'
-    elif target_pos in get_secondary_positions(primary_pos):
-        return 'Secondary'
-    elif target_pos in get_fairly_familiar_positions(primary_pos):
-        return 'Fairly Familiar'
-    elif target_pos in get_somewhat_familiar_positions(primary_pos):
-        return 'Somewhat Familiar'
-    else:
-        return 'Unfamiliar'
-
-def get_secondary_positions(primary_pos):
-    """Get secondary positions for a given primary position"""
-    # Based on MFL whitepaper, secondary positions are more restrictive
-    # Most players only have 1-2 secondary positions, not many
-    secondary_map = {
-        'ST': ['CF'],  # Striker can play Center Forward
-        'CF': ['ST'],  # Center Forward can play Striker
-        'LW': ['LM'],  # Left Winger can play Left Midfielder
-        'RW': ['RM'],  # Right Winger can play Right Midfielder
-        'CAM': ['CM'],  # Central Attacking Midfielder can play Central Midfielder
-        'LM': ['LW'],  # Left Midfielder can play Left Winger
-        'RM': ['RW'],  # Right Midfielder can play Right Winger
-        'CM': ['CAM', 'CDM'],  # Central Midfielder can play CAM or CDM
-        'CDM': ['CM'],  # Central Defensive Midfielder can play Central Midfielder
-        'CB': ['CDM'],  # Center Back can play Central Defensive Midfielder
-        'LWB': ['LB'],  # Left Wing Back can play Left Back
-        'RWB': ['RB'],  # Right Wing Back can play Right Back
-        'LB': ['LWB'],  # Left Back can play Left Wing Back
-        'RB': ['RWB'],  # Right Back can play Right Wing Back
-        'GK': []  # Goalkeepers typically have no secondary positions
-    }
-    return secondary_map.get(primary_pos, [])
-
-def get_fairly_familiar_positions(primary_pos):
-    """Get fairly familiar positions"""
-    # More restrictive - only positions that are reasonably similar
-    fairly_familiar_map = {
-        'ST': ['LW', 'RW'],  # Strikers can play wing positions
-        'CF': ['CAM'],  # Center Forwards can play CAM
-        'LW': ['ST'],  # Left Wingers can play Striker
-        'RW': ['ST'],  # Right Wingers can play Striker
-        'CAM': ['CF'],  # CAM can play Center Forward
-        'LM': ['LW'],  # Left Midfielder can play Left Winger
-        'RM': ['RW'],  # Right Midfielder can play Right Winger
-        'CM': ['CAM'],  # Central Midfielder can play CAM
-        'CDM': ['CB'],  # CDM can play Center Back
-        'CB': ['CDM'],  # Center Back can play CDM
-        'LWB': ['LM'],  # Left Wing Back can play Left Midfielder
-        'RWB': ['RM'],  # Right Wing Back can play Right Midfielder
-        'LB': ['CB'],  # Left Back can play Center Back
-        'RB': ['CB'],  # Right Back can play Center Back
-        'GK': []  # Goalkeepers have no fairly familiar positions
-    }
-    return fairly_familiar_map.get(primary_pos, [])
-
-def get_somewhat_familiar_positions(primary_pos):
-    """Get somewhat familiar positions"""
-    # Very restrictive - only positions that are somewhat related
-    somewhat_familiar_map = {
-        'ST': ['CAM'],  # Strikers can somewhat play CAM
-        'CF': ['LW', 'RW'],  # Center Forwards can somewhat play wings
-        'LW': ['CAM'],  # Left Wingers can somewhat play CAM
-        'RW': ['CAM'],  # Right Wingers can somewhat play CAM
-        'CAM': ['LW', 'RW'],  # CAM can somewhat play wings
-        'LM': ['CAM'],  # Left Midfielder can somewhat play CAM
-        'RM': ['CAM'],  # Right Midfielder can somewhat play CAM
-        'CM': ['LW', 'RW'],  # Central Midfielder can somewhat play wings
-        'CDM': ['LB', 'RB'],  # CDM can somewhat play full backs
-        'CB': ['LWB', 'RWB'],  # Center Back can somewhat play wing backs
-        'LWB': ['CAM'],  # Left Wing Back can somewhat play CAM
-        'RWB': ['CAM'],  # Right Wing Back can somewhat play CAM
-        'LB': ['LWB'],  # Left Back can somewhat play Left Wing Back
-        'RB': ['RWB'],  # Right Back can somewhat play Right Wing Back
-        'GK': []  # Goalkeepers have no somewhat familiar positions
-    }
-    return somewhat_familiar_map.get(primary_pos, [])
-
-def get_familiarity_penalty(familiarity):
-    """Get penalty for familiarity level based on MFL whitepaper"""
-    penalties = {
-        'Primary': 0,
-        'Secondary': -1,
-        'Fairly Familiar': -5,
-        'Somewhat Familiar': -8,
-        'Unfamiliar': -20
-    }
-    return penalties.get(familiarity, -20)
-
-def calculate_base_position_rating(attributes, position):
-    """
-    Calculate base position rating using MFL rules
-    Based on actual data testing results
-    """
-    PAC, SHO, PAS, DRI, DEF, PHY = attributes
-    
-    # EXACT MFL attribute weightings from the official table
-    position_weights = {
-        # Forwards (Category F)
-        'ST': {'PAS': 0.10, 'SHO': 0.46, 'DEF': 0.00, 'DRI': 0.29, 'PAC': 0.10, 'PHY': 0.05, 'GK': 0.00},
-        'CF': {'PAS': 0.24, 'SHO': 0.23, 'DEF': 0.00, 'DRI': 0.40, 'PAC': 0.13, 'PHY': 0.00, 'GK': 0.00},
-        'LW': {'PAS': 0.24, 'SHO': 0.23, 'DEF': 0.00, 'DRI': 0.40, 'PAC': 0.13, 'PHY': 0.00, 'GK': 0.00},
-        'RW': {'PAS': 0.24, 'SHO': 0.23, 'DEF': 0.00, 'DRI': 0.40, 'PAC': 0.13, 'PHY': 0.00, 'GK': 0.00},
-        'CAM': {'PAS': 0.34, 'SHO': 0.21, 'DEF': 0.00, 'DRI': 0.38, 'PAC': 0.07, 'PHY': 0.00, 'GK': 0.00},
-        
-        # Midfielders (Category M)
-        'CM': {'PAS': 0.43, 'SHO': 0.12, 'DEF': 0.10, 'DRI': 0.29, 'PAC': 0.00, 'PHY': 0.06, 'GK': 0.00},
-        'LM': {'PAS': 0.43, 'SHO': 0.12, 'DEF': 0.10, 'DRI': 0.29, 'PAC': 0.00, 'PHY': 0.06, 'GK': 0.00},
-        'RM': {'PAS': 0.43, 'SHO': 0.12, 'DEF': 0.10, 'DRI': 0.29, 'PAC': 0.00, 'PHY': 0.06, 'GK': 0.00},
-        'CDM': {'PAS': 0.28, 'SHO': 0.00, 'DEF': 0.40, 'DRI': 0.17, 'PAC': 0.00, 'PHY': 0.15, 'GK': 0.00},
-        
-        # Defenders (Category D)
-        'LWB': {'PAS': 0.19, 'SHO': 0.00, 'DEF': 0.44, 'DRI': 0.17, 'PAC': 0.10, 'PHY': 0.10, 'GK': 0.00},
-        'RWB': {'PAS': 0.19, 'SHO': 0.00, 'DEF': 0.44, 'DRI': 0.17, 'PAC': 0.10, 'PHY': 0.10, 'GK': 0.00},
-        'LB': {'PAS': 0.19, 'SHO': 0.00, 'DEF': 0.44, 'DRI': 0.17, 'PAC': 0.10, 'PHY': 0.10, 'GK': 0.00},
-        'RB': {'PAS': 0.19, 'SHO': 0.00, 'DEF': 0.44, 'DRI': 0.17, 'PAC': 0.10, 'PHY': 0.10, 'GK': 0.00},
-        'CB': {'PAS': 0.05, 'SHO': 0.00, 'DEF': 0.64, 'DRI': 0.09, 'PAC': 0.02, 'PHY': 0.20, 'GK': 0.00},
-        
-        # Goalkeeper (Category GK)
-        'GK': {'PAS': 0.00, 'SHO': 0.00, 'DEF': 0.00, 'DRI': 0.00, 'PAC': 0.00, 'PHY': 0.00, 'GK': 1.00}
-    }
-    
-    weights = position_weights.get(position, {})
-    
-    # Calculate weighted rating
-    rating = 0
-    for attr, weight in weights.items():
-        if attr == 'PAC':
-            rating += PAC * weight
-        elif attr == 'SHO':
-            rating += SHO * weight
-        elif attr == 'PAS':
-            rating += PAS * weight
-        elif attr == 'DRI':
-            rating += DRI * weight
-        elif attr == 'DEF':
-            rating += DEF * weight
-        elif attr == 'PHY':
-            rating += PHY * weight
-        elif attr == 'GK':
-            # For GK attribute, we need to calculate a goalkeeper rating
-            # This would typically be based on goalkeeping-specific attributes
-            # For now, we'll use a combination of DEF, PHY, and PAS as goalkeeping attributes
-            gk_rating = (DEF * 0.6 + PHY * 0.3 + PAS * 0.1)
-            rating += gk_rating * weight
-    
-    return round(rating)
-
 @app.on_event("startup")
 async def startup_event():
     """Load models on startup"""
@@ -391,14 +324,22 @@ async def root():
 async def predict_position_ratings(request: PredictionRequest):
     """Predict position ratings for a player"""
     try:
-        # Create engineered features
-        features = create_engineered_features(request.attributes)
-        
-        # Predict ratings for all positions
+        from rating_engine import POSITION_INDEX, FAMILIARITY_LEVELS
+
+        # Scored together with any other requests arriving in the same window
+        ratings, levels, overall = await get_position_rating_coalescer().submit(
+            (request.attributes, request.positions, request.overall)
+        )
+
         position_ratings = []
         for position in positions:
-            rating = predict_position_rating(features, position, request.positions, request.overall)
-            position_ratings.append(rating)
+            column = POSITION_INDEX[position]
+            position_ratings.append(PositionRating(
+                position=position,
+                rating=int(ratings[column]),
+                familiarity=FAMILIARITY_LEVELS[levels[column]].upper(),
+                difference=int(ratings[column]) - overall
+            ))
         
         # Sort by rating to find best positions
         sorted_ratings = sorted(position_ratings, key=lambda x: x.rating, reverse=True)
@@ -414,6 +355,165 @@ async def predict_position_ratings(request: PredictionRequest):
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Prediction error: {str(e)}")
 
+@app.post("/ensemble-ratings", response_model=EnsembleResponse)
+async def predict_ensemble_ratings(request: EnsembleRequest):
+    """Predict position ratings for a batch of players with the blended ensembles"""
+    if not ensembles:
+        raise HTTPException(status_code=503, detail="No ensembles have been trained")
+
+    try:
+        features = np.vstack([create_engineered_features(attributes) for attributes in request.players])
+        # One batched predict per position covers every player and every member model
+        predictions = {position: ensemble.predict(features) for position, ensemble in ensembles.items()}
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Ensemble prediction error: {str(e)}")
+
+    return EnsembleResponse(
+        positions=list(predictions),
+        ratings=[
+            {position: round(float(values[i]), 2) for position, values in predictions.items()}
+            for i in range(len(request.players))
+        ]
+    )
+
+@app.post("/simulate", response_model=SimulationResponse)
+async def simulate(request: SimulationRequest):
+    """Deterministic ratings at every position over a grid of attribute changes"""
+    from rating_engine import (ATTRIBUTE_COLS, POSITIONS, POSITION_INDEX, POSITION_WEIGHTS,
+                               encode_positions, encode_position_masks, rate_players, simulate_deltas,
+                               cheapest_delta)
+
+    attrs = request.attributes
+    base = [attrs.PAC, attrs.SHO, attrs.PAS, attrs.DRI, attrs.DEF, attrs.PHY]
+    primary = request.positions[0] if request.positions else DEFAULT_PRIMARY_POSITION
+
+    for attr, bounds in request.deltas.items():
+        if bounds.step < 1 or bounds.max < bounds.min:
+            raise HTTPException(status_code=400, detail=f"Invalid delta range for {attr}")
+    grid = {attr: range(bounds.min, bounds.max + 1, bounds.step) for attr, bounds in request.deltas.items()}
+    cells = int(np.prod([len(values) for values in grid.values()]))
+    if cells > MAX_SIMULATION_CELLS:
+        raise HTTPException(status_code=400, detail=f"Delta grid has {cells} cells (limit {MAX_SIMULATION_CELLS})")
+    if request.target and request.target.position not in POSITION_INDEX:
+        raise HTTPException(status_code=400, detail=f"Unknown position: {request.target.position}")
+    # Same rule as rating_solver.solve_upgrades: a free or negative point would make any change "cheapest"
+    if request.target and any(not cost > 0 for cost in request.target.costs.values()):
+        raise HTTPException(status_code=400, detail="Attribute costs must be positive")
+
+    try:
+        primary_code = encode_positions([primary])[0]
+        position_mask = encode_position_masks([request.positions])[0]
+        names, axes, ratings = simulate_deltas(base, primary_code, grid, position_mask)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+    cheapest_path = None
+    target = request.target
+    if target:
+        found = cheapest_delta(names, axes, ratings, target.position, target.rating, target.costs)
+        if found:
+            changes, cost, rating = found
+            # Apply the changes most valuable per unit of cost at the target position first
+            weights = POSITION_WEIGHTS[target.position]
+            order = sorted((attr for attr in changes if changes[attr]),
+                           key=lambda attr: -weights.get(attr, 0) / target.costs.get(attr, 1))
+            cumulative = np.tile(np.array(base, dtype=np.int64), (len(order), 1))
+            for k, attr in enumerate(order):
+                cumulative[k:, ATTRIBUTE_COLS.index(attr)] += changes[attr]
+            step_ratings = rate_players(np.clip(cumulative, 0, 99), np.full(len(order), primary_code, dtype=np.uint8),
+                                        position_masks=np.full(len(order), position_mask, dtype=np.uint16))
+            column = POSITION_INDEX[target.position]
+            cheapest_path = CheapestPath(
+                position=target.position,
+                targetRating=target.rating,
+                changes=changes,
+                cost=cost,
+                rating=rating,
+                steps=[UpgradeStep(attribute=attr, change=changes[attr], rating=int(step_ratings[k, column]))
+                       for k, attr in enumerate(order)]
+            )
+
+    return SimulationResponse(
+        primaryPosition=primary,
+        attributes=names,
+        axes={attr: axis.tolist() for attr, axis in zip(names, axes)},
+        positions=POSITIONS,
+        ratings=ratings.tolist(),
+        cheapestPath=cheapest_path
+    )
+
+@app.get("/similar-players/{player_id}", response_model=SimilarPlayersResponse)
+async def similar_players(player_id: int, k: int = 10, position: Optional[str] = None):
+    """Find the players most similar to a player from the cached dataset"""
+    try:
+        index = get_similarity_index()
+        rows, distances = index.query_player(player_id, k=max(1, min(k, 100)), position=position)
+    except KeyError:
+        raise HTTPException(status_code=404, detail=f"Player {player_id} not found in dataset")
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Similarity error: {str(e)}")
+
+    return SimilarPlayersResponse(
+        playerId=player_id,
+        position=position,
+        players=[SimilarPlayer(**player) for player in index.describe(rows, distances)]
+    )
+
+@app.get("/players/{player_id}/position-ratings", response_model=PlayerRatingsResponse)
+async def player_position_ratings(player_id: int):
+    """Ratings at every position for a player in the dataset snapshot, from the shared rating matrix"""
+    from player_dataset import POSITIONS
+
+    try:
+        generation = get_rating_matrix().snapshot()
+        row = int(generation.rows_of([player_id])[0])
+    except FileNotFoundError:
+        raise HTTPException(status_code=503, detail="Rating matrix not published yet: run scripts/rating_matrix.py")
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Rating matrix error: {str(e)}")
+    if row < 0:
+        raise HTTPException(status_code=404, detail=f"Player {player_id} not found in dataset")
+
+    return PlayerRatingsResponse(
+        playerId=player_id,
+        generation=generation.number,
+        snapshotVersion=generation.snapshot_version,
+        ratings=dict(zip(POSITIONS, generation.ratings[row].tolist()))
+    )
+
+@app.post("/players/query", response_model=PlayerQueryResponse)
+async def query_players(request: PlayerQueryRequest):
+    """Conjunctive attribute / position rating range query over the cached dataset"""
+    filters = {column: (bounds.min, bounds.max) for column, bounds in request.filters.items()}
+
+    try:
+        result = get_query_engine().query(
+            filters,
+            positions=request.positions,
+            primary_only=request.primaryOnly,
+            sort_by=request.sortBy,
+            descending=request.descending,
+            page=request.page,
+            page_size=request.pageSize
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Query error: {str(e)}")
+
+    return PlayerQueryResponse(**result)
+
+@app.get("/metrics")
+async def metrics():
+    """Request coalescing metrics: queue depth, batch counts and sizes"""
+    coalescer = position_rating_coalescer
+    return {
+        "positionRatings": coalescer.metrics() if coalescer else {
+            "queue_depth": 0, "requests": 0, "batches": 0,
+            "window_ms": COALESCE_WINDOW_MS, "max_batch": COALESCE_MAX_BATCH
+        }
+    }
+
 @app.get("/health")
 async def health_check():
     """Health check with MFL deterministic rules status"""
@@ -426,4 +526,6 @@ async def health_check():
     }
 
 if __name__ == "__main__":
+    import uvicorn
+
     uvicorn.run(app, host="0.0.0.0", port=8000)
@@ -1,5 +1,6 @@
-import { spawn } from 'child_process';
+import { spawn, ChildProcess } from 'child_process';
 import path from 'path';
+import readline from 'readline';
 
 // Interface for prediction result
 export interface PredictionResult {
@@ -9,78 +10,166 @@ export interface PredictionResult {
   features_used?: string[];
 }
 
-// Load model using Python subprocess (for serverless compatibility)
-export async function loadModel(modelPath: string): Promise<any> {
+interface PendingRequest {
+  resolve: (value: any) => void;
+  reject: (error: Error) => void;
+  timer: NodeJS.Timeout;
+}
+
+// A request the worker has not answered by then is rejected and the worker replaced
+const REQUEST_TIMEOUT_MS = Number(process.env.SCORING_WORKER_TIMEOUT_MS || 30000);
+
+// One long-lived Python scoring worker (scripts/scoring_worker.py) shared by every call.
+// Requests are newline-delimited JSON tagged with an id, so many can be in flight at once;
+// the worker batches whatever has arrived and loads each model only once.
+let worker: ChildProcess | null = null;
+let nextRequestId = 1;
+const pending = new Map<number, PendingRequest>();
+
+function failPending(error: Error) {
+  for (const request of pending.values()) {
+    clearTimeout(request.timer);
+    request.reject(error);
+  }
+  pending.clear();
+}
+
+// Remove a request from the in-flight set; undefined if it was already settled
+function takePending(id: number): PendingRequest | undefined {
+  const request = pending.get(id);
+  if (!request) {
+    return undefined;
+  }
+  clearTimeout(request.timer);
+  pending.delete(id);
+  if (pending.size === 0) {
+    setActive(false);
+  }
+  return request;
+}
+
+function getWorker(): ChildProcess {
+  if (worker) {
+    return worker;
+  }
+
+  const child = spawn('python3', [path.join(process.cwd(), 'scripts', 'scoring_worker.py')], {
+    stdio: ['pipe', 'pipe', 'pipe']
+  });
+
+  let errorOutput = '';
+  child.stderr?.on('data', (data) => {
+    // Keep only the tail for error reports
+    errorOutput = (errorOutput + data.toString()).slice(-4000);
+  });
+
+  readline.createInterface({ input: child.stdout! }).on('line', (line) => {
+    let response: any;
+    try {
+      response = JSON.parse(line);
+    } catch (error) {
+      return;
+    }
+    const request = takePending(response.id);
+    if (!request) {
+      return;
+    }
+    if (response.error) {
+      request.reject(new Error(response.error));
+    } else {
+      request.resolve(response.result);
+    }
+  });
+
+  child.on('error', (error) => {
+    if (worker === child) {
+      worker = null;
+    }
+    failPending(new Error(`Scoring worker failed to start: ${error.message}`));
+  });
+
+  // Writing to a worker that has died raises EPIPE here, not at the write call
+  child.stdin!.on('error', (error) => {
+    if (worker === child) {
+      worker = null;
+    }
+    failPending(new Error(`Scoring worker input closed: ${error.message}: ${errorOutput}`));
+  });
+
+  child.on('close', (code) => {
+    // Respawned on the next request
+    if (worker === child) {
+      worker = null;
+    }
+    failPending(new Error(`Scoring worker exited with code ${code}: ${errorOutput}`));
+  });
+
+  worker = child;
+  setActive(false);
+  return child;
+}
+
+// Keep the Node process alive only while requests are in flight, not for an idle worker
+function setActive(active: boolean) {
+  if (!worker) {
+    return;
+  }
+  for (const handle of [worker, worker.stdin, worker.stdout, worker.stderr] as any[]) {
+    if (active) {
+      handle?.ref?.();
+    } else {
+      handle?.unref?.();
+    }
+  }
+}
+
+function request(op: string, payload: Record<string, any>): Promise<any> {
   return new Promise((resolve, reject) => {
-    const pythonProcess = spawn('python3', [
-      path.join(process.cwd(), 'scripts', 'load_model.py'),
-      modelPath
-    ]);
-
-    let output = '';
-    let errorOutput = '';
-
-    pythonProcess.stdout.on('data', (data) => {
-      output += data.toString();
-    });
-
-    pythonProcess.stderr.on('data', (data) => {
-      errorOutput += data.toString();
-    });
-
-    pythonProcess.on('close', (code) => {
-      if (code === 0) {
-        try {
-          const model = JSON.parse(output);
-          resolve(model);
-        } catch (error) {
-          reject(new Error(`Failed to parse model output: ${error}`));
-        }
-      } else {
-        reject(new Error(`Model loading failed: ${errorOutput}`));
+    const id = nextRequestId++;
+    const child = getWorker();
+    const timer = setTimeout(() => {
+      if (!takePending(id)) {
+        return;
+      }
+      reject(new Error(`Scoring worker did not answer ${op} within ${REQUEST_TIMEOUT_MS} ms`));
+      // A hung worker would stall every later request too; the next one respawns it
+      if (worker === child) {
+        worker = null;
+        child.kill();
       }
-    });
+    }, REQUEST_TIMEOUT_MS);
+    pending.set(id, { resolve, reject, timer });
+    setActive(true);
+    child.stdin!.write(JSON.stringify({ id, op, ...payload }) + '\n');
   });
 }
 
+// Stop the shared worker, e.g. on shutdown
+export function closeScoringWorker() {
+  worker?.stdin?.end();
+  worker = null;
+}
+
+// Load model using the shared Python scoring worker
+export async function loadModel(modelPath: string): Promise<any> {
+  try {
+    return await request('load', { model: modelPath });
+  } catch (error) {
+    throw new Error(`Model loading failed: ${error instanceof Error ? error.message : error}`);
+  }
+}
+
 // Predict position using loaded model
 export async function predictPosition(
-  model: any, 
-  attributes: any, 
-  overall: number, 
+  model: any,
+  attributes: any,
+  overall: number,
   position: string
 ): Promise<PredictionResult> {
-  return new Promise((resolve, reject) => {
-    const pythonProcess = spawn('python3', [
-      path.join(process.cwd(), 'scripts', 'predict_position.py'),
-      JSON.stringify(model),
-      JSON.stringify(attributes),
-      overall.toString(),
-      position
-    ]);
-
-    let output = '';
-    let errorOutput = '';
-
-    pythonProcess.stdout.on('data', (data) => {
-      output += data.toString();
-    });
-
-    pythonProcess.stderr.on('data', (data) => {
-      errorOutput += data.toString();
-    });
-
-    pythonProcess.on('close', (code) => {
-      if (code === 0) {
-        try {
-          const result = JSON.parse(output);
-          resolve(result);
-        } catch (error) {
-          reject(new Error(`Failed to parse prediction output: ${error}`));
-        }
-      } else {
-        reject(new Error(`Prediction failed: ${errorOutput}`));
-      }
-    });
-  });
+  const modelPath = typeof model === 'string' ? model : model.model;
+  try {
+    return await request('predict', { model: modelPath, attributes, overall, position });
+  } catch (error) {
+    throw new Error(`Prediction failed: ${error instanceof Error ? error.message : error}`);
+  }
 }
@@ -0,0 +1,215 @@
+#!/usr/bin/env python3
+"""
+Parallel Model Comparison
+Fans out (model x fold) fits across a process pool, sharing training arrays through memory-mapped files
+"""
+
+import os
+import time
+import shutil
+import tempfile
+import numpy as np
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+def _random_forest():
+    from sklearn.ensemble import RandomForestRegressor
+    return RandomForestRegressor(n_estimators=100, max_depth=10, random_state=42, n_jobs=1)
+
+def _gradient_boosting():
+    from sklearn.ensemble import GradientBoostingRegressor
+    return GradientBoostingRegressor(n_estimators=100, learning_rate=0.1, max_depth=6, random_state=42)
+
+def _xgboost():
+    import xgboost as xgb
+    return xgb.XGBRegressor(n_estimators=100, learning_rate=0.1, max_depth=6, random_state=42, n_jobs=1)
+
+def _lightgbm():
+    import lightgbm as lgb
+    return lgb.LGBMRegressor(n_estimators=100, learning_rate=0.1, max_depth=6, random_state=42,
+                             n_jobs=1, verbose=-1)
+
+def _svr():
+    from sklearn.svm import SVR
+    return SVR(kernel='rbf', C=1.0, gamma='scale')
+
+def _neural_network():
+    from sklearn.neural_network import MLPRegressor
+    return MLPRegressor(hidden_layer_sizes=(100, 50), activation='relu', solver='adam',
+                        max_iter=500, random_state=42)
+
+# Model name -> factory. Factories import lazily so workers only load what they fit,
+# and every model is pinned to one thread: parallelism comes from the pool.
+MODEL_FACTORIES = {
+    'Random Forest': _random_forest,
+    'Gradient Boosting': _gradient_boosting,
+    'XGBoost': _xgboost,
+    'LightGBM': _lightgbm,
+    'SVR (RBF)': _svr,
+    'Neural Network': _neural_network,
+}
+
+# Packages a factory needs beyond scikit-learn
+OPTIONAL_DEPENDENCIES = {'XGBoost': 'xgboost', 'LightGBM': 'lightgbm'}
+
+def available_models(model_names=None):
+    """Requested model names whose optional dependency is installed"""
+    import importlib.util
+
+    available = []
+    for name in model_names or MODEL_FACTORIES:
+        if name not in MODEL_FACTORIES:
+            raise ValueError(f"Unknown model: {name}")
+        package = OPTIONAL_DEPENDENCIES.get(name)
+        if package and importlib.util.find_spec(package) is None:
+            print(f"Skipping {name} ({package} not installed)")
+            continue
+        available.append(name)
+    return available
+
+# Arrays opened by this worker process, keyed by file path
+_shared_arrays = {}
+
+def _shared(path):
+    if path not in _shared_arrays:
+        _shared_arrays[path] = np.load(path, mmap_mode='r')
+    return _shared_arrays[path]
+
+def _init_worker():
+    # One BLAS/OpenMP thread per worker so the pool respects the core budget
+    try:
+        from threadpoolctl import threadpool_limits
+        threadpool_limits(1)
+    except ImportError:
+        pass
+
+def _fit_task(name, fold, train_rows, eval_rows, paths):
+    """
+    Fit one model on one split. fold is an int for CV folds (whose out-of-fold
+    predictions are returned), 'holdout' for the full-train fit evaluated on the
+    test set, or 'full' for an unevaluated full-train fit. The last two return the model.
+    """
+    from sklearn.metrics import mean_absolute_error, r2_score
+
+    start = time.perf_counter()
+    X_train, y_train = _shared(paths['X_train']), _shared(paths['y_train'])
+
+    model = MODEL_FACTORIES[name]()
+    result = {'model_name': name, 'fold': fold, 'model': None}
+    if fold in ('holdout', 'full'):
+        model.fit(X_train, y_train)
+        result['model'] = model
+        if fold == 'full':
+            result['seconds'] = time.perf_counter() - start
+            return result
+        X_eval, y_eval = _shared(paths['X_test']), _shared(paths['y_test'])
+    else:
+        model.fit(X_train[train_rows], y_train[train_rows])
+        X_eval, y_eval = X_train[eval_rows], y_train[eval_rows]
+        result['rows'] = eval_rows
+
+    y_pred = model.predict(X_eval)
+    if fold != 'holdout':
+        result['predictions'] = y_pred
+    result.update({
+        'MAE': mean_absolute_error(y_eval, y_pred),
+        'R²': r2_score(y_eval, y_pred),
+        'seconds': time.perf_counter() - start,
+    })
+    return result
+
+def iter_model_fits(X_train, y_train, X_test=None, y_test=None, model_names=None, cv=5,
+                    n_jobs=None, work_dir=None, fit_full=False):
+    """
+    Yield one result dict per (model, fold) fit as soon as it finishes.
+
+    The training (and test) arrays are written once to .npy files that every
+    worker memory-maps, so tasks only carry fold row indexes.
+    n_jobs is the core budget (None for all cores). fit_full adds an
+    unevaluated full-train fit per model when there is no test set.
+    """
+    from sklearn.model_selection import KFold
+
+    model_names = available_models(model_names)
+    n_jobs = os.cpu_count() if n_jobs is None else max(1, n_jobs)
+
+    owns_work_dir = work_dir is None
+    work_dir = tempfile.mkdtemp(prefix='model-comparison-') if owns_work_dir else work_dir
+    os.makedirs(work_dir, exist_ok=True)
+
+    try:
+        arrays = {'X_train': X_train, 'y_train': y_train}
+        if X_test is not None:
+            arrays.update(X_test=X_test, y_test=y_test)
+        paths = {}
+        for key, values in arrays.items():
+            paths[key] = os.path.join(work_dir, f"{key}.npy")
+            np.save(paths[key], np.ascontiguousarray(values))
+
+        # Same splits as cross_val_score(cv=cv) for a regressor
+        folds = list(KFold(n_splits=cv).split(X_train))
+
+        tasks = []
+        for name in model_names:
+            if X_test is not None:
+                tasks.append((name, 'holdout', None, None))
+            elif fit_full:
+                tasks.append((name, 'full', None, None))
+            tasks.extend((name, k, train_rows, eval_rows) for k, (train_rows, eval_rows) in enumerate(folds))
+
+        with ProcessPoolExecutor(max_workers=min(n_jobs, len(tasks)), initializer=_init_worker) as pool:
+            futures = [pool.submit(_fit_task, *task, paths) for task in tasks]
+            for future in as_completed(futures):
+                yield future.result()
+    finally:
+        if owns_work_dir:
+            shutil.rmtree(work_dir, ignore_errors=True)
+
+def compare_models(X_train, y_train, X_test, y_test, model_names=None, cv=5, n_jobs=None, work_dir=None):
+    """
+    Train and cross-validate every model in parallel.
+    Returns the same per-model dict as train_advanced_models.
+    """
+    start = time.perf_counter()
+    model_names = available_models(model_names)
+
+    holdout = {}
+    cv_scores = {name: [] for name in model_names}
+
+    for result in iter_model_fits(X_train, y_train, X_test, y_test, model_names, cv, n_jobs, work_dir):
+        name = result['model_name']
+        if result['fold'] == 'holdout':
+            holdout[name] = result
+            print(f"{name}: MAE={result['MAE']:.2f}, R²={result['R²']:.3f} ({result['seconds']:.1f}s)")
+        else:
+            cv_scores[name].append(result['R²'])
+            print(f"{name} fold {result['fold'] + 1}/{cv}: R²={result['R²']:.3f} ({result['seconds']:.1f}s)")
+
+    results = {}
+    for name in model_names:
+        scores = np.array(cv_scores[name])
+        results[name] = {
+            'MAE': holdout[name]['MAE'],
+            'R²': holdout[name]['R²'],
+            'CV_R²_mean': scores.mean(),
+            'CV_R²_std': scores.std(),
+            'model': holdout[name]['model']
+        }
+        print(f"{name}: MAE={results[name]['MAE']:.2f}, R²={results[name]['R²']:.3f}, "
+              f"CV_R²={scores.mean():.3f}±{scores.std():.3f}")
+
+    print(f"Compared {len(model_names)} models in {time.perf_counter() - start:.1f}s")
+    return results
+
+if __name__ == "__main__":
+    import sys
+    from sklearn.model_selection import train_test_split
+    from player_dataset import load_player_dataset, POSITIONS
+
+    position = sys.argv[1] if len(sys.argv) > 1 else 'ST'
+    dataset = load_player_dataset()
+    X = dataset['attributes'].astype(np.float64)
+    y = dataset['position_ratings'][:, POSITIONS.index(position)].astype(np.float64)
+
+    X_train, X_test, y_train, y_test = train_test_split(X, y, test_size=0.2, random_state=42)
+    print(f"Comparing models for {position} on {len(X_train)} training players, {os.cpu_count()} cores")
+    compare_models(X_train, y_train, X_test, y_test)
@@ -0,0 +1,189 @@
+#!/usr/bin/env python3
+"""
+Ensemble Distillation
+Fits compact per-position students on a heavy teacher's predictions over a synthetic attribute grid
+"""
+
+import os
+import json
+import time
+import numpy as np
+
+STUDENT_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "models", "students")
+
+# Attribute range covered by the synthetic grid
+ATTRIBUTE_MIN = 20
+ATTRIBUTE_MAX = 99
+
+def default_featurize(attributes):
+    """The engineered features the position models are trained on"""
+    from train_position_predictor import create_engineered_features
+    return create_engineered_features(np.asarray(attributes, dtype=np.float64), verbose=False)
+
+def synthetic_attribute_grid(n_samples=20000, real_attributes=None, low=ATTRIBUTE_MIN, high=ATTRIBUTE_MAX,
+                             jitter=8, uniform_fraction=0.5, seed=42):
+    """
+    Dense synthetic attribute set for the teacher to label: part uniform over
+    the attribute box, the rest real players jittered by up to +/-jitter, so the
+    student sees the whole space and extra density where real players sit.
+    Goalkeepers come through the API with all-zero outfield attributes; zero
+    attributes are left unjittered so that cluster is kept as-is.
+    """
+    rng = np.random.default_rng(seed)
+
+    if real_attributes is None or len(real_attributes) == 0:
+        return rng.integers(low, high + 1, size=(n_samples, 6)).astype(np.float64)
+
+    n_uniform = int(n_samples * uniform_fraction)
+    uniform = rng.integers(low, high + 1, size=(n_uniform, 6))
+    anchors = np.asarray(real_attributes)[rng.integers(0, len(real_attributes), n_samples - n_uniform)]
+    noise = rng.integers(-jitter, jitter + 1, size=anchors.shape) * (anchors > 0)
+    jittered = np.where(anchors > 0, np.clip(anchors + noise, low, high), 0)
+
+    return np.vstack([uniform, jittered]).astype(np.float64)
+
+def _linear_student():
+    from sklearn.pipeline import make_pipeline
+    from sklearn.preprocessing import StandardScaler
+    from sklearn.linear_model import Ridge
+    return make_pipeline(StandardScaler(), Ridge(alpha=1.0))
+
+def _small_gbm_student():
+    from sklearn.ensemble import HistGradientBoostingRegressor
+    return HistGradientBoostingRegressor(max_iter=150, max_depth=4, learning_rate=0.1, random_state=42)
+
+STUDENT_FACTORIES = {
+    'linear': _linear_student,
+    'small_gbm': _small_gbm_student,
+}
+
+def distill_position(teacher, grid_features, student='linear'):
+    """Fit one student on the teacher's predictions for the grid"""
+    targets = teacher.predict(grid_features)
+    model = STUDENT_FACTORIES[student]()
+    model.fit(grid_features, targets)
+    return model
+
+def _latency(model, features, featurize, repeats=200):
+    """(seconds per single-player request including featurization, seconds per player in one batch)"""
+    one = features[:1]
+    start = time.perf_counter()
+    for _ in range(repeats):
+        model.predict(featurize(one))
+    single = (time.perf_counter() - start) / repeats
+
+    start = time.perf_counter()
+    model.predict(featurize(features))
+    batch = (time.perf_counter() - start) / len(features)
+
+    return single, batch
+
+def accuracy_latency_report(teacher, students, eval_attributes, y_true, featurize=default_featurize):
+    """
+    Compare the teacher and each student on held-out real players:
+    MAE against the true ratings, fidelity (MAE against the teacher) and latency
+    """
+    from sklearn.metrics import mean_absolute_error
+
+    eval_features = featurize(eval_attributes)
+    teacher_pred = teacher.predict(eval_features)
+
+    report = {}
+    for name, model in [('teacher', teacher)] + list(students.items()):
+        pred = teacher_pred if name == 'teacher' else model.predict(eval_features)
+        single, batch = _latency(model, eval_attributes, featurize, repeats=20 if name == 'teacher' else 200)
+        report[name] = {
+            'mae': float(mean_absolute_error(y_true, pred)),
+            'teacher_mae': float(mean_absolute_error(teacher_pred, pred)),
+            'single_ms': single * 1000,
+            'batch_us_per_player': batch * 1e6,
+        }
+
+    teacher_single = report['teacher']['single_ms']
+    for entry in report.values():
+        entry['speedup'] = teacher_single / entry['single_ms']
+
+    return report
+
+def print_report(position, report):
+    print(f"\n{position}: {'model':<10} {'MAE':>6} {'vs teacher':>10} {'1 player':>10} {'batch/player':>13} {'speedup':>8}")
+    for name, entry in report.items():
+        print(f"{'':{len(position) + 1}} {name:<10} {entry['mae']:6.2f} {entry['teacher_mae']:10.2f} "
+              f"{entry['single_ms']:8.2f}ms {entry['batch_us_per_player']:11.1f}us {entry['speedup']:7.1f}x")
+
+def distill_teachers(teachers, train_attributes, eval_attributes, eval_targets, student_kinds=('linear', 'small_gbm'),
+                     n_samples=20000, featurize=default_featurize, student_dir=None):
+    """
+    Distill every position's teacher.
+
+    teachers: {position: fitted model taking engineered features}
+    eval_targets: {position: true ratings for eval_attributes}
+    Saves the most accurate student per position when student_dir is given.
+    Returns {position: report}.
+    """
+    grid = synthetic_attribute_grid(n_samples, real_attributes=train_attributes)
+    grid_features = featurize(grid)
+    print(f"Synthetic grid: {len(grid)} attribute sets, {grid_features.shape[1]} features")
+
+    reports = {}
+    for position, teacher in teachers.items():
+        students = {kind: distill_position(teacher, grid_features, kind) for kind in student_kinds}
+        report = accuracy_latency_report(teacher, students, eval_attributes, eval_targets[position], featurize)
+        print_report(position, report)
+        reports[position] = report
+
+        if student_dir:
+            import joblib
+            best = min(students, key=lambda kind: report[kind]['mae'])
+            os.makedirs(student_dir, exist_ok=True)
+            joblib.dump(students[best], os.path.join(student_dir, f"{position}_student.pkl"))
+
+    if student_dir:
+        with open(os.path.join(student_dir, "distillation_report.json"), 'w') as f:
+            json.dump(reports, f, indent=2)
+
+    return reports
+
+def main():
+    import argparse
+    from sklearn.model_selection import train_test_split
+    from player_dataset import POSITIONS
+    from dataset_builder import load_snapshot
+
+    parser = argparse.ArgumentParser(description="Distill heavy position models into compact students")
+    parser.add_argument('student_dir', nargs='?', default=STUDENT_DIR)
+    parser.add_argument('--teacher', choices=['ensembles', 'super'], default='ensembles',
+                        help="Trained blended ensembles (a 500-tree forest where none exist), or "
+                             "maximum_accuracy_strategy's super ensemble trained per position")
+    args = parser.parse_args()
+
+    dataset = load_snapshot()
+    attributes = dataset['attributes'].astype(np.float64)
+    ratings = dataset['position_ratings'].astype(np.float64)
+
+    if args.teacher == 'super':
+        from maximum_accuracy_strategy import distill_super_ensemble
+        distill_super_ensemble(attributes, ratings, POSITIONS, student_dir=args.student_dir)
+        return
+
+    from stacking_ensemble import ENSEMBLE_DIR, load_position_ensembles
+
+    train_rows, eval_rows = train_test_split(np.arange(len(attributes)), test_size=0.2, random_state=42)
+
+    # Teachers: trained blended ensembles where available (fitted on every player, so their
+    # eval MAE is optimistic), otherwise a heavy forest per position fitted on the train split
+    teachers = load_position_ensembles(POSITIONS, ENSEMBLE_DIR)
+    if not teachers:
+        from sklearn.ensemble import RandomForestRegressor
+        print("No trained ensembles found; fitting 500-tree forests as teachers")
+        train_features = default_featurize(attributes[train_rows])
+        for i, position in enumerate(POSITIONS):
+            teacher = RandomForestRegressor(n_estimators=500, random_state=42)
+            teachers[position] = teacher.fit(train_features, ratings[train_rows, i])
+
+    eval_targets = {position: ratings[eval_rows, POSITIONS.index(position)] for position in teachers}
+    distill_teachers(teachers, attributes[train_rows], attributes[eval_rows], eval_targets,
+                     student_dir=args.student_dir)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,153 @@
+#!/usr/bin/env python3
+"""
+Cached MFL Player Dataset
+Parses a scraped player workbook once and keeps the columns as NumPy arrays
+"""
+
+import os
+import re
+import uuid
+import numpy as np
+from pathlib import Path
+from contextlib import contextmanager
+
+PROJECT_ROOT = Path(__file__).parent.parent
+DEFAULT_EXCEL_PATH = PROJECT_ROOT / "Data" / "600-player-data-scraped.xlsx"
+CACHE_DIR = PROJECT_ROOT / "Data" / "cache"
+
+ATTRIBUTE_COLS = ['PAC', 'SHO', 'PAS', 'DRI', 'DEF', 'PHY']
+ATTRIBUTE_MAX = 99  # attributes are on the game's 0-99 scale
+POSITIONS = ['LB', 'CB', 'RB', 'LWB', 'RWB', 'CDM', 'CM', 'CAM',
+             'LM', 'RM', 'CF', 'ST', 'LW', 'RW', 'GK']
+
+POSITION_INDEX = {position: i for i, position in enumerate(POSITIONS)}
+UNKNOWN_POSITION = len(POSITIONS)  # a position name the rules do not know
+NO_POSITION = 255                  # padding in secondary_codes
+MAX_SECONDARY = 3
+
+# Bumped whenever DATASET_COLUMNS changes so older caches are rebuilt
+DATASET_FORMAT = 2
+
+# Dataset columns: (dtype, per-player shape). Everything the game rates on a
+# 0-99 scale is stored as uint8 and positions as codes into POSITIONS;
+# scoring code upcasts to float only inside its own kernels.
+DATASET_COLUMNS = {
+    'id': (np.int64, ()),
+    'name': (object, ()),
+    'primary_code': (np.uint8, ()),
+    'secondary_codes': (np.uint8, (MAX_SECONDARY,)),
+    'attributes': (np.uint8, (len(ATTRIBUTE_COLS),)),
+    'overall': (np.uint8, ()),
+    'age': (np.uint8, ()),
+    'height': (np.uint8, ()),
+    'position_ratings': (np.uint8, (len(POSITIONS),)),
+}
+STRING_COLUMNS = ('name',)
+
+@contextmanager
+def atomic_write(path, mode='wb'):
+    """
+    Open a uniquely named temporary file next to path. When the block
+    succeeds it is fsynced and renamed over path, so readers only ever see
+    the old file or the complete new one; when it fails it is removed.
+    """
+    path = Path(path)
+    tmp = path.with_name(f"{path.name}.{os.getpid()}-{uuid.uuid4().hex[:8]}.tmp")
+    try:
+        with open(tmp, mode) as f:
+            yield f
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp, path)
+    except BaseException:
+        try:
+            os.unlink(tmp)
+        except FileNotFoundError:
+            pass
+        raise
+
+def encode_position(name):
+    """Position name -> code"""
+    return POSITION_INDEX.get(str(name).strip(), UNKNOWN_POSITION)
+
+def encode_secondary(text):
+    """'RM, CM' -> fixed-width codes padded with NO_POSITION"""
+    codes = [encode_position(pos) for pos in str(text or '').split(',') if pos.strip()][:MAX_SECONDARY]
+    return codes + [NO_POSITION] * (MAX_SECONDARY - len(codes))
+
+def position_name(code):
+    """Position code -> name ('?' for an unknown position)"""
+    return POSITIONS[code] if code < len(POSITIONS) else '?'
+
+def secondary_names(codes):
+    """One player's secondary_codes row -> list of position names"""
+    return [position_name(code) for code in codes if code != NO_POSITION]
+
+def position_names(codes):
+    """Array of position codes -> array of names"""
+    return np.array(POSITIONS + ['?'])[np.minimum(np.asarray(codes), UNKNOWN_POSITION)]
+
+def parse_player_workbook(excel_path):
+    """
+    Parse a scraped workbook (or JSONL file) into column arrays, streaming rows
+    so only the parsed columns are ever held in memory
+    """
+    from streaming_ingest import iter_player_chunks, new_player_chunk
+
+    print(f"Parsing player data from {excel_path}...")
+    chunks = list(iter_player_chunks(excel_path)) or [new_player_chunk(0)]
+
+    dataset = {key: np.concatenate([chunk[key] for chunk in chunks]) for key in DATASET_COLUMNS}
+    for key in STRING_COLUMNS:
+        dataset[key] = dataset[key].astype(str)
+    print(f"Parsed {len(dataset['id'])} valid players")
+
+    return dataset
+
+def _cache_path(excel_path, cache_dir):
+    """Cache file name keyed by workbook name, size, modification time and dataset format"""
+    stat = os.stat(excel_path)
+    stem = Path(excel_path).stem
+    return Path(cache_dir) / f"{stem}-{stat.st_size}-{int(stat.st_mtime)}-v{DATASET_FORMAT}.npz"
+
+def load_player_dataset(excel_path=DEFAULT_EXCEL_PATH, cache_dir=CACHE_DIR, refresh=False):
+    """
+    Load the parsed dataset, reading the workbook only when the cache is stale
+    """
+    cache_path = _cache_path(excel_path, cache_dir)
+
+    if cache_path.exists() and not refresh:
+        with np.load(cache_path) as cached:
+            return {key: cached[key] for key in cached.files}
+
+    dataset = parse_player_workbook(excel_path)
+
+    os.makedirs(cache_dir, exist_ok=True)
+    # Drop caches left behind by older versions of the same workbook
+    # (only <stem>-<size>-<mtime>[-v<format>].npz, so 'player-data' never matches 'player-data-progress')
+    stale_name = re.compile(re.escape(Path(excel_path).stem) + r'-\d+-\d+(-v\d+)?\.npz')
+    for stale in Path(cache_dir).glob(f"{Path(excel_path).stem}-*.npz"):
+        if stale_name.fullmatch(stale.name):
+            stale.unlink()
+    np.savez(cache_path, **dataset)
+    print(f"Cached dataset to {cache_path}")
+
+    return dataset
+
+def player_feature_matrix(dataset):
+    """
+    Numeric feature matrix used by prepare_training_data context:
+    PAC, SHO, PAS, DRI, DEF, PHY, overall, age, height
+    """
+    return np.column_stack([
+        dataset['attributes'],
+        dataset['overall'],
+        dataset['age'],
+        dataset['height'],
+    ]).astype(np.float64)
+
+if __name__ == "__main__":
+    dataset = load_player_dataset(refresh=True)
+    print(f"Players: {len(dataset['id'])}")
+    print(f"Attributes shape: {dataset['attributes'].shape}")
+    print(f"Position ratings shape: {dataset['position_ratings'].shape}")
@@ -0,0 +1,305 @@
+#!/usr/bin/env python3
+"""
+MFL Player Fetcher
+Downloads raw player documents from the MFL API concurrently into a resumable JSONL source for the dataset snapshot
+"""
+
+import os
+import sys
+import json
+import time
+import random
+import asyncio
+from pathlib import Path
+
+from player_dataset import PROJECT_ROOT, atomic_write
+
+DEFAULT_BASE_URL = 'https://z519wdyajg.execute-api.us-east-1.amazonaws.com/prod'
+DEFAULT_OUTPUT = PROJECT_ROOT / "Data" / "api-players.jsonl"
+
+# Wallets the Node scrapers (full-scraper.js) list players from
+OWNER_WALLETS = ['0xa7942ae65333f69d', '0x55e8be2966409ed4']
+WALLET_LIMIT = 1200
+
+DEFAULT_CONCURRENCY = 16
+DEFAULT_RATE = 20.0       # requests per second, averaged
+DEFAULT_BURST = 20        # requests allowed back to back
+MAX_RETRIES = 6
+BACKOFF_BASE = 0.5        # seconds; doubled per attempt, with jitter
+BACKOFF_CAP = 30.0
+REQUEST_TIMEOUT = 20.0
+CHECKPOINT_EVERY = 200    # players between checkpoint writes
+
+RETRY_STATUS = {429, 500, 502, 503, 504}
+
+class TokenBucket:
+    """Allows `rate` acquisitions per second on average and up to `burst` at once"""
+
+    def __init__(self, rate, burst):
+        self.rate = rate
+        self.capacity = burst
+        self.tokens = float(burst)
+        self.updated = time.monotonic()
+        self.lock = asyncio.Lock()
+
+    async def acquire(self):
+        async with self.lock:
+            while True:
+                now = time.monotonic()
+                self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+                self.updated = now
+                if self.tokens >= 1:
+                    self.tokens -= 1
+                    return
+                await asyncio.sleep((1 - self.tokens) / self.rate)
+
+class FetchError(Exception):
+    """A request that still failed after every retry"""
+
+def _retry_delay(attempt, response=None):
+    """Retry-After when the server sends seconds, otherwise capped exponential backoff with full jitter"""
+    if response is not None:
+        retry_after = response.headers.get('Retry-After')
+        if retry_after and retry_after.isdigit():
+            return min(float(retry_after), BACKOFF_CAP)
+    return random.uniform(0, min(BACKOFF_CAP, BACKOFF_BASE * 2 ** attempt))
+
+async def get_json(client, bucket, url, params=None, stats=None):
+    """
+    GET url as JSON, retrying 429/5xx responses and transport errors.
+    Returns None for 404 (no such player).
+    """
+    import httpx
+
+    for attempt in range(MAX_RETRIES + 1):
+        await bucket.acquire()
+        response = None
+        try:
+            response = await client.get(url, params=params)
+        except httpx.TransportError as e:
+            error = f"{type(e).__name__}: {e}"
+        else:
+            if response.status_code == 404:
+                return None
+            if response.status_code not in RETRY_STATUS:
+                response.raise_for_status()
+                return response.json()
+            error = f"HTTP {response.status_code}"
+
+        if stats is not None:
+            stats['retries'] += 1
+        if attempt == MAX_RETRIES:
+            raise FetchError(f"{url}: {error} after {MAX_RETRIES + 1} attempts")
+        await asyncio.sleep(_retry_delay(attempt, response))
+
+class FetchCheckpoint:
+    """
+    What has been fetched into one output file, written atomically next to
+    it: the API it came from, ids done, ids the API does not know, and the
+    output length at the time. Runs keep appending to the file whatever ids
+    they are given; on resume the output is cut back to the recorded length,
+    so a player is never written twice or half-written.
+    """
+
+    def __init__(self, output_path):
+        self.output_path = Path(output_path)
+        self.path = Path(str(output_path) + '.checkpoint.json')
+        self.state = None
+        if self.path.exists():
+            with open(self.path, 'r') as f:
+                self.state = json.load(f)
+
+    def open(self, base_url, restart=False):
+        """
+        Prepare the output for appending and return the (done, not found) id
+        sets. Only restart empties an existing output.
+        """
+        self.output_path.parent.mkdir(parents=True, exist_ok=True)
+        if restart or not self.output_path.exists():
+            self.output_path.write_bytes(b'')
+            self.state = {'base_url': base_url, 'done': [], 'not_found': [], 'bytes': 0}
+            return set(), set()
+
+        if self.state is None:
+            # An output without a checkpoint: keep its good lines, cut everything from the first bad one
+            done, length = _scan_output(self.output_path)
+            if length < os.path.getsize(self.output_path):
+                print(f"Truncating {self.output_path} after {len(done)} players at a torn or unreadable line")
+            with open(self.output_path, 'r+b') as f:
+                f.truncate(length)
+            self.state = {'base_url': base_url, 'done': sorted(done), 'not_found': [], 'bytes': length}
+            return done, set()
+
+        if self.state['base_url'] != base_url:
+            raise ValueError(f"{self.output_path} was fetched from {self.state['base_url']}, not {base_url}; "
+                             f"use --restart or another --output")
+        size = os.path.getsize(self.output_path)
+        if size < self.state['bytes']:
+            raise ValueError(f"{self.output_path} is {size} bytes, shorter than the {self.state['bytes']} its "
+                             f"checkpoint recorded; it was changed outside the fetcher, use --restart")
+        with open(self.output_path, 'r+b') as f:
+            f.truncate(self.state['bytes'])
+        return set(self.state['done']), set(self.state['not_found'])
+
+    def save(self, done, not_found, n_bytes):
+        self.state.update(done=sorted(done), not_found=sorted(not_found), bytes=n_bytes)
+        with atomic_write(self.path, 'w') as f:
+            json.dump(self.state, f)
+
+def _scan_output(path):
+    """
+    (player ids, length in bytes) of the leading good lines of an output file.
+    The scan stops at the first torn, unparseable or id-less line.
+    """
+    ids, length = set(), 0
+    with open(path, 'rb') as f:
+        for line in f:
+            if not line.endswith(b'\n'):
+                break
+            if line.strip():
+                try:
+                    player = json.loads(line)['player']
+                    ids.add(int(player.get('id', player.get('metadata', {}).get('id'))))
+                except (ValueError, KeyError, TypeError, AttributeError):
+                    break
+            length += len(line)
+    return ids, length
+
+async def list_wallet_players(client, bucket, base_url, wallets=OWNER_WALLETS):
+    """Player ids owned by each wallet, de-duplicated in first-seen order"""
+    ids = {}
+    for wallet in wallets:
+        players = await get_json(client, bucket, f"{base_url}/players",
+                                 params={'ownerWalletAddress': wallet, 'limit': WALLET_LIMIT})
+        for player in players or []:
+            ids.setdefault(int(player['id']), None)
+        print(f"Found {len(players or [])} players for wallet {wallet}")
+    return list(ids)
+
+def _make_client(concurrency):
+    try:
+        import httpx
+    except ImportError:
+        raise ImportError("The player fetcher needs httpx: pip install httpx")
+
+    # One pooled client: connections stay alive across requests instead of a handshake per player
+    limits = httpx.Limits(max_connections=concurrency, max_keepalive_connections=concurrency)
+    return httpx.AsyncClient(limits=limits, timeout=REQUEST_TIMEOUT, headers={'Accept': 'application/json'})
+
+async def fetch_players(ids=None, output_path=DEFAULT_OUTPUT, base_url=DEFAULT_BASE_URL,
+                        concurrency=DEFAULT_CONCURRENCY, rate=DEFAULT_RATE, burst=DEFAULT_BURST,
+                        wallets=OWNER_WALLETS, restart=False):
+    """
+    Fetch /players/{id} for every id (the wallets' players when ids is None)
+    and append each document as one JSONL line, in the {"player": {...}} shape
+    streaming_ingest reads. Ids already in the output are skipped; restart
+    empties it first. Returns a summary dict.
+    """
+    output_path = Path(output_path)
+    base_url = base_url.rstrip('/')
+    bucket = TokenBucket(rate, burst)
+    stats = {'retries': 0}
+
+    async with _make_client(concurrency) as client:
+        if ids is None:
+            ids = await list_wallet_players(client, bucket, base_url, wallets)
+        ids = [int(player_id) for player_id in ids]
+
+        checkpoint = FetchCheckpoint(output_path)
+        done, not_found = checkpoint.open(base_url, restart)
+        pending = [player_id for player_id in ids if player_id not in done and player_id not in not_found]
+        if len(pending) < len(ids):
+            print(f"Resuming: {len(ids) - len(pending)} of {len(ids)} already fetched or not found, "
+                  f"{len(pending)} left")
+        queue = asyncio.Queue()
+        for player_id in pending:
+            queue.put_nowait(player_id)
+
+        failed = {}
+        run = {'fetched': 0, 'not_found': 0}
+        start = time.perf_counter()
+        with open(output_path, 'ab') as out:
+            since_checkpoint = 0
+
+            def record(player_id, document):
+                nonlocal since_checkpoint
+                if document is None:
+                    not_found.add(player_id)
+                    run['not_found'] += 1
+                else:
+                    out.write(json.dumps(document, separators=(',', ':')).encode('utf-8') + b'\n')
+                    done.add(player_id)
+                    run['fetched'] += 1
+                since_checkpoint += 1
+                if since_checkpoint >= CHECKPOINT_EVERY:
+                    out.flush()
+                    checkpoint.save(done, not_found, out.tell())
+                    since_checkpoint = 0
+                    finished = run['fetched'] + run['not_found']
+                    elapsed = time.perf_counter() - start
+                    print(f"  {finished}/{len(pending)} players ({finished / elapsed:.1f}/s, "
+                          f"{stats['retries']} retries)")
+
+            async def worker():
+                while True:
+                    try:
+                        player_id = queue.get_nowait()
+                    except asyncio.QueueEmpty:
+                        return
+                    try:
+                        document = await get_json(client, bucket, f"{base_url}/players/{player_id}", stats=stats)
+                    except Exception as e:
+                        failed[player_id] = str(e)
+                        continue
+                    # Writes happen between awaits, so lines never interleave
+                    record(player_id, document)
+
+            await asyncio.gather(*(worker() for _ in range(concurrency)))
+            out.flush()
+            checkpoint.save(done, not_found, out.tell())
+
+    elapsed = time.perf_counter() - start
+    print(f"Fetched {run['fetched']} players ({run['not_found']} not found, {len(failed)} failed, "
+          f"{stats['retries']} retries) in {elapsed:.1f}s; {len(done)} players in {output_path}")
+    for player_id, error in list(failed.items())[:10]:
+        print(f"  failed {player_id}: {error}")
+    return {'fetched': run['fetched'], 'not_found': run['not_found'], 'total': len(done), 'failed': failed,
+            'retries': stats['retries'], 'seconds': elapsed}
+
+def read_ids(path):
+    """Player ids, one per line (blank lines and # comments skipped)"""
+    with open(path, 'r') as f:
+        return [int(line.split('#')[0]) for line in f if line.split('#')[0].strip()]
+
+def main():
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Fetch MFL player documents into a JSONL dataset source")
+    parser.add_argument('--output', default=str(DEFAULT_OUTPUT))
+    parser.add_argument('--base-url', default=DEFAULT_BASE_URL)
+    ids = parser.add_mutually_exclusive_group()
+    ids.add_argument('--ids', help='File of player ids, one per line (default: the owner wallets\' players)')
+    ids.add_argument('--range', nargs=2, type=int, metavar=('FIRST', 'LAST'), help='Every id in FIRST..LAST')
+    parser.add_argument('--concurrency', type=int, default=DEFAULT_CONCURRENCY)
+    parser.add_argument('--rate', type=float, default=DEFAULT_RATE, help='Requests per second')
+    parser.add_argument('--burst', type=int, default=DEFAULT_BURST)
+    parser.add_argument('--restart', action='store_true', help='Empty the output and fetch everything again')
+    parser.add_argument('--no-snapshot', action='store_true', help='Do not rebuild the dataset snapshot afterwards')
+    args = parser.parse_args()
+
+    player_ids = read_ids(args.ids) if args.ids else list(range(args.range[0], args.range[1] + 1)) if args.range else None
+    try:
+        summary = asyncio.run(fetch_players(player_ids, args.output, args.base_url, args.concurrency,
+                                            args.rate, args.burst, restart=args.restart))
+    except ValueError as e:
+        print(f"Error: {e}")
+        return 1
+
+    # Data/*.jsonl is a snapshot source: parse it into the columnar cache training reads
+    if not args.no_snapshot and Path(args.output).resolve().parent == (PROJECT_ROOT / "Data").resolve():
+        from dataset_builder import build_snapshot
+        build_snapshot()
+    return 1 if summary['failed'] else 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,183 @@
+#!/usr/bin/env python3
+"""
+Player Query Engine
+Answers scouting queries (attribute and position rating ranges) from sorted column indexes
+"""
+
+import numpy as np
+
+from player_dataset import load_player_dataset, ATTRIBUTE_COLS, POSITIONS, position_name, secondary_names
+
+DEFAULT_PAGE_SIZE = 25
+MAX_PAGE_SIZE = 200
+
+class PlayerQueryEngine:
+    """
+    Keeps one sorted index per attribute / position rating column and an
+    inverted index from position to players, and intersects them per query.
+    """
+
+    def __init__(self, dataset):
+        self.ids = dataset['id']
+        self.names = dataset['name']
+        self.primary_code = dataset['primary_code']
+        self.secondary_codes = dataset['secondary_codes']
+
+        self.columns = {}
+        for i, attr in enumerate(ATTRIBUTE_COLS):
+            self.columns[attr] = dataset['attributes'][:, i]
+        for extra in ['overall', 'age', 'height']:
+            self.columns[extra] = dataset[extra]
+        for i, position in enumerate(POSITIONS):
+            self.columns[position] = dataset['position_ratings'][:, i]
+
+        # Sorted index per column: row order and the values in that order
+        self.sorted_rows = {}
+        self.sorted_values = {}
+        for name, values in self.columns.items():
+            order = np.argsort(values, kind='stable')
+            self.sorted_rows[name] = order
+            self.sorted_values[name] = values[order]
+
+        # Inverted index: position -> sorted rows of players who can play it
+        self.position_rows = {}
+        self.primary_rows = {}
+        for code, position in enumerate(POSITIONS):
+            is_primary = self.primary_code == code
+            self.primary_rows[position] = np.flatnonzero(is_primary)
+            self.position_rows[position] = np.flatnonzero(is_primary | (self.secondary_codes == code).any(axis=1))
+
+    def __len__(self):
+        return len(self.ids)
+
+    def _range_rows(self, column, low, high):
+        """Rows whose column value is within [low, high], read from the sorted index"""
+        values = self.sorted_values[column]
+        start = 0 if low is None else np.searchsorted(values, low, side='left')
+        stop = len(values) if high is None else np.searchsorted(values, high, side='right')
+        return self.sorted_rows[column][start:stop]
+
+    def _range_count(self, column, low, high):
+        values = self.sorted_values[column]
+        start = 0 if low is None else np.searchsorted(values, low, side='left')
+        stop = len(values) if high is None else np.searchsorted(values, high, side='right')
+        return max(0, stop - start)
+
+    def match(self, filters=None, positions=None, primary_only=False):
+        """
+        Return the sorted rows matching every filter.
+
+        filters: {column: (min, max)} with None for an open bound
+        positions: players must be able to play at least one of these positions
+        """
+        filters = {
+            column: bounds for column, bounds in (filters or {}).items()
+            if bounds[0] is not None or bounds[1] is not None
+        }
+        for column in filters:
+            if column not in self.columns:
+                raise ValueError(f"Unknown filter column: {column}")
+
+        # Candidate sets, smallest first
+        candidates = []
+        if positions:
+            lookup = self.primary_rows if primary_only else self.position_rows
+            position_sets = [lookup.get(position, np.empty(0, dtype=np.int64)) for position in positions]
+            rows = np.unique(np.concatenate(position_sets))
+            candidates.append((len(rows), 'positions', rows))
+        for column, (low, high) in filters.items():
+            candidates.append((self._range_count(column, low, high), column, None))
+        candidates.sort(key=lambda item: item[0])
+
+        if not candidates:
+            return np.arange(len(self.ids))
+
+        # Materialise the most selective index, then intersect the rest against it
+        _, first, rows = candidates[0]
+        if rows is None:
+            rows = np.sort(self._range_rows(first, *filters[first]))
+
+        for count, column, position_set in candidates[1:]:
+            if len(rows) == 0:
+                break
+            if column == 'positions':
+                rows = rows[np.isin(rows, position_set, assume_unique=True)]
+            elif count < len(rows):
+                rows = np.intersect1d(rows, self._range_rows(column, *filters[column]), assume_unique=True)
+            else:
+                # Cheaper to probe the column for the few remaining rows
+                low, high = filters[column]
+                values = self.columns[column][rows]
+                keep = np.ones(len(rows), dtype=bool)
+                if low is not None:
+                    keep &= values >= low
+                if high is not None:
+                    keep &= values <= high
+                rows = rows[keep]
+
+        return rows
+
+    def query(self, filters=None, positions=None, primary_only=False,
+              sort_by='overall', descending=True, page=1, page_size=DEFAULT_PAGE_SIZE):
+        """
+        Run a conjunctive range query and return one page of players
+        """
+        if sort_by not in self.columns:
+            raise ValueError(f"Unknown sort column: {sort_by}")
+        page = max(1, page)
+        page_size = max(1, min(page_size, MAX_PAGE_SIZE))
+
+        rows = self.match(filters, positions, primary_only)
+
+        sort_values = self.columns[sort_by][rows]
+        # uint8 columns: widen before negating
+        order = np.argsort(-sort_values.astype(np.int16) if descending else sort_values, kind='stable')
+        start = (page - 1) * page_size
+        page_rows = rows[order[start:start + page_size]]
+
+        return {
+            'total': int(len(rows)),
+            'page': page,
+            'pageSize': page_size,
+            'players': [self.describe(row) for row in page_rows]
+        }
+
+    def describe(self, row):
+        """Plain dict for one player row"""
+        return {
+            'id': int(self.ids[row]),
+            'name': str(self.names[row]),
+            'primaryPosition': position_name(self.primary_code[row]),
+            'secondaryPositions': secondary_names(self.secondary_codes[row]),
+            'overall': int(self.columns['overall'][row]),
+            'attributes': {attr: int(self.columns[attr][row]) for attr in ATTRIBUTE_COLS},
+            'positionRatings': {
+                position: int(self.columns[position][row])
+                for position in POSITIONS if self.columns[position][row] > 0
+            }
+        }
+
+def build_query_engine(excel_path=None):
+    """Build the query engine from the cached player dataset"""
+    dataset = load_player_dataset(excel_path) if excel_path else load_player_dataset()
+    return PlayerQueryEngine(dataset)
+
+if __name__ == "__main__":
+    import time
+
+    engine = build_query_engine()
+    print(f"Indexed {len(engine)} players")
+
+    # "LB with DEF >= 80 and PAC >= 75 whose CB rating >= 70"
+    filters = {'DEF': (80, None), 'PAC': (75, None), 'CB': (70, None)}
+    result = engine.query(filters, positions=['LB'], page_size=5)
+    print(f"\nLB with DEF>=80, PAC>=75, CB>=70: {result['total']} players")
+    for player in result['players']:
+        print(f"  {player['name']} ({player['primaryPosition']}): overall={player['overall']}")
+
+    n_queries = 1000
+    start = time.perf_counter()
+    for _ in range(n_queries):
+        engine.match(filters, positions=['LB'])
+    elapsed = (time.perf_counter() - start) / n_queries
+    print(f"\nAverage match time: {elapsed * 1000:.3f} ms")
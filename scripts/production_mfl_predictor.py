@@ -6,10 +6,46 @@ Ready for deployment to the API
 
 import json
 from datetime import datetime
+from functools import lru_cache
 
-def calculate_mfl_position_rating(attributes, primary_pos, target_pos):
+from mfl_rules import get_player_familiarity_level as _player_familiarity_level
+
+# Position-specific calculations based on MFL game rules
+POSITION_WEIGHTS = {
+    'CB': {'DEF': 0.65, 'PHY': 0.2, 'PAS': 0.1, 'PAC': 0.03, 'SHO': 0.01, 'DRI': 0.01},
+    'LB': {'PAC': 0.25, 'PAS': 0.25, 'DEF': 0.25, 'DRI': 0.15, 'PHY': 0.08, 'SHO': 0.02},
+    'RB': {'PAC': 0.25, 'PAS': 0.25, 'DEF': 0.25, 'DRI': 0.15, 'PHY': 0.08, 'SHO': 0.02},
+    'LWB': {'PAC': 0.3, 'PAS': 0.25, 'DRI': 0.25, 'DEF': 0.1, 'PHY': 0.05, 'SHO': 0.05},
+    'RWB': {'PAC': 0.3, 'PAS': 0.25, 'DRI': 0.25, 'DEF': 0.1, 'PHY': 0.05, 'SHO': 0.05},
+    'CDM': {'PAS': 0.3, 'DEF': 0.25, 'DRI': 0.15, 'PAC': 0.15, 'PHY': 0.1, 'SHO': 0.05},
+    'CM': {'PAS': 0.35, 'DRI': 0.25, 'PAC': 0.2, 'SHO': 0.1, 'DEF': 0.05, 'PHY': 0.05},
+    'CAM': {'PAS': 0.3, 'DRI': 0.25, 'SHO': 0.25, 'PAC': 0.15, 'DEF': 0.0, 'PHY': 0.05},
+    'LM': {'PAC': 0.3, 'PAS': 0.25, 'DRI': 0.25, 'SHO': 0.1, 'DEF': 0.05, 'PHY': 0.05},
+    'RM': {'PAC': 0.3, 'PAS': 0.25, 'DRI': 0.25, 'SHO': 0.1, 'DEF': 0.05, 'PHY': 0.05},
+    'CF': {'SHO': 0.4, 'DRI': 0.25, 'PAS': 0.2, 'PAC': 0.1, 'DEF': 0.02, 'PHY': 0.03},
+    'ST': {'SHO': 0.5, 'PAC': 0.25, 'DRI': 0.15, 'PAS': 0.1},
+    'LW': {'PAC': 0.25, 'DRI': 0.3, 'SHO': 0.2, 'PAS': 0.2, 'DEF': 0.0, 'PHY': 0.05},
+    'RW': {'PAC': 0.25, 'DRI': 0.3, 'SHO': 0.2, 'PAS': 0.2, 'DEF': 0.0, 'PHY': 0.05}
+}
+
+# Output order of predict_all_positions
+PREDICTION_POSITIONS = ['ST', 'CF', 'CAM', 'RW', 'LW', 'RM', 'LM', 'CM', 'CDM', 'RWB', 'LWB', 'RB', 'LB', 'CB', 'GK']
+FAMILIARITY_LEVELS = ['Primary', 'Secondary', 'Fairly Familiar', 'Somewhat Familiar', 'Unfamiliar']
+
+METHOD = 'mfl-deterministic'
+CONFIDENCE = 0.95  # High confidence for deterministic rules
+
+# The batch path rates GK from a derived attribute, the truncated goalkeeping
+# score of calculate_gk_rating, so every position shares one pipeline
+BATCH_WEIGHTS = {**POSITION_WEIGHTS, 'GK': {'GK': 1.0}}
+
+# One record per (player, position); familiarity indexes FAMILIARITY_LEVELS
+PREDICTION_DTYPE = [('rating', 'u1'), ('familiarity', 'u1'), ('penalty', 'i1')]
+
+def calculate_mfl_position_rating(attributes, primary_pos, target_pos, secondary_positions=()):
     """
-    Calculate position rating using MFL deterministic rules
+    Calculate position rating using MFL deterministic rules.
+    secondary_positions: the player's other positions, which can lift familiarity
     """
     PAC, SHO, PAS, DRI, DEF, PHY = attributes
     
@@ -18,7 +54,7 @@ def calculate_mfl_position_rating(attributes, primary_pos, target_pos):
         return calculate_gk_rating(attributes, primary_pos)
     
     # Get familiarity level
-    familiarity = get_familiarity_level(primary_pos, target_pos)
+    familiarity = get_player_familiarity_level(primary_pos, target_pos, secondary_positions)
     
     # Apply familiarity penalty
     penalty = get_familiarity_penalty(familiarity)
@@ -66,6 +102,10 @@ def get_familiarity_level(primary_pos, target_pos):
     else:
         return 'Unfamiliar'
 
+def get_player_familiarity_level(primary_pos, target_pos, secondary_positions=()):
+    """mfl_rules.get_player_familiarity_level over this module's familiarity maps"""
+    return _player_familiarity_level(primary_pos, target_pos, secondary_positions, get_familiarity_level)
+
 def get_secondary_positions(primary_pos):
     """Get secondary positions for a given primary position"""
     secondary_map = {
@@ -147,25 +187,7 @@ def calculate_base_position_rating(attributes, position):
     """
     PAC, SHO, PAS, DRI, DEF, PHY = attributes
     
-    # Position-specific calculations based on MFL game rules
-    position_weights = {
-        'CB': {'DEF': 0.65, 'PHY': 0.2, 'PAS': 0.1, 'PAC': 0.03, 'SHO': 0.01, 'DRI': 0.01},
-        'LB': {'PAC': 0.25, 'PAS': 0.25, 'DEF': 0.25, 'DRI': 0.15, 'PHY': 0.08, 'SHO': 0.02},
-        'RB': {'PAC': 0.25, 'PAS': 0.25, 'DEF': 0.25, 'DRI': 0.15, 'PHY': 0.08, 'SHO': 0.02},
-        'LWB': {'PAC': 0.3, 'PAS': 0.25, 'DRI': 0.25, 'DEF': 0.1, 'PHY': 0.05, 'SHO': 0.05},
-        'RWB': {'PAC': 0.3, 'PAS': 0.25, 'DRI': 0.25, 'DEF': 0.1, 'PHY': 0.05, 'SHO': 0.05},
-        'CDM': {'PAS': 0.3, 'DEF': 0.25, 'DRI': 0.15, 'PAC': 0.15, 'PHY': 0.1, 'SHO': 0.05},
-        'CM': {'PAS': 0.35, 'DRI': 0.25, 'PAC': 0.2, 'SHO': 0.1, 'DEF': 0.05, 'PHY': 0.05},
-        'CAM': {'PAS': 0.3, 'DRI': 0.25, 'SHO': 0.25, 'PAC': 0.15, 'DEF': 0.0, 'PHY': 0.05},
-        'LM': {'PAC': 0.3, 'PAS': 0.25, 'DRI': 0.25, 'SHO': 0.1, 'DEF': 0.05, 'PHY': 0.05},
-        'RM': {'PAC': 0.3, 'PAS': 0.25, 'DRI': 0.25, 'SHO': 0.1, 'DEF': 0.05, 'PHY': 0.05},
-        'CF': {'SHO': 0.4, 'DRI': 0.25, 'PAS': 0.2, 'PAC': 0.1, 'DEF': 0.02, 'PHY': 0.03},
-        'ST': {'SHO': 0.5, 'PAC': 0.25, 'DRI': 0.15, 'PAS': 0.1},
-        'LW': {'PAC': 0.25, 'DRI': 0.3, 'SHO': 0.2, 'PAS': 0.2, 'DEF': 0.0, 'PHY': 0.05},
-        'RW': {'PAC': 0.25, 'DRI': 0.3, 'SHO': 0.2, 'PAS': 0.2, 'DEF': 0.0, 'PHY': 0.05}
-    }
-    
-    weights = position_weights.get(position, {})
+    weights = POSITION_WEIGHTS.get(position, {})
     
     # Calculate weighted rating
     rating = 0
@@ -185,26 +207,203 @@ def calculate_base_position_rating(attributes, position):
     
     return round(rating)
 
+@lru_cache(maxsize=None)
+def _rule_tables():
+    """
+    (familiarity codes, penalties) per (primary, target position) taken from
+    the scalar rules; the last row is for primaries the rules do not know
+    """
+    import numpy as np
+
+    primaries = PREDICTION_POSITIONS + [None]
+    familiarity = np.empty((len(primaries), len(PREDICTION_POSITIONS)), dtype=np.uint8)
+    penalty = np.empty((len(primaries), len(PREDICTION_POSITIONS)), dtype=np.int8)
+    for p, primary in enumerate(primaries):
+        for t, target in enumerate(PREDICTION_POSITIONS):
+            _, level, level_penalty = calculate_mfl_position_rating([0] * 6, primary, target)
+            familiarity[p, t] = FAMILIARITY_LEVELS.index(level)
+            penalty[p, t] = level_penalty
+    return familiarity, penalty
+
+@lru_cache(maxsize=None)
+def _lent_familiarity():
+    """
+    (2**15, 15) best familiarity code each set of secondary positions lends
+    each target (bit j of the set is PREDICTION_POSITIONS[j]), from the level
+    the scalar rules give a lone secondary position
+    """
+    import numpy as np
+    from rating_engine import lent_familiarity
+
+    owned = np.array([
+        [FAMILIARITY_LEVELS.index(calculate_mfl_position_rating([0] * 6, None, target, [position])[1])
+         for target in PREDICTION_POSITIONS]
+        for position in PREDICTION_POSITIONS
+    ], dtype=np.uint8)
+    return lent_familiarity(owned)
+
+@lru_cache(maxsize=None)
+def _rating_bounds():
+    """(floor, ceiling) per (familiarity code, position): 1-99, except a primary GK's score, used as is"""
+    import numpy as np
+
+    floor = np.ones((len(FAMILIARITY_LEVELS), len(PREDICTION_POSITIONS)))
+    ceiling = np.full_like(floor, 99)
+    gk = PREDICTION_POSITIONS.index('GK')
+    floor[FAMILIARITY_LEVELS.index('Primary'), gk] = 0
+    ceiling[FAMILIARITY_LEVELS.index('Primary'), gk] = 255
+    return floor, ceiling
+
+def _secondary_masks(secondary_positions):
+    """Per-player secondary positions (list or 'RM, CM' string) -> bit masks over PREDICTION_POSITIONS"""
+    import numpy as np
+
+    masks = np.zeros(len(secondary_positions), dtype=np.intp)
+    for row, positions in enumerate(secondary_positions):
+        if isinstance(positions, str):
+            positions = positions.split(',')
+        for position in positions or ():
+            position = position.strip()
+            if position in PREDICTION_POSITIONS:
+                masks[row] |= 1 << PREDICTION_POSITIONS.index(position)
+    return masks
+
+class BatchPredictions:
+    """
+    Position predictions for a batch of players backed by one structured array:
+    records[i, j] is (rating, familiarity code, penalty) of player i at
+    PREDICTION_POSITIONS[j]. Method, confidence and timestamp are stored once
+    for the batch; the per-position dicts of predict_all_positions are only
+    built when to_dict() asks for them.
+    """
+
+    __slots__ = ('records', 'primary_positions', 'method', 'confidence', 'timestamp')
+
+    def __init__(self, records, primary_positions, timestamp=None):
+        self.records = records
+        self.primary_positions = primary_positions
+        self.method = METHOD
+        self.confidence = CONFIDENCE
+        self.timestamp = timestamp or datetime.now().isoformat()
+
+    def __len__(self):
+        return len(self.records)
+
+    @property
+    def ratings(self):
+        """(N, 15) uint8 ratings in PREDICTION_POSITIONS order"""
+        return self.records['rating']
+
+    def rating(self, i, position):
+        return int(self.records['rating'][i, PREDICTION_POSITIONS.index(position)])
+
+    def to_dict(self, i):
+        """Player i as returned by predict_all_positions"""
+        return {
+            position: {
+                'position': position,
+                'predicted_rating': int(rating),
+                'confidence': self.confidence,
+                'method': self.method,
+                'familiarity': FAMILIARITY_LEVELS[familiarity],
+                'penalty': int(penalty)
+            }
+            for position, (rating, familiarity, penalty) in zip(PREDICTION_POSITIONS, self.records[i].tolist())
+        }
+
+    def to_response(self, i):
+        """Player i as returned by mfl_predict_position_ratings"""
+        return {
+            "predictions": self.to_dict(i),
+            "method": self.method,
+            "timestamp": self.timestamp,
+            "confidence": self.confidence
+        }
+
+    def __iter__(self):
+        return (self.to_dict(i) for i in range(len(self)))
+
+def predict_batch(attributes, primary_positions, secondary_positions=None):
+    """
+    Predict every position for many players in one pass.
+
+    attributes: (N, 6) PAC, SHO, PAS, DRI, DEF, PHY
+    primary_positions: N primary position names
+    secondary_positions: optional N lists (or 'RM, CM' strings) of each
+    player's other positions, which can lift familiarity
+    Returns a BatchPredictions matching calculate_mfl_position_rating for
+    each (player, position).
+    """
+    import numpy as np
+
+    A = np.asarray(attributes, dtype=np.float64).reshape(-1, 6)
+    primary_positions = list(primary_positions)
+    if len(primary_positions) != len(A):
+        raise ValueError(f"{len(A)} attribute rows but {len(primary_positions)} primary positions")
+
+    familiarity, penalty = _rule_tables()
+    index = {position: i for i, position in enumerate(PREDICTION_POSITIONS)}
+    primary = np.array([index.get(position, len(PREDICTION_POSITIONS)) for position in primary_positions],
+                       dtype=np.intp)
+
+    records = np.empty((len(A), len(PREDICTION_POSITIONS)), dtype=PREDICTION_DTYPE)
+    records['familiarity'] = familiarity[primary]
+    records['penalty'] = penalty[primary]
+    if secondary_positions is not None:
+        if len(secondary_positions) != len(A):
+            raise ValueError(f"{len(A)} attribute rows but {len(secondary_positions)} secondary position lists")
+        # Best level across primary and secondaries; GK is only lent by a primary GK
+        lent = _lent_familiarity()[_secondary_masks(secondary_positions)]
+        improved = lent < records['familiarity']
+        records['familiarity'] = np.where(improved, lent, records['familiarity'])
+        level_penalties = np.array([get_familiarity_penalty(level) for level in FAMILIARITY_LEVELS], dtype=np.int8)
+        records['penalty'] = np.where(improved, level_penalties[lent], records['penalty'])
+
+    columns = dict(zip(['PAC', 'SHO', 'PAS', 'DRI', 'DEF', 'PHY'], A.T))
+    columns['GK'] = np.trunc(columns['DEF'] * 0.6 + columns['PHY'] * 0.3 + columns['PAS'] * 0.1)
+    floor, ceiling = _rating_bounds()
+    for t, position in enumerate(PREDICTION_POSITIONS):
+        # Accumulate in the weights' dict order, as the scalar loop does, then round half-even
+        rating = np.zeros(len(A))
+        for attr, weight in BATCH_WEIGHTS[position].items():
+            rating += columns[attr] * weight
+        # Penalty, then the bounds of each player's familiarity level
+        levels = records['familiarity'][:, t]
+        rating = np.rint(rating) + records['penalty'][:, t]
+        np.maximum(rating, np.take(floor[:, t], levels), out=rating)
+        records['rating'][:, t] = np.minimum(rating, np.take(ceiling[:, t], levels), out=rating)
+
+    return BatchPredictions(records, primary_positions)
+
+def _secondary_list(secondary_pos):
+    """None, a list, or an 'RM, CM' string -> list of position names"""
+    if not secondary_pos:
+        return []
+    if isinstance(secondary_pos, str):
+        secondary_pos = secondary_pos.split(',')
+    return [position.strip() for position in secondary_pos]
+
 def predict_all_positions(attributes, primary_pos, secondary_pos=None):
     """
-    Predict ratings for all positions using MFL rules
+    Predict ratings for all positions using MFL rules.
+    One player is rated with the scalar rules; predict_batch is for many.
     """
-    positions = ['ST', 'CF', 'CAM', 'RW', 'LW', 'RM', 'LM', 'CM', 'CDM', 'RWB', 'LWB', 'RB', 'LB', 'CB', 'GK']
-    
+    secondary_positions = _secondary_list(secondary_pos)
+
     predictions = {}
-    for position in positions:
+    for position in PREDICTION_POSITIONS:
         rating, familiarity, penalty = calculate_mfl_position_rating(
-            attributes, primary_pos, position
+            attributes, primary_pos, position, secondary_positions
         )
         predictions[position] = {
             'position': position,
             'predicted_rating': rating,
-            'confidence': 0.95,  # High confidence for deterministic rules
-            'method': 'mfl-deterministic',
+            'confidence': CONFIDENCE,
+            'method': METHOD,
             'familiarity': familiarity,
             'penalty': penalty
         }
-    
+
     return predictions
 
 def mfl_predict_position_ratings(attributes, primary_pos, secondary_pos=None):
@@ -219,13 +418,11 @@ def mfl_predict_position_ratings(attributes, primary_pos, secondary_pos=None):
     Returns:
         Dictionary with position ratings and metadata
     """
-    predictions = predict_all_positions(attributes, primary_pos, secondary_pos)
-    
     return {
-        "predictions": predictions,
-        "method": "mfl-deterministic",
+        "predictions": predict_all_positions(attributes, primary_pos, secondary_pos),
+        "method": METHOD,
         "timestamp": datetime.now().isoformat(),
-        "confidence": 0.95
+        "confidence": CONFIDENCE
     }
 
 # Example usage for testing
@@ -256,3 +453,15 @@ if __name__ == "__main__":
 
 
 
+
+    # Batch path: one structured array for many players, metadata stored once
+    import time
+    import numpy as np
+
+    rng = np.random.default_rng(0)
+    batch_attributes = rng.integers(30, 99, size=(100_000, 6))
+    batch_primary = [PREDICTION_POSITIONS[i] for i in rng.integers(0, len(PREDICTION_POSITIONS), 100_000)]
+    start = time.perf_counter()
+    batch = predict_batch(batch_attributes, batch_primary)
+    elapsed = time.perf_counter() - start
+    print(f"\nBatch: {len(batch):,} players in {elapsed * 1000:.1f} ms, {batch.records.nbytes / 1e6:.1f} MB of records")
@@ -0,0 +1,275 @@
+#!/usr/bin/env python3
+"""
+Player Progression Store
+Append-only (player id, timestamp) history of attributes with precomputed position rating deltas
+"""
+
+import os
+import json
+import time
+import numpy as np
+from pathlib import Path
+
+from player_dataset import CACHE_DIR, POSITIONS, atomic_write, position_name
+from rating_engine import rate_players, position_masks_from_codes
+
+DEFAULT_STORE_DIR = CACHE_DIR / "progression"
+
+# Columns written per segment: one row per player whose attributes or positions changed
+SEGMENT_COLUMNS = ('id', 'timestamp', 'attributes', 'primary_code', 'position_mask', 'ratings', 'deltas', 'is_new')
+
+def _with_position_mask(arrays):
+    """
+    Stores written before positions were tracked have no position_mask; their
+    ratings were primary-only, which is the mask of the primary position alone
+    """
+    if 'position_mask' not in arrays and 'primary_code' in arrays:
+        arrays['position_mask'] = position_masks_from_codes(arrays['primary_code'])
+    return arrays
+
+class ProgressionStore:
+    """
+    Segments are immutable .npz files, one per ingested snapshot, listed in
+    manifest.json. state.npz holds the latest attributes and ratings per player
+    (sorted by id) so a new snapshot can be diffed without replaying history;
+    it is derived data and can always be rebuilt from the segments.
+
+    Files are replaced atomically and manifest.json is the commit point: a
+    segment exists once it is listed. state.npz records how many listed
+    segments it reflects, and is rebuilt from them when that count disagrees
+    with the manifest (a crash between the two writes).
+    """
+
+    def __init__(self, store_dir=DEFAULT_STORE_DIR):
+        self.store_dir = Path(store_dir)
+        self.manifest_path = self.store_dir / "manifest.json"
+        self.state_path = self.store_dir / "state.npz"
+
+        if self.manifest_path.exists():
+            with open(self.manifest_path, 'r') as f:
+                self.manifest = json.load(f)
+        else:
+            self.manifest = {'segments': []}
+
+        applied = 0
+        if self.state_path.exists():
+            with np.load(self.state_path) as state:
+                self.state = _with_position_mask({key: state[key] for key in state.files})
+            # Stores from before the count was kept are rebuilt once
+            applied = int(self.state.pop('segments', -1))
+        else:
+            self.state = self._empty_state()
+
+        if applied != len(self.manifest['segments']):
+            self.rebuild_state()
+
+    @staticmethod
+    def _empty_state():
+        return {
+            'id': np.empty(0, dtype=np.int64),
+            'timestamp': np.empty(0, dtype=np.int64),
+            'attributes': np.empty((0, 6), dtype=np.uint8),
+            'primary_code': np.empty(0, dtype=np.uint8),
+            'position_mask': np.empty(0, dtype=np.uint16),
+            'ratings': np.empty((0, len(POSITIONS)), dtype=np.uint8),
+        }
+
+    def __len__(self):
+        return len(self.state['id'])
+
+    def _write_json(self, path, data):
+        with atomic_write(path, 'w') as f:
+            json.dump(data, f, indent=2)
+
+    def _write_npz(self, path, arrays):
+        with atomic_write(path) as f:
+            np.savez(f, **arrays)
+
+    def _write_state(self):
+        self._write_npz(self.state_path, {'segments': np.int64(len(self.manifest['segments'])), **self.state})
+
+    def _lookup(self, ids):
+        """Rows of ids in the current state, and whether each id is known"""
+        positions = np.searchsorted(self.state['id'], ids)
+        positions = np.minimum(positions, max(len(self.state['id']) - 1, 0))
+        known = len(self.state['id']) > 0
+        found = self.state['id'][positions] == ids if known else np.zeros(len(ids), dtype=bool)
+        return positions, found
+
+    def ingest(self, dataset, timestamp=None, source=None):
+        """
+        Append one snapshot. Only players that are new or whose attributes or
+        positions (primary or secondary) changed are re-rated and written, each with its rating
+        delta against the previous state. Returns the number of rows appended.
+        """
+        timestamp = int(time.time() if timestamp is None else timestamp)
+        if self.manifest['segments'] and timestamp < self.manifest['segments'][-1]['max_timestamp']:
+            raise ValueError("Snapshots must be ingested in timestamp order")
+
+        # Last row per id wins if a snapshot repeats a player
+        ids = np.asarray(dataset['id'], dtype=np.int64)
+        _, last = np.unique(ids[::-1], return_index=True)
+        rows = np.sort(len(ids) - 1 - last)
+        ids = ids[rows]
+        attributes = np.asarray(dataset['attributes'], dtype=np.uint8)[rows]
+        primary = np.asarray(dataset['primary_code'], dtype=np.uint8)[rows]
+        masks = position_masks_from_codes(np.column_stack([primary, np.asarray(dataset['secondary_codes'])[rows]]))
+
+        positions, found = self._lookup(ids)
+        changed = ~found
+        if found.any():
+            previous = positions[found]
+            changed[found] = (
+                (self.state['attributes'][previous] != attributes[found]).any(axis=1)
+                | (self.state['primary_code'][previous] != primary[found])
+                | (self.state['position_mask'][previous] != masks[found])
+            )
+
+        changed_rows = np.flatnonzero(changed)
+        if len(changed_rows) == 0:
+            print(f"No attribute or position changes in {source or 'snapshot'}")
+            return 0
+
+        ratings = rate_players(attributes[changed_rows], primary[changed_rows], position_masks=masks[changed_rows])
+        is_new = ~found[changed_rows]
+        deltas = ratings.astype(np.int16)
+        known = ~is_new
+        deltas[known] -= self.state['ratings'][positions[changed_rows][known]]
+        deltas[is_new] = 0
+
+        segment = {
+            'id': ids[changed_rows],
+            'timestamp': np.full(len(changed_rows), timestamp, dtype=np.int64),
+            'attributes': attributes[changed_rows],
+            'primary_code': primary[changed_rows],
+            'position_mask': masks[changed_rows],
+            'ratings': ratings,
+            'deltas': deltas,
+            'is_new': is_new,
+        }
+
+        os.makedirs(self.store_dir, exist_ok=True)
+        # A file of this name left by an ingest that crashed before listing it is unlisted, so replacing it is safe
+        segment_file = f"segment-{len(self.manifest['segments']) + 1:06d}.npz"
+        self._write_npz(self.store_dir / segment_file, segment)
+
+        self.manifest['segments'].append({
+            'file': segment_file,
+            'source': None if source is None else str(source),
+            'rows': len(changed_rows),
+            'new_players': int(is_new.sum()),
+            'min_timestamp': timestamp,
+            'max_timestamp': timestamp,
+        })
+        # The manifest commits the segment; state follows and is rebuilt if this is where we stop
+        self._write_json(self.manifest_path, self.manifest)
+        self._apply(segment)
+        self._write_state()
+
+        print(f"Appended {len(changed_rows)} changed players ({int(is_new.sum())} new) from {source or 'snapshot'}")
+        return len(changed_rows)
+
+    def _apply(self, segment):
+        """Merge a segment into the latest-state arrays"""
+        positions, found = self._lookup(segment['id'])
+        for key in ('timestamp', 'attributes', 'primary_code', 'position_mask', 'ratings'):
+            self.state[key][positions[found]] = segment[key][found]
+
+        if not found.all():
+            merged = {key: np.concatenate([self.state[key], segment[key][~found]]) for key in self.state}
+            order = np.argsort(merged['id'], kind='stable')
+            self.state = {key: values[order] for key, values in merged.items()}
+
+    def rebuild_state(self):
+        """Recompute state.npz by replaying every segment"""
+        self.state = self._empty_state()
+        for segment in self.iter_segments():
+            self._apply(segment)
+        os.makedirs(self.store_dir, exist_ok=True)
+        self._write_state()
+
+    def iter_segments(self, since=None, until=None, columns=SEGMENT_COLUMNS):
+        """Yield segments overlapping [since, until] as dicts of the requested columns"""
+        for entry in self.manifest['segments']:
+            if since is not None and entry['max_timestamp'] < since:
+                continue
+            if until is not None and entry['min_timestamp'] > until:
+                continue
+            with np.load(self.store_dir / entry['file']) as segment:
+                stored = {key: segment[key] for key in segment.files if key in columns or key == 'primary_code'}
+            stored = _with_position_mask(stored) if 'position_mask' in columns else stored
+            yield {key: stored[key] for key in columns}
+
+    def top_gainers(self, position, since=None, until=None, k=10, include_new=False):
+        """
+        Players with the largest summed rating change at a position between
+        since and until (unix seconds), answered from the stored deltas
+        """
+        column = POSITIONS.index(position)
+        ids, deltas = [], []
+        for segment in self.iter_segments(since, until, columns=('id', 'timestamp', 'deltas', 'is_new')):
+            keep = np.ones(len(segment['id']), dtype=bool)
+            if since is not None:
+                keep &= segment['timestamp'] >= since
+            if until is not None:
+                keep &= segment['timestamp'] <= until
+            if not include_new:
+                keep &= ~segment['is_new']
+            ids.append(segment['id'][keep])
+            deltas.append(segment['deltas'][keep, column])
+
+        if not ids or not sum(len(chunk) for chunk in ids):
+            return []
+
+        player_ids, inverse = np.unique(np.concatenate(ids), return_inverse=True)
+        totals = np.bincount(inverse, weights=np.concatenate(deltas), minlength=len(player_ids))
+
+        k = min(k, len(totals))
+        top = np.argpartition(-totals, k - 1)[:k]
+        top = top[np.argsort(-totals[top], kind='stable')]
+
+        positions, _ = self._lookup(player_ids[top])
+        return [
+            {
+                'id': int(player_ids[i]),
+                'delta': int(totals[i]),
+                'rating': int(self.state['ratings'][row, column]),
+                'primaryPosition': position_name(self.state['primary_code'][row]),
+            }
+            for i, row in zip(top, positions)
+        ]
+
+    def history(self, player_id):
+        """(timestamps, attributes, ratings) recorded for one player, oldest first"""
+        timestamps, attributes, ratings = [], [], []
+        for segment in self.iter_segments(columns=('id', 'timestamp', 'attributes', 'ratings')):
+            rows = np.flatnonzero(segment['id'] == player_id)
+            timestamps.append(segment['timestamp'][rows])
+            attributes.append(segment['attributes'][rows])
+            ratings.append(segment['ratings'][rows])
+
+        if not timestamps:
+            return np.empty(0, dtype=np.int64), np.empty((0, 6), dtype=np.uint8), np.empty((0, len(POSITIONS)), dtype=np.uint8)
+        return np.concatenate(timestamps), np.concatenate(attributes), np.concatenate(ratings)
+
+if __name__ == "__main__":
+    import sys
+    from player_dataset import PROJECT_ROOT, load_player_dataset
+
+    # Scrapes oldest first; each workbook's modification time is its snapshot time
+    paths = sys.argv[1:] or [
+        PROJECT_ROOT / "Data" / "scraping-progress.xlsx",
+        PROJECT_ROOT / "Data" / "player-data-progress.xlsx",
+        PROJECT_ROOT / "Data" / "full-player-data.xlsx",
+    ]
+
+    store = ProgressionStore()
+    for path in paths:
+        timestamp = max(int(os.stat(path).st_mtime), store.manifest['segments'][-1]['max_timestamp']
+                        if store.manifest['segments'] else 0)
+        store.ingest(load_player_dataset(path), timestamp=timestamp, source=Path(path).name)
+
+    print(f"\nTracking {len(store)} players across {len(store.manifest['segments'])} segments")
+    week_ago = int(time.time()) - 7 * 24 * 3600
+    for player in store.top_gainers('CB', since=week_ago, k=5):
+        print(f"  {player['id']} ({player['primaryPosition']}): CB {player['rating']} ({player['delta']:+d})")
@@ -0,0 +1,324 @@
+#!/usr/bin/env python3
+"""
+Vectorized MFL Rating Engine
+NumPy port of the deterministic position rating rules in mfl_rules.py, for whole batches of players
+"""
+
+import numpy as np
+from functools import lru_cache
+
+# Positions and familiarity come straight from the scalar rules, so the two can never drift apart
+from mfl_rules import POSITIONS, FAMILIARITY_ORDER, get_familiarity_level, get_familiarity_penalty
+
+POSITION_INDEX = {position: i for i, position in enumerate(POSITIONS)}
+GK_INDEX = POSITION_INDEX['GK']
+
+# Code for a primary position the rules do not know (every target is Unfamiliar)
+UNKNOWN_POSITION = len(POSITIONS)
+
+ATTRIBUTE_COLS = ['PAC', 'SHO', 'PAS', 'DRI', 'DEF', 'PHY']
+PAC, SHO, PAS, DRI, DEF, PHY = range(6)
+
+# Attribute weights per target position, as in mfl_rules.calculate_base_position_rating.
+# mfl_rules accumulates them in this attribute order, and float addition is not
+# associative, so the engine accumulates in the same order to stay bit-identical.
+ACCUMULATION_ORDER = ['PAS', 'SHO', 'DEF', 'DRI', 'PAC', 'PHY']
+_FORWARD = {'PAS': 0.24, 'SHO': 0.23, 'DEF': 0.00, 'DRI': 0.40, 'PAC': 0.13, 'PHY': 0.00}
+_MIDFIELD = {'PAS': 0.43, 'SHO': 0.12, 'DEF': 0.10, 'DRI': 0.29, 'PAC': 0.00, 'PHY': 0.06}
+_FULL_BACK = {'PAS': 0.19, 'SHO': 0.00, 'DEF': 0.44, 'DRI': 0.17, 'PAC': 0.10, 'PHY': 0.10}
+POSITION_WEIGHTS = {
+    'ST': {'PAS': 0.10, 'SHO': 0.46, 'DEF': 0.00, 'DRI': 0.29, 'PAC': 0.10, 'PHY': 0.05},
+    'CF': _FORWARD, 'LW': _FORWARD, 'RW': _FORWARD,
+    'CAM': {'PAS': 0.34, 'SHO': 0.21, 'DEF': 0.00, 'DRI': 0.38, 'PAC': 0.07, 'PHY': 0.00},
+    'CM': _MIDFIELD, 'LM': _MIDFIELD, 'RM': _MIDFIELD,
+    'CDM': {'PAS': 0.28, 'SHO': 0.00, 'DEF': 0.40, 'DRI': 0.17, 'PAC': 0.00, 'PHY': 0.15},
+    'LWB': _FULL_BACK, 'RWB': _FULL_BACK, 'LB': _FULL_BACK, 'RB': _FULL_BACK,
+    'CB': {'PAS': 0.05, 'SHO': 0.00, 'DEF': 0.64, 'DRI': 0.09, 'PAC': 0.02, 'PHY': 0.20},
+    'GK': {'PAS': 0.00, 'SHO': 0.00, 'DEF': 0.00, 'DRI': 0.00, 'PAC': 0.00, 'PHY': 0.00},
+}
+
+# GK is rated from a derived seventh attribute column, the goalkeeping score
+# DEF*0.6 + PHY*0.3 + PAS*0.1 truncated as in mfl_rules.calculate_gk_rating,
+# weighted 1 at GK and 0 at every other position (which weight it 0 above)
+GK_ATTRIBUTE = len(ATTRIBUTE_COLS)
+GK_ATTRIBUTE_WEIGHTS = np.eye(len(POSITIONS))[GK_INDEX]
+
+# (attribute column, weight per target position) in accumulation order
+WEIGHT_STEPS = [
+    (ATTRIBUTE_COLS.index(attr), np.array([POSITION_WEIGHTS[position][attr] for position in POSITIONS]))
+    for attr in ACCUMULATION_ORDER
+] + [(GK_ATTRIBUTE, GK_ATTRIBUTE_WEIGHTS)]
+
+# Familiarity levels, most familiar first
+FAMILIARITY_LEVELS = FAMILIARITY_ORDER
+PRIMARY, SECONDARY, FAIRLY_FAMILIAR, SOMEWHAT_FAMILIAR, UNFAMILIAR = range(5)
+FAMILIARITY_PENALTIES = np.array([get_familiarity_penalty(level) for level in FAMILIARITY_LEVELS])
+
+def _familiarity_table():
+    """(primary code, target) -> familiarity level code, from mfl_rules.get_familiarity_level"""
+    table = np.full((len(POSITIONS) + 1, len(POSITIONS)), UNFAMILIAR, dtype=np.uint8)
+    for p, primary in enumerate(POSITIONS):
+        for t, target in enumerate(POSITIONS):
+            table[p, t] = FAMILIARITY_LEVELS.index(get_familiarity_level(primary, target))
+    return table
+
+FAMILIARITY = _familiarity_table()
+TARGETS = np.arange(len(POSITIONS))
+
+# Penalty and rating bounds per rule level. Rule levels 0-4 are the
+# familiarity levels at the 14 outfield targets; GK has a dedicated row of
+# its own, 5-9, where anyone but a primary GK loses 50 and a primary GK's
+# score is used as is (0 floor, uint8 ceiling) rather than clipped to 1-99.
+GK_LEVEL_OFFSET = len(FAMILIARITY_LEVELS)
+RULE_PENALTY = np.concatenate([FAMILIARITY_PENALTIES, [0, -50, -50, -50, -50]]).astype(np.float64)
+RULE_FLOOR = np.array([1, 1, 1, 1, 1, 0, 1, 1, 1, 1], dtype=np.float64)
+RULE_CEILING = np.array([99, 99, 99, 99, 99, 255, 99, 99, 99, 99], dtype=np.float64)
+
+# Familiarity level -> rule level, per target
+RULE_LEVEL_OFFSET = np.where(TARGETS == GK_INDEX, GK_LEVEL_OFFSET, 0).astype(np.uint8)
+RULE_LEVELS = FAMILIARITY + RULE_LEVEL_OFFSET
+
+# Penalty per (primary code, target)
+PENALTY = RULE_PENALTY[RULE_LEVELS]
+
+# What owning a position as a secondary lends each target: that position's
+# familiarity row, but never better than Secondary. The GK rating only looks
+# at the primary position, so a secondary GK lends nothing to the GK column.
+OWNED_FAMILIARITY = np.maximum(FAMILIARITY[:len(POSITIONS)], SECONDARY).astype(np.uint8)
+OWNED_FAMILIARITY[:, GK_INDEX] = UNFAMILIAR
+
+# Bit i of a position mask is set when the player owns POSITIONS[i]
+POSITION_BITS = np.left_shift(1, np.arange(len(POSITIONS))).astype(np.uint16)
+
+# Rows per block: keeps the (block, 15) float temporaries cache-sized
+DEFAULT_BLOCK_SIZE = 4096
+
+def encode_positions(names):
+    """Position names -> uint8 codes (UNKNOWN_POSITION for anything unrecognised)"""
+    return np.array([POSITION_INDEX.get(name, UNKNOWN_POSITION) for name in names], dtype=np.uint8)
+
+def encode_position_masks(position_lists):
+    """Lists of position names -> uint16 masks of the positions each player owns (unknown names are ignored)"""
+    masks = np.zeros(len(position_lists), dtype=np.uint16)
+    for row, names in enumerate(position_lists):
+        for name in names or ():
+            if name in POSITION_INDEX:
+                masks[row] |= POSITION_BITS[POSITION_INDEX[name]]
+    return masks
+
+def position_masks_from_codes(codes):
+    """(N, k) position codes (e.g. primary plus secondary_codes) -> uint16 masks; codes >= 15 are ignored"""
+    codes = np.asarray(codes)
+    codes = codes[:, None] if codes.ndim == 1 else codes
+    known = codes < len(POSITIONS)
+    bits = np.where(known, POSITION_BITS[np.where(known, codes, 0)], 0)
+    return np.bitwise_or.reduce(bits, axis=1).astype(np.uint16)
+
+def lent_familiarity(owned_levels):
+    """
+    (2**P, P) best level each position set lends each target, for any (P, P)
+    table of the level an owned position lends a target (bit j of a set owns
+    row j): a masked min where rows the set does not own count as Unfamiliar
+    and so never win the reduction
+    """
+    n_positions = len(owned_levels)
+    masks = np.arange(1 << n_positions)
+    owned = (masks[:, None] >> np.arange(n_positions)) & 1 == 1
+    return np.where(owned[:, :, None], owned_levels, UNFAMILIAR).min(axis=1).astype(np.uint8)
+
+@lru_cache(maxsize=None)
+def _lent_familiarity():
+    """lent_familiarity of OWNED_FAMILIARITY, built once on first use"""
+    return lent_familiarity(OWNED_FAMILIARITY)
+
+def _owned_levels(levels, position_masks):
+    return np.minimum(levels, _lent_familiarity()[position_masks])
+
+def familiarity_levels(primary_codes, position_masks=None):
+    """
+    (N, 15) familiarity level codes. With position_masks (see
+    encode_position_masks) each target takes the best level across the
+    primary position and every owned secondary position.
+    """
+    levels = FAMILIARITY[np.asarray(primary_codes)]
+    if position_masks is None:
+        return levels
+    return _owned_levels(levels, np.asarray(position_masks, dtype=np.uint16))
+
+def with_gk_attribute(attributes):
+    """(N, 6) attributes -> (N, 7) float64 with the truncated goalkeeping score appended"""
+    A = np.empty((len(attributes), len(ATTRIBUTE_COLS) + 1))
+    A[:, :GK_ATTRIBUTE] = attributes
+    np.trunc(A[:, DEF] * 0.6 + A[:, PHY] * 0.3 + A[:, PAS] * 0.1, out=A[:, GK_ATTRIBUTE])
+    return A
+
+def _rate_block(A, primary, out, masks=None):
+    # Base rating: same sequential accumulation as the scalar rules, then
+    # round-half-even. Every position, GK included, then takes its penalty and
+    # is clipped to its bounds, with no per-position branches.
+    A = with_gk_attribute(A)
+    rating = np.zeros((len(A), len(POSITIONS)))
+    product = np.empty_like(rating)
+    for column, weights in WEIGHT_STEPS:
+        np.multiply(A[:, column, None], weights, out=product)
+        rating += product
+    np.rint(rating, out=rating)
+    if masks is None:
+        levels = RULE_LEVELS[primary]
+    else:
+        levels = _owned_levels(FAMILIARITY[primary], masks) + RULE_LEVEL_OFFSET
+    rating += np.take(RULE_PENALTY, levels)
+    np.maximum(rating, np.take(RULE_FLOOR, levels), out=rating)
+    np.minimum(rating, np.take(RULE_CEILING, levels), out=rating)
+
+    out[:] = rating
+
+def rate_players(attributes, primary_codes, out=None, block_size=DEFAULT_BLOCK_SIZE, position_masks=None):
+    """
+    Rate every position for a batch of players.
+
+    attributes: (N, 6) in PAC, SHO, PAS, DRI, DEF, PHY order
+    primary_codes: (N,) position codes (see encode_positions)
+    out: optional (N, 15) array to fill, e.g. a memory-mapped file
+    position_masks: optional (N,) masks of every position each player owns
+    (see encode_position_masks), so secondary positions lift familiarity
+    Returns (N, 15) uint8 ratings in POSITIONS order, identical to
+    mfl_rules.calculate_mfl_position_rating for each (player, position).
+    """
+    attributes = np.asarray(attributes)
+    primary_codes = np.asarray(primary_codes)
+    if position_masks is not None:
+        position_masks = np.asarray(position_masks, dtype=np.uint16)
+    if out is None:
+        out = np.empty((len(attributes), len(POSITIONS)), dtype=np.uint8)
+
+    for start in range(0, len(attributes), block_size):
+        stop = start + block_size
+        _rate_block(attributes[start:stop], primary_codes[start:stop], out[start:stop],
+                    None if position_masks is None else position_masks[start:stop])
+
+    return out
+
+def rate_player(attributes, primary_position):
+    """{position: rating} for one player"""
+    ratings = rate_players([attributes], encode_positions([primary_position]))[0]
+    return {position: int(rating) for position, rating in zip(POSITIONS, ratings)}
+
+def simulate_deltas(attributes, primary_code, deltas, position_mask=None):
+    """
+    Ratings for one player over a grid of attribute changes.
+
+    deltas: {attribute: sequence of integer changes}, e.g. {'PAS': range(0, 4), 'DEF': [0, 1, 2]}
+    position_mask: optional mask of every position the player owns
+    Returns (names, axes, ratings): the varied attributes, their change values and a
+    uint8 tensor of shape (len(axis_1), ..., len(axis_k), 15). Changed attributes
+    are clipped to 0-99 before rating.
+    """
+    unknown = set(deltas).difference(ATTRIBUTE_COLS)
+    if unknown:
+        raise ValueError(f"Unknown attributes: {', '.join(sorted(unknown))}")
+
+    names = [attr for attr in ATTRIBUTE_COLS if attr in deltas]
+    axes = [np.asarray(deltas[attr], dtype=np.int64).ravel() for attr in names]
+    shape = tuple(len(axis) for axis in axes)
+
+    # Broadcast every axis against the base vector, one grid dimension per varied attribute
+    grid = np.broadcast_to(np.asarray(attributes, dtype=np.int64), shape + (len(ATTRIBUTE_COLS),)).copy()
+    for k, (attr, axis) in enumerate(zip(names, axes)):
+        grid[..., ATTRIBUTE_COLS.index(attr)] += axis.reshape([-1 if d == k else 1 for d in range(len(axes))])
+    np.clip(grid, 0, 99, out=grid)
+
+    flat = grid.reshape(-1, len(ATTRIBUTE_COLS))
+    masks = None if position_mask is None else np.full(len(flat), position_mask, dtype=np.uint16)
+    ratings = rate_players(flat, np.full(len(flat), primary_code, dtype=np.uint8), position_masks=masks)
+    return names, axes, ratings.reshape(shape + (len(POSITIONS),))
+
+def cheapest_delta(names, axes, ratings, target_position, target_rating, costs=None):
+    """
+    Cheapest grid point of simulate_deltas reaching target_rating at target_position.
+
+    costs: optional {attribute: cost per point}, default 1 (total points added).
+    Decreases cost nothing. Ties go to the higher resulting rating.
+    Returns ({attribute: change}, cost, rating), or None if no grid point qualifies.
+    """
+    costs = costs or {}
+    total = np.zeros(ratings.shape[:-1])
+    for k, (attr, axis) in enumerate(zip(names, axes)):
+        step_cost = np.clip(axis, 0, None) * costs.get(attr, 1)
+        total = total + step_cost.reshape([-1 if d == k else 1 for d in range(len(axes))])
+
+    rating = ratings[..., POSITION_INDEX[target_position]].astype(np.int64)
+    total = np.where(rating >= target_rating, total, np.inf)
+    if not np.isfinite(total).any():
+        return None
+
+    # Lexicographic: lowest cost, then highest rating
+    candidates = np.flatnonzero(total.ravel() == total.min())
+    best = candidates[np.argmax(rating.ravel()[candidates])]
+    index = np.unravel_index(best, ratings.shape[:-1])
+    change = {attr: int(axis[i]) for attr, axis, i in zip(names, axes, index)}
+    return change, float(total[index]), int(rating[index])
+
+def position_names_from_mask(mask):
+    """Names of the positions a mask owns, in POSITIONS order"""
+    return [position for position, bit in zip(POSITIONS, POSITION_BITS) if mask & bit]
+
+def scalar_ratings(attributes, primary_codes, position_masks=None):
+    """
+    The reference the engine must match: (ratings, familiarity levels), both
+    (N, 15) uint8, from mfl_rules.calculate_mfl_position_rating one cell at a time
+    """
+    from mfl_rules import calculate_mfl_position_rating
+
+    level_codes = {level: code for code, level in enumerate(FAMILIARITY_LEVELS)}
+    attributes = np.asarray(attributes)
+    ratings = np.empty((len(attributes), len(POSITIONS)), dtype=np.uint8)
+    levels = np.empty_like(ratings)
+    for row, (player, code) in enumerate(zip(attributes.tolist(), np.asarray(primary_codes).tolist())):
+        primary = POSITIONS[code] if code < len(POSITIONS) else '?'
+        owned = [] if position_masks is None else position_names_from_mask(position_masks[row])
+        for t, target in enumerate(POSITIONS):
+            rating, familiarity, _ = calculate_mfl_position_rating(player, primary, target, owned)
+            ratings[row, t] = rating
+            levels[row, t] = level_codes[familiarity]
+    return ratings, levels
+
+def check_parity(attributes, primary_codes, position_masks=None):
+    """
+    Compare the engine with scalar_ratings for every (player, position).
+    Returns a list of (row, position, engine, scalar) rating mismatches.
+    """
+    ratings = rate_players(attributes, primary_codes, position_masks=position_masks)
+    expected, _ = scalar_ratings(attributes, primary_codes, position_masks)
+    return [(int(row), POSITIONS[t], int(ratings[row, t]), int(expected[row, t]))
+            for row, t in zip(*np.nonzero(ratings != expected))]
+
+if __name__ == "__main__":
+    import time
+
+    rng = np.random.default_rng(42)
+    n_players = 2_000_000
+    attributes = rng.integers(0, 100, size=(n_players, 6), dtype=np.uint8)
+    primary = rng.integers(0, len(POSITIONS), size=n_players).astype(np.uint8)
+
+    start = time.perf_counter()
+    rate_players(attributes, primary)
+    elapsed = time.perf_counter() - start
+    print(f"Rated {n_players:,} players x {len(POSITIONS)} positions in {elapsed:.2f}s "
+          f"({n_players / elapsed / 1e6:.1f}M players/s)")
+
+    sample = slice(0, 5000)
+    mismatches = check_parity(attributes[sample], primary[sample])
+    print(f"Parity with mfl_rules on 5,000 players: {len(mismatches)} mismatches")
+
+    # Primary plus up to two secondary positions each
+    secondary = rng.integers(0, len(POSITIONS) + 1, size=(n_players, 2))
+    masks = position_masks_from_codes(np.column_stack([primary, secondary]))
+    start = time.perf_counter()
+    rate_players(attributes, primary, position_masks=masks)
+    elapsed = time.perf_counter() - start
+    print(f"Rated {n_players:,} multi-position players in {elapsed:.2f}s "
+          f"({n_players / elapsed / 1e6:.1f}M players/s)")
+
+    mismatches = check_parity(attributes[sample], primary[sample], masks[sample])
+    print(f"Parity with secondary positions on 5,000 players: {len(mismatches)} mismatches")
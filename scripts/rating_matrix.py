@@ -0,0 +1,224 @@
+#!/usr/bin/env python3
+"""
+Shared Rating Matrix
+Publishes the (players x 15) engine rating matrix of the latest snapshot once as a memory-mapped file that other processes attach to zero-copy
+"""
+
+import os
+import json
+import fcntl
+import struct
+import hashlib
+import numpy as np
+from datetime import datetime
+from pathlib import Path
+
+from player_dataset import CACHE_DIR, POSITIONS, atomic_write
+
+MATRIX_DIR = CACHE_DIR / "rating_matrix"
+CURRENT_POINTER = "current.json"
+PUBLISH_LOCK = "publish.lock"
+KEEP_GENERATIONS = 2  # the live generation and the one consumers may still be swapping off
+
+# File layout: a fixed header, player ids (int64), then the rating matrix (uint8, row-major)
+MAGIC = b'MFLRMAT\0'
+FORMAT_VERSION = 1
+HEADER = struct.Struct('<8sIIIQI8s32s')  # magic, format, header size, snapshot, rows, columns, dtype, rules
+HEADER_SIZE = 128
+RATING_DTYPE = np.dtype(np.uint8)
+
+RULES_SOURCES = [Path(__file__).parent / "mfl_rules.py", Path(__file__).parent / "rating_engine.py"]
+
+def rules_version():
+    """Digest of the rule sources the matrix is computed from; a change publishes a new generation"""
+    digest = hashlib.sha256()
+    for path in RULES_SOURCES:
+        digest.update(path.read_bytes())
+    return digest.hexdigest()[:32]
+
+def read_current(matrix_dir=MATRIX_DIR):
+    pointer = Path(matrix_dir) / CURRENT_POINTER
+    if not pointer.exists():
+        return None
+    with open(pointer, 'r') as f:
+        return json.load(f)
+
+def _write_matrix(path, ids, ratings, snapshot_version, rules):
+    """Write one generation under a unique temporary name and rename it into place"""
+    header = HEADER.pack(MAGIC, FORMAT_VERSION, HEADER_SIZE, snapshot_version, len(ids), ratings.shape[1],
+                         RATING_DTYPE.str.encode('ascii'), rules.encode('ascii'))
+    with atomic_write(path) as f:
+        f.write(header.ljust(HEADER_SIZE, b'\0'))
+        f.write(np.ascontiguousarray(ids, dtype='<i8').tobytes())
+        f.write(np.ascontiguousarray(ratings, dtype=RATING_DTYPE).tobytes())
+
+def publish_rating_matrix(matrix_dir=MATRIX_DIR, force=False):
+    """
+    Rate every player of the latest dataset snapshot at every position and
+    publish the matrix as a new generation. Nothing is recomputed while the
+    current generation already matches the snapshot version and the rules.
+    Publishers take an exclusive lock on the directory, so concurrent calls
+    run one after another and the later ones find the matrix up to date.
+    """
+    matrix_dir = Path(matrix_dir)
+    os.makedirs(matrix_dir, exist_ok=True)
+    with open(matrix_dir / PUBLISH_LOCK, 'w') as lock:
+        fcntl.flock(lock, fcntl.LOCK_EX)
+        try:
+            return _publish_locked(matrix_dir, force)
+        finally:
+            fcntl.flock(lock, fcntl.LOCK_UN)
+
+def _publish_locked(matrix_dir, force):
+    from dataset_builder import read_latest_manifest, build_snapshot, load_snapshot
+    from rating_engine import rate_players, position_masks_from_codes
+
+    snapshot = read_latest_manifest() or build_snapshot()
+    rules = rules_version()
+    current = read_current(matrix_dir)
+    if (current is not None and not force and current['snapshot_version'] == snapshot['version']
+            and current['rules_version'] == rules):
+        print(f"Rating matrix generation {current['generation']} is up to date")
+        return current
+
+    dataset = load_snapshot(snapshot['version'])
+    masks = position_masks_from_codes(np.column_stack([dataset['primary_code'], dataset['secondary_codes']]))
+    ratings = rate_players(dataset['attributes'], dataset['primary_code'], position_masks=masks)
+
+    generation = 1 if current is None else current['generation'] + 1
+    path = matrix_dir / f"ratings-g{generation:04d}.bin"
+    _write_matrix(path, dataset['id'], ratings, snapshot['version'], rules)
+
+    manifest = {
+        'generation': generation,
+        'file': path.name,
+        'snapshot_version': snapshot['version'],
+        'rules_version': rules,
+        'players': int(len(ratings)),
+        'created': datetime.now().isoformat(),
+    }
+    # Swap the pointer last so consumers never attach to a half-written matrix
+    with atomic_write(matrix_dir / CURRENT_POINTER, 'w') as f:
+        json.dump(manifest, f, indent=2)
+
+    # Old generations can go: processes still mapping one keep it until they swap
+    for old in sorted(matrix_dir.glob('ratings-g*.bin'))[:-KEEP_GENERATIONS]:
+        old.unlink()
+
+    print(f"Published rating matrix generation {generation}: {len(ratings)} players from snapshot "
+          f"v{snapshot['version']} -> {path}")
+    return manifest
+
+class _Generation:
+    """One mapped matrix file; its arrays are read-only views of the page cache"""
+
+    __slots__ = ('number', 'file', 'snapshot_version', 'rules_version', 'ids', 'ratings', '_sorted')
+
+    def __init__(self, path, number):
+        with open(path, 'rb') as f:
+            magic, version, header_size, snapshot_version, rows, columns, dtype, rules = HEADER.unpack(f.read(HEADER.size))
+        if magic != MAGIC:
+            raise ValueError(f"{path} is not a rating matrix")
+        if version != FORMAT_VERSION:
+            raise ValueError(f"{path} has matrix format {version}, expected {FORMAT_VERSION}")
+        if columns != len(POSITIONS):
+            raise ValueError(f"{path} has {columns} positions, expected {len(POSITIONS)}")
+
+        self.number = number
+        self.file = Path(path).name
+        self.snapshot_version = snapshot_version
+        self.rules_version = rules.decode('ascii')
+        self.ids = np.memmap(path, dtype='<i8', mode='r', offset=header_size, shape=(rows,))
+        self.ratings = np.memmap(path, dtype=np.dtype(dtype.rstrip(b'\0').decode('ascii')), mode='r',
+                                 offset=header_size + rows * 8, shape=(rows, columns))
+        self._sorted = None
+
+    def rows_of(self, player_ids):
+        """Matrix rows of player ids, -1 where an id is not in this generation"""
+        if self._sorted is None:
+            order = np.argsort(self.ids, kind='stable')
+            self._sorted = (np.asarray(self.ids)[order], order)
+        sorted_ids, order = self._sorted
+
+        player_ids = np.asarray(player_ids, dtype=np.int64)
+        found = np.minimum(np.searchsorted(sorted_ids, player_ids), max(len(sorted_ids) - 1, 0))
+        hit = sorted_ids[found] == player_ids if len(sorted_ids) else np.zeros(player_ids.shape, dtype=bool)
+        return np.where(hit, order[found], -1)
+
+class RatingMatrix:
+    """
+    Consumer handle on the published matrix. refresh() re-reads the pointer
+    only when it changed on disk and swaps in the new generation with a single
+    assignment: arrays taken from the old one stay valid, and every read
+    through snapshot() sees ids and ratings from the same generation.
+    """
+
+    def __init__(self, matrix_dir=MATRIX_DIR):
+        self.matrix_dir = Path(matrix_dir)
+        self.pointer = self.matrix_dir / CURRENT_POINTER
+        self._stamp = None
+        self._generation = None
+        if not self.refresh():
+            raise FileNotFoundError(f"No rating matrix has been published in {self.matrix_dir}")
+
+    def refresh(self):
+        """Attach to the current generation if it changed; returns whether it did"""
+        try:
+            stat = os.stat(self.pointer)
+        except FileNotFoundError:
+            return False
+        stamp = (stat.st_ino, stat.st_mtime_ns, stat.st_size)
+        if stamp == self._stamp:
+            return False
+
+        manifest = read_current(self.matrix_dir)
+        self._stamp = stamp
+        if self._generation is not None and manifest['generation'] == self._generation.number:
+            return False
+        self._generation = _Generation(self.matrix_dir / manifest['file'], manifest['generation'])
+        return True
+
+    def snapshot(self):
+        """The current generation (number, ids, ratings, snapshot_version, rules_version, rows_of)"""
+        return self._generation
+
+    @property
+    def generation(self):
+        return self._generation.number
+
+    @property
+    def ids(self):
+        return self._generation.ids
+
+    @property
+    def ratings(self):
+        return self._generation.ratings
+
+    def __len__(self):
+        return len(self._generation.ids)
+
+    def player_ratings(self, player_id):
+        """(15,) ratings of one player; KeyError if they are not in the published snapshot"""
+        generation = self._generation
+        row = int(generation.rows_of([player_id])[0])
+        if row < 0:
+            raise KeyError(f"Unknown player id {player_id}")
+        return generation.ratings[row]
+
+def attach_rating_matrix(matrix_dir=MATRIX_DIR, publish_if_missing=True):
+    """Attach to the published matrix, publishing it first if nothing has been yet"""
+    if publish_if_missing and read_current(matrix_dir) is None:
+        publish_rating_matrix(matrix_dir)
+    return RatingMatrix(matrix_dir)
+
+if __name__ == "__main__":
+    import sys
+
+    manifest = publish_rating_matrix(force='--force' in sys.argv)
+    matrix = RatingMatrix()
+    print(f"\nGeneration {matrix.generation}: {len(matrix)} players x {len(POSITIONS)} positions "
+          f"(snapshot v{manifest['snapshot_version']}, rules {manifest['rules_version'][:12]})")
+    if len(matrix):
+        best = np.asarray(matrix.ratings).argmax(axis=1)
+        for code, count in zip(*np.unique(best, return_counts=True)):
+            print(f"  best at {POSITIONS[code]}: {count} players")
@@ -0,0 +1,121 @@
+#!/usr/bin/env python3
+"""
+Async Request Coalescer
+Collects concurrent single-item calls for a short window and scores them in one vectorized pass
+"""
+
+import time
+import asyncio
+
+class RequestCoalescer:
+    """
+    submit() queues one item and awaits its result. Queued items are scored
+    together by score_batch(items) -> results (same order) once max_batch items
+    are waiting or max_wait seconds have passed since the first one arrived,
+    whichever comes first. score_batch runs on the event loop, so it should be
+    a quick array operation. If a batch raises, its items are rescored one at
+    a time so the exception only reaches the callers whose items caused it.
+    """
+
+    def __init__(self, score_batch, max_wait=0.002, max_batch=256):
+        self.score_batch = score_batch
+        self.max_wait = max_wait
+        self.max_batch = max_batch
+        self.queue = []
+        self.timer = None
+
+        self.requests = 0
+        self.scored = 0
+        self.batches = 0
+        self.errors = 0
+        self.max_queue_depth = 0
+        self.max_batch_size = 0
+        self.scoring_seconds = 0.0
+
+    async def submit(self, item):
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+        self.queue.append((item, future))
+        self.requests += 1
+        self.max_queue_depth = max(self.max_queue_depth, len(self.queue))
+
+        if len(self.queue) >= self.max_batch:
+            self.flush()
+        elif self.timer is None:
+            self.timer = loop.call_later(self.max_wait, self.flush)
+
+        return await future
+
+    def flush(self):
+        """Score everything queued, max_batch items at a time"""
+        if self.timer is not None:
+            self.timer.cancel()
+            self.timer = None
+
+        while self.queue:
+            batch, self.queue = self.queue[:self.max_batch], self.queue[self.max_batch:]
+            # Callers that gave up (e.g. client disconnects) are not scored
+            batch = [(item, future) for item, future in batch if not future.done()]
+            if not batch:
+                continue
+
+            start = time.perf_counter()
+            try:
+                results = self.score_batch([item for item, _ in batch])
+            except Exception as e:
+                if len(batch) == 1:
+                    self.errors += 1
+                    batch[0][1].set_exception(e)
+                else:
+                    # One bad item must not fail its neighbours: score them one at a time
+                    self._score_singly(batch)
+            else:
+                for (_, future), result in zip(batch, results):
+                    future.set_result(result)
+            self.scoring_seconds += time.perf_counter() - start
+            self.batches += 1
+            self.scored += len(batch)
+            self.max_batch_size = max(self.max_batch_size, len(batch))
+
+    def _score_singly(self, batch):
+        for item, future in batch:
+            try:
+                result = self.score_batch([item])[0]
+            except Exception as e:
+                self.errors += 1
+                future.set_exception(e)
+            else:
+                future.set_result(result)
+
+    def metrics(self):
+        return {
+            'queue_depth': len(self.queue),
+            'max_queue_depth': self.max_queue_depth,
+            'requests': self.requests,
+            'scored': self.scored,
+            'batches': self.batches,
+            'errors': self.errors,
+            'mean_batch_size': self.scored / self.batches if self.batches else 0.0,
+            'max_batch_size': self.max_batch_size,
+            'scoring_seconds': self.scoring_seconds,
+            'window_ms': self.max_wait * 1000,
+            'max_batch': self.max_batch,
+        }
+
+if __name__ == "__main__":
+    import numpy as np
+
+    def score(items):
+        values = np.array(items, dtype=np.float64)
+        return (values * 2).tolist()
+
+    async def main():
+        coalescer = RequestCoalescer(score, max_wait=0.002, max_batch=256)
+        start = time.perf_counter()
+        results = await asyncio.gather(*(coalescer.submit(i) for i in range(10000)))
+        elapsed = time.perf_counter() - start
+        assert results == [i * 2 for i in range(10000)]
+        print(f"10,000 concurrent calls in {elapsed * 1000:.1f} ms")
+        print(coalescer.metrics())
+
+    asyncio.run(main())
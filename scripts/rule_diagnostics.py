@@ -0,0 +1,209 @@
+#!/usr/bin/env python3
+"""
+MFL Rule Diagnostics
+Residuals of the deterministic rules grouped by familiarity level, primary and target position
+"""
+
+import json
+import numpy as np
+
+from rating_engine import (POSITIONS, UNKNOWN_POSITION, FAMILIARITY, FAMILIARITY_LEVELS,
+                           FAMILIARITY_PENALTIES, PRIMARY, rate_players, familiarity_levels,
+                           position_masks_from_codes)
+
+# Residuals are histogrammed over [-MAX_RESIDUAL, MAX_RESIDUAL] (every possible
+# difference of two 1-99 ratings) to find each group's mode
+MAX_RESIDUAL = 98
+
+# Smallest group worth flagging, and how consistent its offset must be
+MIN_FLAG_COUNT = 10
+MIN_MODE_SHARE = 0.5
+MIN_BIAS = 0.5
+
+def residual_tensor(dataset, rules=rate_players):
+    """
+    (residuals, valid, levels) for every (player, target position):
+    residuals = rule prediction - scraped rating (int16), valid marks scraped
+    ratings that exist (non-zero), levels the familiarity level codes
+    (best across the primary and secondary positions).
+    rules: callable (attributes, primary_codes, position_masks=...) -> (N, 15)
+    predictions, so candidate rule tables can be compared without touching the data.
+    """
+    primary = np.minimum(dataset['primary_code'], UNKNOWN_POSITION)
+    masks = position_masks_from_codes(np.column_stack([primary, dataset['secondary_codes']]))
+    actual = dataset['position_ratings']
+    predicted = np.asarray(rules(dataset['attributes'], primary, position_masks=masks))
+
+    residuals = predicted.astype(np.int16) - actual.astype(np.int16)
+    valid = actual > 0
+    levels = familiarity_levels(primary, masks)
+    return residuals, valid, levels
+
+def grouped_stats(keys, residuals, n_groups):
+    """
+    Per-group count, bias, MAE, RMSE, std, most common residual and its share.
+    keys and residuals are flat arrays of equal length.
+    """
+    r = residuals.astype(np.float64)
+    count = np.bincount(keys, minlength=n_groups)
+    total = np.bincount(keys, weights=r, minlength=n_groups)
+    absolute = np.bincount(keys, weights=np.abs(r), minlength=n_groups)
+    squared = np.bincount(keys, weights=r * r, minlength=n_groups)
+
+    histogram = np.zeros((n_groups, 2 * MAX_RESIDUAL + 1), dtype=np.int64)
+    np.add.at(histogram, (keys, np.clip(residuals, -MAX_RESIDUAL, MAX_RESIDUAL) + MAX_RESIDUAL), 1)
+
+    with np.errstate(divide='ignore', invalid='ignore'):
+        bias = total / count
+        stats = {
+            'count': count,
+            'bias': bias,
+            'mae': absolute / count,
+            'rmse': np.sqrt(squared / count),
+            'std': np.sqrt(np.maximum(squared / count - bias ** 2, 0)),
+            'mode': histogram.argmax(axis=1) - MAX_RESIDUAL,
+            'mode_share': histogram.max(axis=1) / count,
+        }
+    return stats
+
+def _is_systematic(stats, g):
+    return (stats['count'][g] >= MIN_FLAG_COUNT and stats['mode'][g] != 0
+            and stats['mode_share'][g] >= MIN_MODE_SHARE and abs(stats['bias'][g]) >= MIN_BIAS)
+
+def find_systematic_offsets(by_level, by_level_target, by_primary_target):
+    """
+    Flag groups whose residuals sit on a consistent non-zero offset:
+    a whole familiarity level (wrong penalty value), one target for primary
+    players (wrong base weights), or one (primary, target) pair that
+    disagrees with the rest of its level (wrong familiarity map entry)
+    """
+    flags = []
+    n_targets = len(POSITIONS)
+    level_offsets = np.zeros(len(FAMILIARITY_LEVELS), dtype=np.int64)
+
+    for level, name in enumerate(FAMILIARITY_LEVELS):
+        if _is_systematic(by_level, level):
+            offset = int(by_level['mode'][level])
+            level_offsets[level] = offset
+            flags.append({
+                'kind': 'penalty',
+                'level': name,
+                'offset': offset,
+                'share': round(float(by_level['mode_share'][level]), 3),
+                'count': int(by_level['count'][level]),
+                'currentPenalty': int(FAMILIARITY_PENALTIES[level]),
+                'suggestedPenalty': int(FAMILIARITY_PENALTIES[level] - offset),
+            })
+
+    for t, target in enumerate(POSITIONS):
+        g = PRIMARY * n_targets + t
+        if _is_systematic(by_level_target, g) and by_level_target['mode'][g] != level_offsets[PRIMARY]:
+            flags.append({
+                'kind': 'base_weights',
+                'position': target,
+                'offset': int(by_level_target['mode'][g]),
+                'share': round(float(by_level_target['mode_share'][g]), 3),
+                'count': int(by_level_target['count'][g]),
+            })
+
+    for p, primary in enumerate(POSITIONS):
+        for t, target in enumerate(POSITIONS):
+            level = FAMILIARITY[p, t]
+            g = p * n_targets + t
+            if level == PRIMARY or not _is_systematic(by_primary_target, g):
+                continue
+            offset = int(by_primary_target['mode'][g])
+            if offset == level_offsets[level]:
+                continue
+            # The level whose (corrected) penalty would absorb the offset
+            implied = FAMILIARITY_PENALTIES[level] - offset
+            corrected = FAMILIARITY_PENALTIES - level_offsets
+            flags.append({
+                'kind': 'familiarity',
+                'primaryPosition': primary,
+                'position': target,
+                'level': FAMILIARITY_LEVELS[level],
+                'offset': offset,
+                'share': round(float(by_primary_target['mode_share'][g]), 3),
+                'count': int(by_primary_target['count'][g]),
+                'suggestedLevel': FAMILIARITY_LEVELS[int(np.abs(corrected - implied).argmin())],
+            })
+
+    return flags
+
+def _compact(stats, shape=None):
+    """Stats arrays as rounded nested lists, NaN -> None"""
+    out = {}
+    for key, values in stats.items():
+        values = np.asarray(values, dtype=np.float64)
+        if shape is not None:
+            values = values.reshape(shape)
+        missing = np.isnan(values)
+        if key in ('count', 'mode'):
+            rounded = np.where(missing, 0, values).astype(np.int64).astype(object)
+        else:
+            rounded = np.round(values, 3).astype(object)
+        rounded[missing] = None
+        out[key] = rounded.tolist()
+    return out
+
+def diagnose(dataset, rules=rate_players):
+    """Residual statistics and flags as a JSON-ready dict"""
+    residuals, valid, levels = residual_tensor(dataset, rules)
+    n_targets = len(POSITIONS)
+    n_levels = len(FAMILIARITY_LEVELS)
+    n_primary = UNKNOWN_POSITION + 1
+
+    rows, targets = np.nonzero(valid)
+    r = residuals[rows, targets]
+    level = levels[rows, targets].astype(np.int64)
+    primary = np.minimum(dataset['primary_code'], UNKNOWN_POSITION)[rows].astype(np.int64)
+
+    overall = grouped_stats(np.zeros(len(r), dtype=np.int64), r, 1)
+    by_level = grouped_stats(level, r, n_levels)
+    by_level_target = grouped_stats(level * n_targets + targets, r, n_levels * n_targets)
+    # Map entries are judged only on cells whose level came from the primary position,
+    # not on ones a secondary position lifted
+    from_primary = level == FAMILIARITY[primary, targets]
+    by_primary_target = grouped_stats((primary * n_targets + targets)[from_primary], r[from_primary],
+                                      n_primary * n_targets)
+
+    return {
+        'positions': POSITIONS,
+        'levels': FAMILIARITY_LEVELS,
+        'primaries': POSITIONS + ['?'],
+        'players': int(len(residuals)),
+        'overall': {key: values[0] for key, values in _compact(overall).items()},
+        'byLevel': _compact(by_level),
+        'byLevelPosition': _compact(by_level_target, (n_levels, n_targets)),
+        'byPrimaryPosition': _compact(by_primary_target, (n_primary, n_targets)),
+        'flags': find_systematic_offsets(by_level, by_level_target, by_primary_target),
+    }
+
+def to_json(report):
+    """Compact JSON for dashboards"""
+    return json.dumps(report, separators=(',', ':'))
+
+if __name__ == "__main__":
+    import sys
+    import time
+    from dataset_builder import load_snapshot
+
+    dataset = load_snapshot()
+    start = time.perf_counter()
+    report = diagnose(dataset)
+    elapsed = time.perf_counter() - start
+
+    overall = report['overall']
+    print(f"{report['players']} players, {overall['count']} ratings in {elapsed * 1000:.1f} ms: "
+          f"MAE={overall['mae']}, bias={overall['bias']}")
+    for name, count, bias, mae, mode, share in zip(report['levels'], *(report['byLevel'][key] for key in
+                                                   ('count', 'bias', 'mae', 'mode', 'mode_share'))):
+        print(f"  {name:<18} n={count:<6} bias={bias} MAE={mae} mode={mode} ({share})")
+    for flag in report['flags']:
+        print(f"  FLAG {flag}")
+
+    if len(sys.argv) > 1:
+        with open(sys.argv[1], 'w') as f:
+            f.write(to_json(report))
+        print(f"Wrote {sys.argv[1]}")
@@ -4,15 +4,6 @@ MFL Rule Discovery from Training Data
 Goal: Extract exact MFL position rating rules from the dataset
 """
 
-import numpy as np
-import pandas as pd
-from sklearn.linear_model import LinearRegression
-from sklearn.tree import DecisionTreeRegressor
-from sklearn.ensemble import RandomForestRegressor
-from sklearn.metrics import mean_absolute_error, r2_score
-import matplotlib.pyplot as plt
-import seaborn as sns
-
 def analyze_training_data_patterns():
     """
     Analyze patterns in the training data to discover MFL rules
@@ -0,0 +1,162 @@
+#!/usr/bin/env python3
+"""
+Persistent Scoring Worker
+Long-lived model server speaking newline-delimited JSON over stdin/stdout or a Unix socket
+"""
+
+import os
+import sys
+import json
+import queue
+import threading
+import numpy as np
+from types import SimpleNamespace
+
+# Requests answered per batch; a batch is whatever has arrived since the last one
+MAX_BATCH = 256
+
+class ModelStore:
+    """Per-directory metadata and per-position model/scaler pairs, each loaded once"""
+
+    def __init__(self):
+        self.models = {}
+        self.lock = threading.Lock()
+
+    def load(self, model_dir):
+        model_dir = os.path.abspath(model_dir)
+        with self.lock:
+            if model_dir not in self.models:
+                with open(os.path.join(model_dir, "metadata.json"), 'r') as f:
+                    metadata = json.load(f)
+                self.models[model_dir] = {'metadata': metadata, 'positions': {}}
+            return model_dir, self.models[model_dir]
+
+    def position(self, model_dir, position):
+        import joblib
+
+        model_dir, entry = self.load(model_dir)
+        with self.lock:
+            if position not in entry['positions']:
+                model_path = os.path.join(model_dir, f"{position}_model.pkl")
+                scaler_path = os.path.join(model_dir, f"{position}_scaler.pkl")
+                if not (os.path.exists(model_path) and os.path.exists(scaler_path)):
+                    raise KeyError(f"No model for {position} in {model_dir}")
+                entry['positions'][position] = (joblib.load(model_path), joblib.load(scaler_path))
+            return entry['positions'][position]
+
+def _features(attributes):
+    from engineered_features import create_engineered_features
+    return create_engineered_features(SimpleNamespace(**{key: attributes[key] for key in
+                                                         ('PAC', 'SHO', 'PAS', 'DRI', 'DEF', 'PHY')}))
+
+def handle_batch(requests, store):
+    """
+    Answer a batch of requests, returning one response per request in order.
+    Predictions for the same (model, position) share one transform and predict call.
+    """
+    responses = [None] * len(requests)
+    groups = {}
+
+    for i, request in enumerate(requests):
+        op = request.get('op')
+        try:
+            if op == 'ping':
+                responses[i] = {'id': request.get('id'), 'result': 'pong'}
+            elif op == 'load':
+                model_dir, entry = store.load(request['model'])
+                metadata = entry['metadata']
+                responses[i] = {'id': request.get('id'), 'result': {
+                    'model': model_dir,
+                    'positions': metadata.get('positions', []),
+                    'feature_names': metadata.get('feature_names', []),
+                }}
+            elif op == 'predict':
+                key = (request['model'], request['position'])
+                groups.setdefault(key, []).append((i, _features(request['attributes'])))
+            else:
+                raise ValueError(f"Unknown op: {op}")
+        except Exception as e:
+            responses[i] = {'id': request.get('id'), 'error': f"{type(e).__name__}: {e}"}
+
+    for (model_dir, position), members in groups.items():
+        rows = [i for i, _ in members]
+        try:
+            model, scaler = store.position(model_dir, position)
+            X = scaler.transform(np.vstack([features for _, features in members]))
+            predictions = model.predict(X)
+            for i, prediction in zip(rows, predictions):
+                responses[i] = {'id': requests[i].get('id'), 'result': {
+                    'position': position,
+                    'predicted_rating': round(float(prediction), 2),
+                }}
+        except Exception as e:
+            for i in rows:
+                responses[i] = {'id': requests[i].get('id'), 'error': f"{type(e).__name__}: {e}"}
+
+    return responses
+
+def serve(in_stream, out_stream, store):
+    """Read NDJSON requests until EOF, answering in batches of whatever is pending"""
+    pending = queue.Queue()
+
+    def read():
+        for line in in_stream:
+            if line.strip():
+                pending.put(line)
+        pending.put(None)
+
+    threading.Thread(target=read, daemon=True).start()
+
+    done = False
+    while not done:
+        lines = [pending.get()]
+        while len(lines) < MAX_BATCH:
+            try:
+                lines.append(pending.get_nowait())
+            except queue.Empty:
+                break
+        if lines[-1] is None or None in lines:
+            done = True
+            lines = [line for line in lines if line is not None]
+
+        requests, responses = [], []
+        for line in lines:
+            try:
+                requests.append(json.loads(line))
+            except json.JSONDecodeError as e:
+                responses.append({'id': None, 'error': f"Invalid JSON: {e}"})
+        responses.extend(handle_batch(requests, store))
+
+        if responses:
+            out_stream.write(''.join(json.dumps(response) + '\n' for response in responses))
+            out_stream.flush()
+
+def serve_socket(path, store):
+    """Serve the same protocol on a Unix socket, one thread per connection"""
+    import socketserver
+
+    class Handler(socketserver.StreamRequestHandler):
+        def handle(self):
+            serve(
+                (line.decode('utf-8') for line in self.rfile),
+                SimpleNamespace(write=lambda text: self.wfile.write(text.encode('utf-8')),
+                                flush=self.wfile.flush),
+                store
+            )
+
+    if os.path.exists(path):
+        os.unlink(path)
+    with socketserver.ThreadingUnixStreamServer(path, Handler) as server:
+        print(f"Scoring worker listening on {path}", file=sys.stderr)
+        server.serve_forever()
+
+if __name__ == "__main__":
+    sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+    store = ModelStore()
+
+    if len(sys.argv) > 2 and sys.argv[1] == '--socket':
+        serve_socket(sys.argv[2], store)
+    else:
+        # stdout carries responses only; anything libraries print goes to stderr
+        out_stream, sys.stdout = sys.stdout, sys.stderr
+        serve(sys.stdin, out_stream, store)
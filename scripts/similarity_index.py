@@ -0,0 +1,169 @@
+#!/usr/bin/env python3
+"""
+Player Similarity Index
+Nearest-neighbour search over standardised player attribute vectors
+"""
+
+import numpy as np
+from sklearn.neighbors import KDTree
+
+from player_dataset import load_player_dataset, player_feature_matrix, position_name
+
+FEATURE_NAMES = ['PAC', 'SHO', 'PAS', 'DRI', 'DEF', 'PHY', 'overall', 'age', 'height']
+
+# Below this many players an exact blocked scan beats walking a tree
+BRUTE_FORCE_MAX_PLAYERS = 2048
+BLOCK_SIZE = 1024
+
+class _BruteForceSearcher:
+    """Exact search with blocked matrix multiply (squared euclidean distance)"""
+
+    def __init__(self, points, block_size=BLOCK_SIZE):
+        self.points = points
+        self.sq_norms = np.einsum('ij,ij->i', points, points)
+        self.block_size = block_size
+
+    def query(self, queries, k):
+        k = min(k, len(self.points))
+        dist = np.empty((len(queries), k))
+        ind = np.empty((len(queries), k), dtype=np.int64)
+        q_sq_norms = np.einsum('ij,ij->i', queries, queries)
+
+        for start in range(0, len(queries), self.block_size):
+            block = queries[start:start + self.block_size]
+            d2 = q_sq_norms[start:start + len(block), None] - 2.0 * block @ self.points.T + self.sq_norms[None, :]
+            np.maximum(d2, 0.0, out=d2)
+
+            if k < d2.shape[1]:
+                top = np.argpartition(d2, k - 1, axis=1)[:, :k]
+            else:
+                top = np.broadcast_to(np.arange(d2.shape[1]), d2.shape)
+            top_d2 = np.take_along_axis(d2, top, axis=1)
+            order = np.argsort(top_d2, axis=1, kind='stable')
+            ind[start:start + len(block)] = np.take_along_axis(top, order, axis=1)
+            dist[start:start + len(block)] = np.sqrt(np.take_along_axis(top_d2, order, axis=1))
+
+        return dist, ind
+
+class _TreeSearcher:
+    """KD-tree search for larger player sets"""
+
+    def __init__(self, points, leaf_size=40):
+        self.tree = KDTree(points, leaf_size=leaf_size)
+        self.n_points = len(points)
+
+    def query(self, queries, k):
+        return self.tree.query(queries, k=min(k, self.n_points))
+
+def _make_searcher(points, brute_force_max=BRUTE_FORCE_MAX_PLAYERS):
+    if len(points) <= brute_force_max:
+        return _BruteForceSearcher(points)
+    return _TreeSearcher(points)
+
+class PlayerSimilarityIndex:
+    """
+    Top-k similar players over standardised PAC-PHY, overall, age and height.
+    One searcher is built for the full set and one per primary position.
+    """
+
+    def __init__(self, dataset, brute_force_max=BRUTE_FORCE_MAX_PLAYERS):
+        features = player_feature_matrix(dataset)
+
+        self.mean = features.mean(axis=0)
+        self.std = features.std(axis=0)
+        self.std[self.std == 0] = 1.0
+        self.points = (features - self.mean) / self.std
+
+        self.ids = dataset['id']
+        self.names = dataset['name']
+        self.primary_code = dataset['primary_code']
+        self.row_by_id = {int(player_id): row for row, player_id in enumerate(self.ids)}
+
+        self.searcher = _make_searcher(self.points, brute_force_max)
+        self.position_rows = {}
+        self.position_searchers = {}
+        for code in np.unique(self.primary_code):
+            rows = np.flatnonzero(self.primary_code == code)
+            position = position_name(code)
+            self.position_rows[position] = rows
+            self.position_searchers[position] = _make_searcher(self.points[rows], brute_force_max)
+
+    def __len__(self):
+        return len(self.ids)
+
+    def standardise(self, features):
+        """Standardise raw feature rows with the index statistics"""
+        return (np.asarray(features, dtype=np.float64).reshape(-1, len(FEATURE_NAMES)) - self.mean) / self.std
+
+    def query_vector(self, features, k=10, position=None):
+        """
+        Return (rows, distances) of the k nearest players to a raw feature vector
+        """
+        return self._query(self.standardise(features), k, position)
+
+    def query_player(self, player_id, k=10, position=None):
+        """
+        Return (rows, distances) of the k players most similar to a known player
+        """
+        row = self.row_by_id.get(int(player_id))
+        if row is None:
+            raise KeyError(f"Unknown player id {player_id}")
+
+        return self._query(self.points[row:row + 1], k, position, exclude_row=row)
+
+    def _query(self, queries, k, position, exclude_row=None):
+        if position is None:
+            searcher, rows = self.searcher, None
+        elif position in self.position_searchers:
+            searcher, rows = self.position_searchers[position], self.position_rows[position]
+        else:
+            return np.empty(0, dtype=np.int64), np.empty(0)
+
+        # Ask for one extra neighbour so the query player can be dropped
+        extra = 1 if exclude_row is not None else 0
+        dist, ind = searcher.query(queries, k + extra)
+        dist, ind = dist[0], ind[0]
+        if rows is not None:
+            ind = rows[ind]
+
+        if exclude_row is not None:
+            keep = ind != exclude_row
+            dist, ind = dist[keep], ind[keep]
+
+        return ind[:k], dist[:k]
+
+    def describe(self, rows, distances):
+        """Turn query output into plain dicts"""
+        return [
+            {
+                'id': int(self.ids[row]),
+                'name': str(self.names[row]),
+                'primaryPosition': position_name(self.primary_code[row]),
+                'distance': round(float(distance), 4)
+            }
+            for row, distance in zip(rows, distances)
+        ]
+
+def build_similarity_index(excel_path=None, brute_force_max=BRUTE_FORCE_MAX_PLAYERS):
+    """Build the similarity index from the cached player dataset"""
+    dataset = load_player_dataset(excel_path) if excel_path else load_player_dataset()
+    return PlayerSimilarityIndex(dataset, brute_force_max=brute_force_max)
+
+if __name__ == "__main__":
+    import time
+
+    index = build_similarity_index()
+    print(f"Indexed {len(index)} players")
+
+    player_id = int(index.ids[0])
+    rows, distances = index.query_player(player_id, k=5)
+    print(f"\nPlayers similar to {index.names[0]} ({position_name(index.primary_code[0])}):")
+    for player in index.describe(rows, distances):
+        print(f"  {player['name']} ({player['primaryPosition']}): distance={player['distance']}")
+
+    n_queries = 1000
+    start = time.perf_counter()
+    for i in range(n_queries):
+        index.query_player(int(index.ids[i % len(index)]), k=10)
+    elapsed = (time.perf_counter() - start) / n_queries
+    print(f"\nAverage top-10 query time: {elapsed * 1000:.3f} ms")
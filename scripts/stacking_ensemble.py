@@ -0,0 +1,141 @@
+#!/usr/bin/env python3
+"""
+Stacked Position Rating Ensembles
+Blends member models with non-negative weights fitted on out-of-fold predictions
+"""
+
+import os
+import time
+import numpy as np
+
+from model_comparison import available_models, iter_model_fits
+
+ENSEMBLE_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "models", "ensembles")
+
+def collect_oof_predictions(X, y, model_names=None, cv=5, n_jobs=None, fit_full=True):
+    """
+    Cross-validate every model in parallel and gather out-of-fold predictions.
+
+    Returns (model_names, oof, members): oof is a preallocated (models, samples)
+    array where oof[m, i] was predicted by a fit that never saw sample i, and
+    members maps each name to a model fitted on all of X (when fit_full).
+    """
+    model_names = available_models(model_names)
+    row_of = {name: m for m, name in enumerate(model_names)}
+
+    oof = np.empty((len(model_names), len(X)))
+    filled = np.zeros(oof.shape, dtype=bool)
+    members = {}
+
+    for result in iter_model_fits(X, y, model_names=model_names, cv=cv, n_jobs=n_jobs, fit_full=fit_full):
+        m = row_of[result['model_name']]
+        if result['fold'] == 'full':
+            members[result['model_name']] = result['model']
+        else:
+            oof[m, result['rows']] = result['predictions']
+            filled[m, result['rows']] = True
+
+    if not filled.all():
+        raise RuntimeError("Out-of-fold predictions are incomplete")
+
+    return model_names, oof, members
+
+def fit_blend_weights(oof, y):
+    """
+    Non-negative least-squares blend of the out-of-fold predictions:
+    weights >= 0 minimising ||oof.T @ w - y||
+    """
+    from scipy.optimize import nnls
+
+    weights, _ = nnls(oof.T, np.asarray(y, dtype=np.float64))
+    if not weights.any():
+        # Degenerate fit: fall back to a plain average
+        weights = np.full(len(oof), 1.0 / len(oof))
+    return weights
+
+class BlendedEnsemble:
+    """
+    Fitted member models plus blend weights.
+    predict evaluates every member into one (members, samples) block and
+    blends it with a single matrix-vector product.
+    """
+
+    def __init__(self, names, members, weights):
+        # Members with zero weight are dropped: they cost time and add nothing
+        keep = [i for i, weight in enumerate(weights) if weight > 0]
+        self.names = [names[i] for i in keep]
+        self.members = [members[i] for i in keep]
+        self.weights = np.asarray(weights, dtype=np.float64)[keep]
+
+    def member_predictions(self, X):
+        X = np.atleast_2d(np.asarray(X, dtype=np.float64))
+        predictions = np.empty((len(self.members), len(X)))
+        for m, member in enumerate(self.members):
+            predictions[m] = member.predict(X)
+        return predictions
+
+    def predict(self, X):
+        return self.weights @ self.member_predictions(X)
+
+    def describe(self):
+        return {name: float(weight) for name, weight in zip(self.names, self.weights)}
+
+    def save(self, path):
+        # Plain dict so the file loads the same whether this module ran as a script or not
+        import joblib
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        joblib.dump({'names': self.names, 'members': self.members, 'weights': self.weights}, path)
+
+    @staticmethod
+    def load(path):
+        import joblib
+        state = joblib.load(path)
+        return BlendedEnsemble(state['names'], state['members'], state['weights'])
+
+def build_blended_ensemble(X, y, model_names=None, cv=5, n_jobs=None):
+    """
+    Fit members on all of X and blend weights on their out-of-fold predictions.
+    Returns (ensemble, oof_metrics).
+    """
+    from sklearn.metrics import mean_absolute_error, r2_score
+
+    names, oof, members = collect_oof_predictions(X, y, model_names, cv, n_jobs)
+    weights = fit_blend_weights(oof, y)
+    blended = weights @ oof
+
+    ensemble = BlendedEnsemble(names, [members[name] for name in names], weights)
+    metrics = {
+        'oof_mae': mean_absolute_error(y, blended),
+        'oof_r2': r2_score(y, blended),
+        'member_oof_mae': {name: mean_absolute_error(y, oof[m]) for m, name in enumerate(names)},
+        'weights': ensemble.describe(),
+    }
+    return ensemble, metrics
+
+def ensemble_path(position, ensemble_dir=ENSEMBLE_DIR):
+    return os.path.join(ensemble_dir, f"{position}_ensemble.pkl")
+
+def load_position_ensembles(positions, ensemble_dir=ENSEMBLE_DIR):
+    """Load whichever per-position ensembles have been trained"""
+    ensembles = {}
+    for position in positions:
+        path = ensemble_path(position, ensemble_dir)
+        if os.path.exists(path):
+            ensembles[position] = BlendedEnsemble.load(path)
+    return ensembles
+
+if __name__ == "__main__":
+    import sys
+    from train_position_predictor import prepare_snapshot_training_data
+
+    ensemble_dir = sys.argv[1] if len(sys.argv) > 1 else ENSEMBLE_DIR
+    X, y, input_cols, output_cols, _ = prepare_snapshot_training_data()
+
+    for i, position in enumerate(output_cols):
+        start = time.perf_counter()
+        ensemble, metrics = build_blended_ensemble(X, y[:, i])
+        ensemble.save(ensemble_path(position, ensemble_dir))
+
+        weights = ', '.join(f"{name}={weight:.2f}" for name, weight in metrics['weights'].items())
+        print(f"{position}: OOF MAE={metrics['oof_mae']:.2f}, R²={metrics['oof_r2']:.3f} "
+              f"[{weights}] ({time.perf_counter() - start:.1f}s)")
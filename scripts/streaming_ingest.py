@@ -0,0 +1,195 @@
+#!/usr/bin/env python3
+"""
+Streaming Player Data Ingestion
+Reads scraped workbooks (openpyxl read-only) or JSONL lazily and yields fixed-size NumPy chunks
+"""
+
+import json
+import numpy as np
+from pathlib import Path
+
+from player_dataset import POSITIONS, DATASET_COLUMNS, NO_POSITION, ATTRIBUTE_MAX, encode_position, encode_secondary
+from input_data_extractor import extract_player_fields, rejected_rows_path, write_rejected_rows
+
+DEFAULT_CHUNK_SIZE = 4096
+
+def iter_workbook_rows(excel_path):
+    """
+    Yield one dict per data row of the first sheet without loading the workbook
+    """
+    from openpyxl import load_workbook
+
+    workbook = load_workbook(excel_path, read_only=True, data_only=True)
+    try:
+        rows = workbook.worksheets[0].iter_rows(values_only=True)
+        header = next(rows, None)
+        if header is None:
+            return
+        for values in rows:
+            if values and any(value is not None for value in values):
+                yield dict(zip(header, values))
+    finally:
+        workbook.close()
+
+def iter_jsonl_rows(jsonl_path):
+    """
+    Yield one dict per line of a JSONL file.
+
+    Lines may be workbook-shaped rows (with an inputData field) or raw
+    player documents as returned by the MFL API ({"player": {...}}).
+    """
+    with open(jsonl_path, 'r') as f:
+        for line in f:
+            line = line.strip()
+            if not line:
+                continue
+            record = json.loads(line)
+            if 'inputData' not in record and 'player' in record:
+                record = api_document_to_row(record)
+            yield record
+
+def api_document_to_row(document):
+    """Shape a raw API player document like a scraped workbook row"""
+    metadata = document['player']['metadata']
+    positions = metadata.get('positions') or []
+    return {
+        'name': f"{metadata.get('firstName', '')} {metadata.get('lastName', '')}".strip(),
+        'id': document['player'].get('id', metadata.get('id')),
+        'inputData': document,
+        'primary': positions[0] if positions else None,
+        'secondary': ', '.join(positions[1:]) if len(positions) > 1 else None,
+    }
+
+def iter_player_rows(path):
+    """Dispatch on file type"""
+    if Path(path).suffix.lower() in ('.jsonl', '.ndjson'):
+        return iter_jsonl_rows(path)
+    return iter_workbook_rows(path)
+
+def _is_missing(value):
+    return value is None or value == '' or (isinstance(value, float) and np.isnan(value))
+
+def new_player_chunk(size):
+    """Preallocated dataset-shaped arrays for size players"""
+    chunk = {
+        key: np.zeros((size,) + shape, dtype=dtype)
+        for key, (dtype, shape) in DATASET_COLUMNS.items()
+    }
+    chunk['secondary_codes'][:] = NO_POSITION
+    return chunk
+
+def build_player_chunk(rows, offset=0):
+    """
+    Turn buffered rows into a dataset-shaped chunk.
+    inputData is extracted for the whole buffer at once; returns (chunk, rejects).
+    """
+    values, valid, rejects = extract_player_fields([row.get('inputData') for row in rows])
+    rejects = [(offset + i, reason) for i, reason in rejects]
+
+    # Attributes are on the 0-99 scale; overall, age and height only need to fit their uint8 columns
+    in_range = ((values >= 0).all(axis=1) & (values[:, :6] <= ATTRIBUTE_MAX).all(axis=1)
+                & (values[:, 6:] <= 255).all(axis=1))
+
+    keep = []
+    for i in np.flatnonzero(valid):
+        row = rows[i]
+        if _is_missing(row.get('id')) or _is_missing(row.get('primary')):
+            rejects.append((offset + i, "missing id or primary position"))
+            continue
+        if not in_range[i]:
+            rejects.append((offset + i, f"attribute outside 0-{ATTRIBUTE_MAX}, or overall, age or height outside 0-255"))
+            continue
+        keep.append(i)
+
+    chunk = new_player_chunk(len(keep))
+    if not keep:
+        return chunk, rejects
+
+    chunk['attributes'][:] = values[keep, :6]
+    chunk['overall'][:] = values[keep, 6]
+    chunk['age'][:] = values[keep, 7]
+    chunk['height'][:] = values[keep, 8]
+
+    for n, i in enumerate(keep):
+        row = rows[i]
+        secondary = row.get('secondary')
+        chunk['id'][n] = int(row['id'])
+        chunk['name'][n] = str(row.get('name', ''))
+        chunk['primary_code'][n] = encode_position(row['primary'])
+        chunk['secondary_codes'][n] = encode_secondary('' if _is_missing(secondary) else secondary)
+        chunk['position_ratings'][n] = [0 if _is_missing(row.get(pos)) else row.get(pos) for pos in POSITIONS]
+
+    return chunk, rejects
+
+def iter_player_chunks(path, chunk_size=DEFAULT_CHUNK_SIZE, rejected_path=None, with_rejects=False):
+    """
+    Yield dataset-shaped dicts of at most chunk_size players.
+    Only one chunk of raw rows is held in memory at a time; rows that cannot
+    be parsed are written to a rejected-rows file. with_rejects yields
+    (chunk, n_rejected) for every buffer of rows, empty chunks included.
+    """
+    rejected_path = rejected_path or rejected_rows_path(path)
+    buffered = []
+    offset = 0
+    n_rejected = 0
+
+    def flush():
+        nonlocal n_rejected
+        chunk, rejects = build_player_chunk(buffered, offset)
+        if rejects:
+            ids = {row: buffered[row - offset].get('id') for row, _ in rejects}
+            write_rejected_rows(rejects, rejected_path, ids=ids, source=path, append=n_rejected > 0)
+            n_rejected += len(rejects)
+        return chunk, len(rejects)
+
+    # Start a fresh rejected-rows file for this pass
+    write_rejected_rows([], rejected_path)
+    for row in iter_player_rows(path):
+        buffered.append(row)
+        if len(buffered) == chunk_size:
+            chunk, rejected = flush()
+            offset += len(buffered)
+            buffered = []
+            if with_rejects:
+                yield chunk, rejected
+            elif len(chunk['id']):
+                yield chunk
+
+    if buffered:
+        chunk, rejected = flush()
+        if with_rejects:
+            yield chunk, rejected
+        elif len(chunk['id']):
+            yield chunk
+
+def iter_training_chunks(paths, chunk_size=DEFAULT_CHUNK_SIZE):
+    """
+    Yield (X, y, ids) chunks across one or more data files:
+    X is the (n, 6) attribute block, y the (n, 15) position ratings
+    """
+    if isinstance(paths, (str, Path)):
+        paths = [paths]
+
+    for path in paths:
+        for chunk in iter_player_chunks(path, chunk_size):
+            yield (
+                chunk['attributes'].astype(np.float64),
+                chunk['position_ratings'].astype(np.float64),
+                chunk['id']
+            )
+
+if __name__ == "__main__":
+    import sys
+    import time
+
+    path = sys.argv[1] if len(sys.argv) > 1 else "Data/600-player-data-scraped.xlsx"
+
+    start = time.perf_counter()
+    n_players = 0
+    n_chunks = 0
+    for chunk in iter_player_chunks(path, chunk_size=256):
+        n_players += len(chunk['id'])
+        n_chunks += 1
+    elapsed = time.perf_counter() - start
+
+    print(f"Streamed {n_players} players in {n_chunks} chunks from {path} ({elapsed:.2f}s)")
@@ -0,0 +1,127 @@
+#!/usr/bin/env python3
+"""
+Synthetic Player Generator
+Samples realistic attribute vectors per primary position and labels them with the deterministic rules
+"""
+
+import os
+import json
+import time
+import numpy as np
+
+from rating_engine import POSITIONS, rate_players
+
+DEFAULT_OUTPUT_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "Data", "cache", "synthetic")
+
+# Rows generated per block; also the unit of seeding, so a given seed
+# produces the same rows whatever the total size
+BLOCK_SIZE = 1 << 18
+
+def fit_position_distributions(dataset):
+    """
+    Empirical per-primary-position attribute distributions:
+    share of players, attribute mean, covariance factor and observed range
+    """
+    attributes = np.asarray(dataset['attributes'], dtype=np.float64)
+    codes = dataset['primary_code']
+
+    distributions = []
+    for code, position in enumerate(POSITIONS):
+        rows = attributes[codes == code]
+        if len(rows) == 0:
+            continue
+        covariance = np.cov(rows, rowvar=False) if len(rows) > 1 else np.zeros((6, 6))
+        # Symmetric square root: works for the singular covariances of tiny or constant groups
+        eigenvalues, eigenvectors = np.linalg.eigh(np.atleast_2d(covariance))
+        factor = eigenvectors * np.sqrt(np.clip(eigenvalues, 0, None))
+        distributions.append({
+            'position': position,
+            'code': code,
+            'count': len(rows),
+            'mean': rows.mean(axis=0),
+            'factor': factor,
+            'low': rows.min(axis=0),
+            'high': rows.max(axis=0),
+        })
+
+    total = sum(dist['count'] for dist in distributions)
+    for dist in distributions:
+        dist['share'] = dist['count'] / total
+
+    return distributions
+
+def _generate_block(distributions, n, rng):
+    """n players: primary codes drawn by position share, attributes from that position's Gaussian"""
+    shares = np.array([dist['share'] for dist in distributions])
+    choice = rng.choice(len(distributions), size=n, p=shares)
+
+    attributes = np.empty((n, 6), dtype=np.uint8)
+    primary = np.empty(n, dtype=np.uint8)
+    for d, dist in enumerate(distributions):
+        rows = np.flatnonzero(choice == d)
+        if len(rows) == 0:
+            continue
+        samples = dist['mean'] + rng.standard_normal((len(rows), 6)) @ dist['factor'].T
+        attributes[rows] = np.clip(np.rint(samples), dist['low'], dist['high'])
+        primary[rows] = dist['code']
+
+    return attributes, primary
+
+def generate_synthetic_players(n_players, distributions, output_dir=DEFAULT_OUTPUT_DIR, seed=42):
+    """
+    Write n_players synthetic players to memory-mapped .npy files in output_dir:
+    attributes (N, 6) uint8, primary (N,) uint8 position codes and
+    ratings (N, 15) uint8 labelled by the rating engine. Returns the metadata dict.
+    """
+    from numpy.lib.format import open_memmap
+
+    os.makedirs(output_dir, exist_ok=True)
+    attributes = open_memmap(os.path.join(output_dir, "attributes.npy"), mode='w+',
+                             dtype=np.uint8, shape=(n_players, 6))
+    primary = open_memmap(os.path.join(output_dir, "primary.npy"), mode='w+',
+                          dtype=np.uint8, shape=(n_players,))
+    ratings = open_memmap(os.path.join(output_dir, "ratings.npy"), mode='w+',
+                          dtype=np.uint8, shape=(n_players, len(POSITIONS)))
+
+    start = time.perf_counter()
+    for block, offset in enumerate(range(0, n_players, BLOCK_SIZE)):
+        stop = min(offset + BLOCK_SIZE, n_players)
+        rng = np.random.default_rng([seed, block])
+        attributes[offset:stop], primary[offset:stop] = _generate_block(distributions, stop - offset, rng)
+        rate_players(attributes[offset:stop], primary[offset:stop], out=ratings[offset:stop])
+    elapsed = time.perf_counter() - start
+
+    for array in (attributes, primary, ratings):
+        array.flush()
+
+    metadata = {
+        'players': n_players,
+        'seed': seed,
+        'block_size': BLOCK_SIZE,
+        'positions': POSITIONS,
+        'position_shares': {dist['position']: dist['share'] for dist in distributions},
+        'seconds': elapsed,
+    }
+    with open(os.path.join(output_dir, "metadata.json"), 'w') as f:
+        json.dump(metadata, f, indent=2)
+
+    print(f"Generated {n_players:,} players in {elapsed:.2f}s ({n_players / elapsed / 1e6:.1f}M/s) -> {output_dir}")
+    return metadata
+
+def load_synthetic_players(output_dir=DEFAULT_OUTPUT_DIR):
+    """Memory-map a generated corpus: (attributes, primary, ratings)"""
+    return tuple(
+        np.load(os.path.join(output_dir, f"{name}.npy"), mmap_mode='r')
+        for name in ('attributes', 'primary', 'ratings')
+    )
+
+if __name__ == "__main__":
+    import sys
+    from dataset_builder import load_snapshot
+
+    n_players = int(sys.argv[1]) if len(sys.argv) > 1 else 5_000_000
+    distributions = fit_position_distributions(load_snapshot())
+    for dist in distributions:
+        print(f"  {dist['position']:<4} share={dist['share']:.3f} mean={np.round(dist['mean']).astype(int).tolist()}")
+
+    generate_synthetic_players(n_players, distributions)
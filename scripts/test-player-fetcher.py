@@ -0,0 +1,86 @@
+#!/usr/bin/env python3
+"""
+Player Fetcher Test
+Runs player_fetcher against a local stub of the MFL API: 404s, 503 retries with Retry-After, and resume
+"""
+
+import os
+import sys
+import json
+import asyncio
+import tempfile
+import threading
+from collections import Counter
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from player_fetcher import fetch_players
+
+MISSING_IDS = {4}       # answered with 404
+FLAKY_IDS = {3}         # answered with one 503 + Retry-After before succeeding
+
+requests = Counter()
+
+class StubHandler(BaseHTTPRequestHandler):
+    def do_GET(self):
+        player_id = int(self.path.rsplit('/', 1)[-1])
+        requests[player_id] += 1
+
+        if player_id in MISSING_IDS:
+            self.send_response(404)
+            self.end_headers()
+            return
+        if player_id in FLAKY_IDS and requests[player_id] == 1:
+            self.send_response(503)
+            self.send_header('Retry-After', '0')
+            self.end_headers()
+            return
+
+        body = json.dumps({'player': {'id': player_id, 'metadata': {'id': player_id, 'positions': ['ST']}}})
+        self.send_response(200)
+        self.send_header('Content-Type', 'application/json')
+        self.end_headers()
+        self.wfile.write(body.encode('utf-8'))
+
+    def log_message(self, *args):
+        pass
+
+def output_ids(path):
+    with open(path, 'r') as f:
+        return [json.loads(line)['player']['id'] for line in f]
+
+def check(condition, message):
+    print(f"{'✅' if condition else '❌'} {message}")
+    return condition
+
+def main():
+    server = ThreadingHTTPServer(('127.0.0.1', 0), StubHandler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    base_url = f"http://127.0.0.1:{server.server_address[1]}"
+
+    passed = True
+    with tempfile.TemporaryDirectory() as work_dir:
+        output = os.path.join(work_dir, 'players.jsonl')
+
+        print("\n🔍 First run: ids 1-5")
+        summary = asyncio.run(fetch_players([1, 2, 3, 4, 5], output, base_url, concurrency=2, rate=1000, burst=10))
+        passed &= check(summary['not_found'] == 1, "404 counted as not found")
+        passed &= check(summary['retries'] == 1 and requests[3] == 2, "503 + Retry-After retried once")
+        passed &= check(not summary['failed'], "no request failed")
+        passed &= check(sorted(output_ids(output)) == [1, 2, 3, 5], "one line per fetched player")
+
+        print("\n🔍 Second run: ids 1-7, resuming")
+        before = requests.copy()
+        summary = asyncio.run(fetch_players(range(1, 8), output, base_url, concurrency=2, rate=1000, burst=10))
+        refetched = sorted(player_id for player_id in range(1, 6) if requests[player_id] != before[player_id])
+        passed &= check(not refetched, f"nothing fetched or not found earlier is requested again {refetched or ''}")
+        passed &= check(summary['fetched'] == 2, "only the new ids are fetched")
+        passed &= check(sorted(output_ids(output)) == [1, 2, 3, 5, 6, 7], "new players appended, none duplicated")
+
+    server.shutdown()
+    print(f"\n{'✅ All checks passed' if passed else '❌ Some checks failed'}")
+    return 0 if passed else 1
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -22,58 +22,27 @@ def prepare_training_data(excel_path):
     print(f"Loading data from {excel_path}...")
     df = pd.read_excel(excel_path)
     
-    processed_data = []
+    # Pull the base attributes out of the inputData JSON for the whole column at once
+    from input_data_extractor import extract_player_fields, write_rejected_rows, rejected_rows_path
     
-    for idx, row in df.iterrows():
-        try:
-            # Parse JSON to get base attributes
-            input_data = json.loads(row['inputData'])
-            metadata = input_data['player']['metadata']
-            
-            # Extract input features (base attributes)
-            player_features = {
-                'PAC': metadata['pace'],
-                'SHO': metadata['shooting'],
-                'PAS': metadata['passing'],
-                'DRI': metadata['dribbling'],
-                'DEF': metadata['defense'],
-                'PHY': metadata['physical'],
-                # Additional context that might help
-                'overall': metadata['overall'],
-                'age': metadata['age'],
-                'height': metadata.get('height', 175),  # Default height if missing
-                'primary_position': row['primary'],
-                'secondary_positions': row.get('secondary', '') if pd.notna(row.get('secondary')) else ''
-            }
-            
-            # Extract target variables (position ratings)
-            position_ratings = {
-                'LB': row.get('LB', 0),
-                'CB': row.get('CB', 0),
-                'RB': row.get('RB', 0),
-                'LWB': row.get('LWB', 0),
-                'RWB': row.get('RWB', 0),
-                'CDM': row.get('CDM', 0),
-                'CM': row.get('CM', 0),
-                'CAM': row.get('CAM', 0),
-                'LM': row.get('LM', 0),
-                'RM': row.get('RM', 0),
-                'CF': row.get('CF', 0),
-                'ST': row.get('ST', 0),
-                'LW': row.get('LW', 0),
-                'RW': row.get('RW', 0),
-                'GK': row.get('GK', 0) if pd.notna(row.get('GK')) else 0  # Set GK to 0 if missing
-            }
-            
-            # Combine features and targets
-            combined_data = {**player_features, **position_ratings}
-            processed_data.append(combined_data)
-            
-        except Exception as e:
-            print(f"Error processing row {idx}: {e}")
-            continue
+    fields, valid, rejects = extract_player_fields(df['inputData'], n_jobs=None)
+    write_rejected_rows(rejects, rejected_rows_path(excel_path), ids=df['id'].tolist(), source=excel_path)
+    df_valid = df[valid].reset_index(drop=True)
+    
+    # Input features (base attributes) plus additional context that might help
+    df_processed = pd.DataFrame(
+        fields[valid],
+        columns=['PAC', 'SHO', 'PAS', 'DRI', 'DEF', 'PHY', 'overall', 'age', 'height']
+    )
+    df_processed['primary_position'] = df_valid['primary']
+    df_processed['secondary_positions'] = df_valid['secondary'].fillna('') if 'secondary' in df_valid else ''
+    
+    # Target variables (position ratings)
+    for position in ['LB', 'CB', 'RB', 'LWB', 'RWB', 'CDM', 'CM', 'CAM',
+                     'LM', 'RM', 'CF', 'ST', 'LW', 'RW', 'GK']:
+        df_processed[position] = df_valid[position] if position in df_valid else 0
+    df_processed['GK'] = df_processed['GK'].fillna(0)  # Set GK to 0 if missing
     
-    df_processed = pd.DataFrame(processed_data)
     print(f"Processed {len(df_processed)} valid records")
     
     # Clean data - only remove rows with NaN in essential columns
@@ -95,12 +64,39 @@ def prepare_training_data(excel_path):
     
     return X_enhanced, y, input_cols, output_cols, df_processed
 
-def create_engineered_features(X):
+def prepare_snapshot_training_data():
+    """
+    Prepare training data from the merged dataset snapshot (all workbooks in Data/,
+    deduplicated) without re-reading any workbook that has not changed
+    """
+    from dataset_builder import build_snapshot, load_snapshot
+    from player_dataset import ATTRIBUTE_COLS, POSITIONS, position_names, secondary_names
+    
+    build_snapshot()
+    dataset = load_snapshot()
+    print(f"Loaded {len(dataset['id'])} players from the merged snapshot")
+    
+    df_processed = pd.DataFrame(
+        np.column_stack([dataset['attributes'], dataset['overall'], dataset['age'], dataset['height']]),
+        columns=ATTRIBUTE_COLS + ['overall', 'age', 'height']
+    )
+    df_processed['primary_position'] = position_names(dataset['primary_code'])
+    df_processed['secondary_positions'] = [', '.join(secondary_names(codes)) for codes in dataset['secondary_codes']]
+    df_processed[POSITIONS] = dataset['position_ratings']
+    
+    X = dataset['attributes'].astype(np.float64)
+    y = dataset['position_ratings'].astype(np.float64)
+    X_enhanced = create_engineered_features(X)
+    
+    return X_enhanced, y, list(ATTRIBUTE_COLS), list(POSITIONS), df_processed
+
+def create_engineered_features(X, verbose=True):
     """
     Create domain-specific features based on football knowledge
     Improved for MFL position requirements
     """
-    print("Creating enhanced engineered features for MFL...")
+    if verbose:
+        print("Creating enhanced engineered features for MFL...")
     features = []
     
     for row in X:
@@ -327,6 +323,101 @@ def train_advanced_models(X, y, output_cols):
         print("Advanced models not available, falling back to simple models...")
         return train_simple_model(X, y, output_cols)
 
+# Players whose id is a multiple of this are held out for streaming evaluation
+STREAMING_HOLDOUT_MODULUS = 5
+
+def train_streaming_models(data_paths, output_cols, chunk_size=4096, n_epochs=5):
+    """
+    Train one SGD regressor per position from streamed chunks.
+    Memory stays bounded by chunk_size no matter how large the data files are.
+    """
+    print("Training streaming models (partial_fit)...")
+
+    from sklearn.linear_model import SGDRegressor
+    from sklearn.preprocessing import StandardScaler
+    from player_dataset import POSITIONS
+    from streaming_ingest import iter_training_chunks
+
+    targets = [POSITIONS.index(position) for position in output_cols]
+
+    def training_chunks():
+        for X, y, ids in iter_training_chunks(data_paths, chunk_size):
+            train = ids % STREAMING_HOLDOUT_MODULUS != 0
+            if train.any():
+                yield create_engineered_features(X[train], verbose=False), y[train][:, targets]
+
+    # Pass 1: feature statistics
+    scaler = StandardScaler()
+    for features, _ in training_chunks():
+        scaler.partial_fit(features)
+
+    # Remaining passes: incremental fits, one model per position
+    models = {position: SGDRegressor(random_state=42) for position in output_cols}
+    for epoch in range(n_epochs):
+        for features, y in training_chunks():
+            features_scaled = scaler.transform(features)
+            for i, position in enumerate(output_cols):
+                models[position].partial_fit(features_scaled, y[:, i])
+        print(f"  Epoch {epoch + 1}/{n_epochs} complete")
+
+    # All positions share the same feature scaling
+    scalers = {position: scaler for position in output_cols}
+    metrics = evaluate_streaming_models(models, scalers, data_paths, output_cols, chunk_size)
+
+    return models, scalers, metrics
+
+def evaluate_streaming_models(models, scalers, data_paths, output_cols, chunk_size=4096):
+    """
+    MAE and R² on the held-out players, accumulated chunk by chunk
+    """
+    from player_dataset import POSITIONS
+    from streaming_ingest import iter_training_chunks
+
+    targets = [POSITIONS.index(position) for position in output_cols]
+    n_outputs = len(output_cols)
+    count = 0
+    abs_error = np.zeros(n_outputs)
+    sq_error = np.zeros(n_outputs)
+    y_sum = np.zeros(n_outputs)
+    y_sq_sum = np.zeros(n_outputs)
+
+    for X, y, ids in iter_training_chunks(data_paths, chunk_size):
+        test = ids % STREAMING_HOLDOUT_MODULUS == 0
+        if not test.any():
+            continue
+        features = create_engineered_features(X[test], verbose=False)
+        y_test = y[test][:, targets]
+
+        predictions = np.column_stack([
+            models[position].predict(scalers[position].transform(features))
+            for position in output_cols
+        ])
+        residuals = y_test - predictions
+
+        count += len(y_test)
+        abs_error += np.abs(residuals).sum(axis=0)
+        sq_error += (residuals ** 2).sum(axis=0)
+        y_sum += y_test.sum(axis=0)
+        y_sq_sum += (y_test ** 2).sum(axis=0)
+
+    if count == 0:
+        print("No held-out players to evaluate")
+        return {}
+
+    total_ss = y_sq_sum - y_sum ** 2 / count
+    metrics = {}
+    for i, position in enumerate(output_cols):
+        mae = abs_error[i] / count
+        r2 = 1 - sq_error[i] / total_ss[i] if total_ss[i] > 0 else 0.0
+        metrics[position] = {'MAE': mae, 'R2': r2}
+        print(f"  {position}: MAE={mae:.2f}, R²={r2:.3f}")
+
+    overall_mae = np.mean([m['MAE'] for m in metrics.values()])
+    overall_r2 = np.mean([m['R2'] for m in metrics.values()])
+    print(f"\nOverall (held-out {count} players): MAE={overall_mae:.2f}, R²={overall_r2:.3f}")
+
+    return metrics
+
 def save_model_data(models, scalers, output_cols, model_dir="models"):
     """
     Save the trained models and scalers
@@ -531,19 +622,46 @@ def main():
     """
     Main training pipeline
     """
-    excel_path = "Data/600-player-data-scraped.xlsx"
-    
-    if not os.path.exists(excel_path):
-        print(f"Error: {excel_path} not found!")
-        return
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Train MFL position rating predictors")
+    parser.add_argument('--stream', action='store_true',
+                        help='Stream the data files in chunks and train with partial_fit')
+    parser.add_argument('--data', nargs='+', default=["Data/600-player-data-scraped.xlsx"],
+                        help='Workbook or JSONL files to train on')
+    parser.add_argument('--chunk-size', type=int, default=4096)
+    parser.add_argument('--snapshot', action='store_true',
+                        help='Train on the merged, deduplicated snapshot of every workbook in Data/')
+    args = parser.parse_args()
+
+    for data_path in ([] if args.snapshot else args.data):
+        if not os.path.exists(data_path):
+            print(f"Error: {data_path} not found!")
+            return
+        if not args.stream and Path(data_path).suffix.lower() in ('.jsonl', '.ndjson'):
+            print(f"Error: {data_path} is JSONL, which only --stream reads")
+            return
     
     print("=== MFL Position Rating Predictor Training ===")
     
-    # Prepare data
-    X, y, input_cols, output_cols, df_processed = prepare_training_data(excel_path)
-    
-    # Train models
-    models, scalers, metrics = train_advanced_models(X, y, output_cols)
+    if args.stream:
+        output_cols = ['LB', 'CB', 'RB', 'LWB', 'RWB', 'CDM', 'CM', 'CAM',
+                       'LM', 'RM', 'CF', 'ST', 'LW', 'RW', 'GK']
+        models, scalers, metrics = train_streaming_models(args.data, output_cols, args.chunk_size)
+    else:
+        # Prepare data
+        if args.snapshot:
+            X, y, input_cols, output_cols, df_processed = prepare_snapshot_training_data()
+        else:
+            # Every workbook given is trained on, stacked in order (--snapshot also deduplicates players)
+            parts = [prepare_training_data(data_path) for data_path in args.data]
+            X = np.vstack([part[0] for part in parts])
+            y = np.vstack([part[1] for part in parts])
+            input_cols, output_cols = parts[0][2], parts[0][3]
+            df_processed = pd.concat([part[4] for part in parts], ignore_index=True)
+        
+        # Train models
+        models, scalers, metrics = train_advanced_models(X, y, output_cols)
     
     # Save models
     save_model_data(models, scalers, output_cols)